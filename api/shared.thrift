@@ -10,7 +10,8 @@ enum ErrorCode {
   GENERAL,
   AUTH_DENIED,  // Authentication denied. We do not allow access to the service.
   UNAUTHORIZED, // Authorization denied. User does not have right to perform an action.
-  API_MISMATCH  // The client attempted to query an API version that is not supported by the server.
+  API_MISMATCH, // The client attempted to query an API version that is not supported by the server.
+  SOURCE_MISSING // The content of a source file is neither in the database nor in the stored results.
 }
 
 exception RequestFailed {
@@ -160,6 +160,12 @@ struct ReportData {
 }
 typedef list<ReportData> ReportDataList
 
+// A page of the results returned by getRunResultsPage().
+struct ReportDataPage {
+  1: ReportDataList reports,
+  2: string         nextCursor  // Opaque token to query the next page, empty after the last page.
+}
+
 /**
  * Members of this struct are interpreted in "OR" relation with each other.
  * Between the elements of the list there is "AND" relation.
@@ -192,6 +198,19 @@ struct CheckerCount {
 }
 typedef list<CheckerCount> CheckerCounts
 
+// Number of reports of a checker with the given review status. The counts
+// are also split by the detection status of the reports. If unique reports
+// are counted, a report hash which has reports with different detection
+// statuses is counted for all of them, but only once in the total count.
+struct CheckerStatusCount {
+  1: string                     checkerName,
+  2: Severity                   severity,
+  3: ReviewStatus               reviewStatus,
+  4: i64                        count,                 // Number of reports with any detection status.
+  5: map<DetectionStatus, i64>  detectionStatusCounts  // Detection statuses without reports are left out.
+}
+typedef list<CheckerStatusCount> CheckerStatusCounts
+
 struct CommentData {
   1: i64     id,
   2: string  author,
@@ -256,6 +275,21 @@ service codeCheckerDBAccess {
                                6: CompareData    cmpData)
                                throws (1: shared.RequestFailed requestError),
 
+  // Get the results for some runIds page by page.
+  // Unlike getRunResults() the pages are not selected by an offset: the
+  // first page is returned for an empty cursor and the nextCursor of the
+  // returned page can be used to query the following one, so querying a
+  // page does not get slower towards the end of the results. The sort types of the consecutive calls must
+  // be the same and unique results are not supported.
+  // PERMISSION: PRODUCT_ACCESS
+  ReportDataPage getRunResultsPage(1: list<i64>      runIds,
+                                   2: i64            limit,
+                                   3: string         cursor,
+                                   4: list<SortMode> sortType,
+                                   5: ReportFilter   reportFilter,
+                                   6: CompareData    cmpData)
+                                   throws (1: shared.RequestFailed requestError),
+
 
   // Count the results separately for multiple runs.
   // If an empty run id list is provided the report
@@ -392,6 +426,18 @@ service codeCheckerDBAccess {
                                  3: CompareData  cmpData)
                                  throws (1: shared.RequestFailed requestError),
 
+  // Count the reports by checker, severity, review status and detection
+  // status at once, which would need a getCheckerCounts() call for each
+  // review and detection status.
+  // If the run id list is empty the metrics will be counted
+  // for all of the runs and in compare mode all of the runs
+  // will be used as a baseline excluding the runs in compare data.
+  // PERMISSION: PRODUCT_ACCESS
+  CheckerStatusCounts getCheckerStatusCounts(1: list<i64>    runIds,
+                                             2: ReportFilter reportFilter,
+                                             3: CompareData  cmpData)
+                                             throws (1: shared.RequestFailed requestError),
+
   // If the run id list is empty the metrics will be counted
   // for all of the runs and in compare mode all of the runs
   // will be used as a baseline excluding the runs in compare data.
@@ -432,4 +478,42 @@ service codeCheckerDBAccess {
                    5: bool   force)
                    throws (1: shared.RequestFailed requestError),
 
+  // The following functions implement a chunked alternative of
+  // massStoreRun(), so neither the client nor the server has to hold the
+  // whole ZIP file in memory and an interrupted upload can be resumed.
+  //
+  // beginMassStoreRun() opens a new upload and returns a token which
+  // identifies it in the subsequent calls. The parameters have the same
+  // meaning as in massStoreRun().
+  // PERMISSION: PRODUCT_STORE
+  string beginMassStoreRun(1: string runName,
+                           2: string tag,
+                           3: string version,
+                           4: bool   force)
+                           throws (1: shared.RequestFailed requestError),
+
+  // Appends the next chunk of the compressed ZIP file (the same content
+  // massStoreRun() takes, base64 encoded chunk by chunk) to the upload.
+  // The "offset" parameter is the position of the chunk in the compressed
+  // file. The chunk is only appended if "offset" equals the number of bytes
+  // received so far, otherwise it is dropped. Returns the number of bytes
+  // received, which is the offset the client should continue from.
+  // PERMISSION: PRODUCT_STORE
+  i64 appendMassStoreRunChunk(1: string storeToken,
+                              2: i64    offset,
+                              3: string chunk)
+                              throws (1: shared.RequestFailed requestError),
+
+  // Returns the number of bytes received so far for the given upload. Used
+  // to resume the upload after a dropped connection.
+  // PERMISSION: PRODUCT_STORE
+  i64 getMassStoreRunOffset(1: string storeToken)
+                            throws (1: shared.RequestFailed requestError),
+
+  // Stores the run from the fully uploaded ZIP file and closes the upload.
+  // Returns the ID of the stored run.
+  // PERMISSION: PRODUCT_STORE
+  i64 commitMassStoreRun(1: string storeToken)
+                         throws (1: shared.RequestFailed requestError),
+
 }
@@ -0,0 +1,63 @@
+"""Pre-aggregated report statistics
+
+Revision ID: 3e91d0612422
+Revises: 82ca43f05c10
+Create Date: 2017-10-23 14:12:37.418265
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '3e91d0612422'
+down_revision = '82ca43f05c10'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    op.create_table('report_statistics',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('run_id', sa.Integer(), nullable=True),
+    sa.Column('bug_hash', sa.String(), nullable=True),
+    sa.Column('checker_id', sa.String(), nullable=True),
+    sa.Column('severity', sa.Integer(), nullable=True),
+    sa.Column('detection_status', sa.String(), nullable=True),
+    sa.Column('review_status', sa.String(), nullable=False),
+    sa.Column('file_id', sa.Integer(), nullable=True),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['file_id'], [u'files.id'], name=op.f('fk_report_statistics_file_id_files'), ondelete=u'CASCADE', initially=u'DEFERRED', deferrable=True),
+    sa.ForeignKeyConstraint(['run_id'], [u'runs.id'], name=op.f('fk_report_statistics_run_id_runs'), ondelete=u'CASCADE', initially=u'DEFERRED', deferrable=True),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_report_statistics'))
+    )
+    op.create_index(op.f('ix_report_statistics_bug_hash'), 'report_statistics', ['bug_hash'], unique=False)
+    op.create_index(op.f('ix_report_statistics_run_id'), 'report_statistics', ['run_id'], unique=False)
+
+    # Fill the statistics of the already stored runs.
+    op.execute("""
+        INSERT INTO report_statistics
+            (run_id, bug_hash, checker_id, severity, detection_status,
+             review_status, file_id, count)
+        SELECT reports.run_id, reports.bug_id, reports.checker_id,
+               reports.severity,
+               CAST(reports.detection_status AS VARCHAR),
+               COALESCE(CAST(review_statuses.status AS VARCHAR),
+                        'unreviewed'),
+               reports.file_id, COUNT(*)
+        FROM reports
+        LEFT OUTER JOIN review_statuses
+            ON review_statuses.bug_hash = reports.bug_id
+        GROUP BY reports.run_id, reports.bug_id, reports.checker_id,
+                 reports.severity,
+                 CAST(reports.detection_status AS VARCHAR),
+                 COALESCE(CAST(review_statuses.status AS VARCHAR),
+                          'unreviewed'),
+                 reports.file_id
+        """)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_report_statistics_run_id'), table_name='report_statistics')
+    op.drop_index(op.f('ix_report_statistics_bug_hash'), table_name='report_statistics')
+    op.drop_table('report_statistics')
@@ -7,87 +7,138 @@
 """
 
 from collections import defaultdict
-import glob
+import hashlib
+import json
 import multiprocessing
 import os
 import signal
 import sys
+import time
 import traceback
 import zipfile
 
 from libcodechecker import util
 from libcodechecker.analyze import analyzer_env
-from libcodechecker.analyze import plist_parser
+from libcodechecker.analyze import blob_store
+from libcodechecker.analyze import report_interchange
 from libcodechecker.analyze.analyzers import analyzer_types
 from libcodechecker.logger import LoggerFactory
 
 LOG = LoggerFactory.get_new_logger('ANALYSIS MANAGER')
 
+# The source files of the failure archives are stored in this folder of the
+# output directory. The failure archives are written by at most this many
+# archiver processes with this niceness.
+FAILURE_BLOB_DIR = 'failed-blobs'
+FAILURE_ARCHIVER_JOBS = 2
+FAILURE_ARCHIVER_NICENESS = 19
 
-def worker_result_handler(results, metadata, output_path):
+
+class WorkerResultHandler(object):
     """
-    Print the analysis summary.
+    Collect the results of the analysis actions into the metadata as soon as
+    they finish, so the metadata is valid even if the analysis is
+    interrupted, and report the throughput of the analysis periodically.
     """
 
-    if metadata is None:
-        metadata = {}
+    # Seconds between two throughput reports.
+    PROGRESS_INTERVAL = 30
+
+    def __init__(self, metadata, actions_num):
+        self.__metadata = metadata
+        self.__actions_num = actions_num
+        self.__start_time = time.time()
+        self.__last_report = self.__start_time
+
+        self.__results_num = 0
+        self.__successful_analysis = defaultdict(int)
+        self.__failed_analysis = defaultdict(int)
+        self.__skipped_num = 0
+        self.__reanalyzed_num = 0
+        self.__reused_num = 0
 
-    successful_analysis = defaultdict(int)
-    failed_analysis = defaultdict(int)
-    skipped_num = 0
-    reanalyzed_num = 0
+    def handle(self, result):
+        """
+        Process the result of one analysis action.
+        """
+        res, skipped, reanalyzed, analyzer_type, result_file, reused, \
+            fingerprints, result_sources, durations = result
+
+        self.__results_num += 1
+
+        if res == 0:
+            self.__metadata['result_source_files'].update(result_sources)
+        elif result_file:
+            self.__metadata['result_source_files'].pop(result_file, None)
+
+        if 'fingerprints' in self.__metadata:
+            if res == 0:
+                self.__metadata['fingerprints'].update(fingerprints)
+            elif result_file:
+                self.__metadata['fingerprints'].pop(result_file, None)
+
+        self.__metadata.setdefault('action_durations', {}).update(durations)
 
-    for res, skipped, reanalyzed, analyzer_type, _ in results:
         if skipped:
-            skipped_num += 1
+            self.__skipped_num += 1
+        elif reused:
+            self.__reused_num += 1
         elif reanalyzed:
-            reanalyzed_num += 1
+            self.__reanalyzed_num += 1
         else:
             if res == 0:
-                successful_analysis[analyzer_type] += 1
+                self.__successful_analysis[analyzer_type] += 1
             else:
-                failed_analysis[analyzer_type] += 1
-
-    LOG.info("----==== Summary ====----")
-    LOG.info("Total compilation commands: " + str(len(results)))
-    if successful_analysis:
-        LOG.info("Successfully analyzed")
-        for analyzer_type, res in successful_analysis.items():
-            LOG.info('  ' + analyzer_type + ': ' + str(res))
-
-    if failed_analysis:
-        LOG.info("Failed to analyze")
-        for analyzer_type, res in failed_analysis.items():
-            LOG.info('  ' + analyzer_type + ': ' + str(res))
-
-    if reanalyzed_num:
-        LOG.info("Reanalyzed compilation commands: " + str(reanalyzed_num))
-    if skipped_num:
-        LOG.info("Skipped compilation commands: " + str(skipped_num))
-    LOG.info("----=================----")
-
-    metadata['successful'] = successful_analysis
-    metadata['failed'] = failed_analysis
-    metadata['skipped'] = skipped_num
-
-    # check() created the result .plist files and additional, per-analysis
-    # meta information in forms of .plist.source files.
-    # We now soak these files into the metadata dict, as they are not needed
-    # as loose files on the disk... but synchronizing LARGE dicts between
-    # threads would be more error prone.
-    source_map = {}
-    for f in glob.glob(os.path.join(output_path, "*.source")):
-        with open(f, 'r') as sfile:
-            source_map[f[:-7]] = sfile.read().strip()
-        os.remove(f)
-
-    for f in glob.glob(os.path.join(output_path, 'failed', "*.error")):
-        err_file, _ = os.path.splitext(f)
-        plist_file = os.path.basename(err_file) + ".plist"
-        plist_file = os.path.join(output_path, plist_file)
-        metadata['result_source_files'].pop(plist_file, None)
-
-    metadata['result_source_files'].update(source_map)
+                self.__failed_analysis[analyzer_type] += 1
+
+        now = time.time()
+        if now - self.__last_report >= self.PROGRESS_INTERVAL:
+            self.__last_report = now
+            self.report_progress()
+
+    def report_progress(self):
+        elapsed = time.time() - self.__start_time
+        throughput = self.__results_num / elapsed if elapsed else 0
+        remaining = self.__actions_num - self.__results_num
+        LOG.info("Analyzed %d/%d compilation commands in %d sec "
+                 "(%.2f commands/sec, about %d sec left)." %
+                 (self.__results_num, self.__actions_num, elapsed,
+                  throughput,
+                  remaining / throughput if throughput else 0))
+
+    def summary(self):
+        """
+        Print the analysis summary and save it into the metadata.
+        """
+        LOG.info("----==== Summary ====----")
+        LOG.info("Total compilation commands: " + str(self.__results_num))
+        if self.__results_num < self.__actions_num:
+            LOG.info("Not analyzed compilation commands: " +
+                     str(self.__actions_num - self.__results_num))
+        if self.__successful_analysis:
+            LOG.info("Successfully analyzed")
+            for analyzer_type, res in self.__successful_analysis.items():
+                LOG.info('  ' + analyzer_type + ': ' + str(res))
+
+        if self.__failed_analysis:
+            LOG.info("Failed to analyze")
+            for analyzer_type, res in self.__failed_analysis.items():
+                LOG.info('  ' + analyzer_type + ': ' + str(res))
+
+        if self.__reanalyzed_num:
+            LOG.info("Reanalyzed compilation commands: " +
+                     str(self.__reanalyzed_num))
+        if self.__reused_num:
+            LOG.info("Unchanged compilation commands: " +
+                     str(self.__reused_num))
+        if self.__skipped_num:
+            LOG.info("Skipped compilation commands: " +
+                     str(self.__skipped_num))
+        LOG.info("----=================----")
+
+        self.__metadata['successful'] = self.__successful_analysis
+        self.__metadata['failed'] = self.__failed_analysis
+        self.__metadata['skipped'] = self.__skipped_num
 
 
 def create_dependencies(action):
@@ -163,15 +214,160 @@ def create_dependencies(action):
                          "command '" + ' '.join(command) + "'")
 
 
+def get_file_hash(path):
+    """
+    Return the hash of the content of the given file. The hashes are cached
+    in the worker process while the modification time and the size of the
+    file are unchanged, because the same headers are included by many
+    translation units.
+    """
+    stat = os.stat(path)
+    cached = file_hash_cache.get(path)
+    if cached and cached[:2] == (stat.st_mtime, stat.st_size):
+        return cached[2]
+
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as content:
+        for chunk in iter(lambda: content.read(1024 * 1024), ''):
+            hasher.update(chunk)
+    content_hash = hasher.hexdigest()
+
+    file_hash_cache[path] = (stat.st_mtime, stat.st_size, content_hash)
+    return content_hash
+
+
+def get_analysis_fingerprint(analyzer_cmd, dependencies):
+    """
+    Create the fingerprint of an analysis from the analyzer command (which
+    contains the compilation options and the checker configuration), the
+    version of the analyzers, the skip list and the content of the source
+    file and of the headers it depends on.
+    """
+    hasher = hashlib.sha256()
+    hasher.update(config_fingerprint)
+    hasher.update(' '.join(analyzer_cmd))
+    for dependency in sorted(dependencies):
+        hasher.update(dependency)
+        hasher.update(get_file_hash(dependency))
+    return hasher.hexdigest()
+
+
+def write_failure_archive(failure, blobs):
+    """
+    Write the ZIP archive of a failed analysis with the output of the
+    analyzer and the source files it depends on. The source files are
+    compressed into the blob store only once, and their compressed content
+    is copied into the archive.
+    """
+    failed_dir = os.path.dirname(failure['zip_file'])
+    if not os.path.exists(failed_dir):
+        try:
+            os.makedirs(failed_dir)
+        except OSError:
+            pass
+    LOG.debug("Writing error debugging to '" + failed_dir + "'")
+
+    with zipfile.ZipFile(failure['zip_file'], 'w') as archive:
+        if len(failure['stdout']) > 0:
+            LOG.debug("[ZIP] Writing analyzer STDOUT to /stdout")
+            archive.writestr("stdout", failure['stdout'])
+
+        if len(failure['stderr']) > 0:
+            LOG.debug("[ZIP] Writing analyzer STDERR to /stderr")
+            archive.writestr("stderr", failure['stderr'])
+
+        # The dependencies are already known if they were needed for the
+        # fingerprint of an incremental analysis.
+        dependencies = failure.get('dependencies')
+        if dependencies is not None:
+            dependencies = set(dependencies)
+        else:
+            LOG.debug("Generating dependent headers via compiler...")
+            try:
+                dependencies = set(create_dependencies(failure['action']))
+            except Exception as ex:
+                LOG.debug("Couldn't create dependencies:")
+                LOG.debug(str(ex))
+                archive.writestr("no-sources", str(ex))
+                dependencies = set()
+
+        dependencies.update(failure['other_files'])
+
+        LOG.debug("Writing dependent files to archive.")
+        for dependent_source in dependencies:
+            LOG.debug("[ZIP] Writing '" + dependent_source + "' "
+                      "to the archive.")
+            archive_path = dependent_source.lstrip('/')
+
+            try:
+                blob_store.write_blob(archive,
+                                      os.path.join("sources-root",
+                                                   archive_path),
+                                      blobs.put(dependent_source),
+                                      os.stat(dependent_source))
+            except Exception as ex:
+                # In certain cases, the output could contain
+                # invalid tokens (such as error messages that were
+                # printed even though the dependency generation
+                # returned 0).
+                LOG.debug("[ZIP] Couldn't write, because " + str(ex))
+                archive.writestr(
+                    os.path.join("failed-sources-root", archive_path),
+                    "Couldn't write this file, because:\n" + str(ex))
+
+        LOG.debug("[ZIP] Writing extra information...")
+
+        archive.writestr("build-action",
+                         failure['action'].original_command)
+        archive.writestr("analyzer-command", failure['analyzer_command'])
+        archive.writestr("return-code", str(failure['return_code']))
+
+    LOG.debug("ZIP file written at '" + failure['zip_file'] + "'")
+
+
+def archive_failures(queue, output_dir):
+    """
+    Write the failure archives of the failed analyses put into the queue
+    until None is put into it. The archiver processes run with low priority,
+    so they do not slow down the analysis.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if hasattr(os, 'nice'):
+        os.nice(FAILURE_ARCHIVER_NICENESS)
+
+    blobs = blob_store.BlobStore(os.path.join(output_dir, FAILURE_BLOB_DIR))
+    for failure in iter(queue.get, None):
+        try:
+            write_failure_archive(failure, blobs)
+        except Exception as ex:
+            LOG.debug("Couldn't write the failure archive '" +
+                      failure['zip_file'] + "':")
+            LOG.debug(str(ex))
+
+
 # Progress reporting.
 progress_checked_num = None
 progress_actions = None
 
+# The failed analyses are put into this queue for the archiver process.
+failure_queue = None
+
+# Incremental analysis. The fingerprints of the previous analysis are None
+# if every action has to be analyzed.
+previous_fingerprints = None
+config_fingerprint = ''
+file_hash_cache = {}
 
-def init_worker(checked_num, action_num):
-    global progress_checked_num, progress_actions
+
+def init_worker(checked_num, action_num, fingerprints=None,
+                config_hash='', failures=None):
+    global progress_checked_num, progress_actions, \
+        previous_fingerprints, config_fingerprint, failure_queue
     progress_checked_num = checked_num
     progress_actions = action_num
+    previous_fingerprints = fingerprints
+    config_fingerprint = config_hash
+    failure_queue = failures
 
 
 def check(check_data):
@@ -188,12 +384,17 @@ def check(check_data):
 
     skipped = False
     reanalyzed = False
+    reused = False
+    fingerprints = {}
+    result_sources = {}
+    start_time = time.time()
     try:
         # If one analysis fails the check fails.
         return_codes = 0
         skipped = False
 
         result_file = ''
+        dependencies = None
         for source in action.sources:
 
             # If there is no skiplist handler there was no skip list file
@@ -242,9 +443,53 @@ def check(check_data):
                                                           skip_handler)
 
             rh.analyzed_source_file = source
+
+            if previous_fingerprints is not None:
+                result_file = rh.analyzer_result_file.replace(r'\ ', ' ')
+                try:
+                    if dependencies is None:
+                        dependencies = create_dependencies(action)
+
+                    fingerprint = get_analysis_fingerprint(
+                        source_analyzer.construct_analyzer_cmd(rh),
+                        dependencies)
+                except Exception as ex:
+                    LOG.debug("Couldn't create the fingerprint of the "
+                              "analysis of " + source_file_name + ":")
+                    LOG.debug(str(ex))
+                    fingerprint = None
+
+                if fingerprint:
+                    fingerprints[result_file] = fingerprint
+
+                    if previous_fingerprints.get(result_file) == \
+                            fingerprint and os.path.exists(result_file):
+                        result_sources[result_file] = \
+                            rh.analyzed_source_file.replace(r'\ ', ' ')
+                        LOG.info("[%d/%d] %s skipped %s, it is unchanged "
+                                 "since the previous analysis." %
+                                 (progress_checked_num.value,
+                                  progress_actions.value,
+                                  action.analyzer_type, source_file_name))
+                        reused = True
+                        continue
+
             if os.path.exists(rh.analyzer_result_file):
                 reanalyzed = True
 
+            if capture_analysis_output and rh.streams_stdout:
+                # Only the beginning of the streamed stdout is kept in the
+                # result handler, so the whole output is captured while the
+                # analyzer runs.
+                success_dir = os.path.join(output_dir, "success")
+                if not os.path.exists(success_dir):
+                    os.makedirs(success_dir)
+
+                result_base = os.path.basename(
+                    rh.analyzer_result_file.replace(r'\ ', ' '))
+                rh.stdout_capture_file = \
+                    os.path.join(success_dir, result_base) + ".stdout.txt"
+
             # Fills up the result handler with the analyzer information.
             source_analyzer.analyze(rh, analyzer_environment)
 
@@ -267,7 +512,7 @@ def check(check_data):
                     if not quiet_output_on_stdout:
                         LOG.debug_analyzer('\n' + rh.analyzer_stdout)
 
-                    if capture_analysis_output:
+                    if capture_analysis_output and not rh.streams_stdout:
                         with open(os.path.join(success_dir, result_base) +
                                   ".stdout.txt", 'w') as outf:
                             outf.write(rh.analyzer_stdout)
@@ -284,11 +529,10 @@ def check(check_data):
                 rh.postprocess_result()
                 # Generated reports will be handled separately at store.
 
-                # Save some extra information next to the plist, .source
-                # acting as an extra metadata file.
-                with open(result_file + ".source", 'w') as orig:
-                    orig.write(
-                        rh.analyzed_source_file.replace(r'\ ', ' ') + "\n")
+                # The analyzed source file of the result is saved into the
+                # metadata.
+                result_sources[result_file] = \
+                    rh.analyzed_source_file.replace(r'\ ', ' ')
 
                 if os.path.exists(rh.analyzer_result_file) and \
                         not os.path.exists(result_file):
@@ -304,95 +548,52 @@ def check(check_data):
                     if os.path.exists(err_file):
                         os.remove(err_file)
 
-                if skip_handler:
-                    # We need to check the plist content because skipping
-                    # reports in headers can be done only this way.
-                    plist_parser.skip_report_from_plist(result_file,
-                                                        skip_handler)
+                # The plist is parsed only once: skipping reports in
+                # headers can be done only by checking the plist content,
+                # and the parsed reports are kept for the store command.
+                report_interchange.write_from_plist(result_file,
+                                                    skip_handler)
 
             else:
-                # If the analysis has failed, we help debugging.
-                if not os.path.exists(failed_dir):
-                    os.makedirs(failed_dir)
-                LOG.debug("Writing error debugging to '" + failed_dir + "'")
-
-                zip_file = result_base + '.zip'
-                with zipfile.ZipFile(os.path.join(failed_dir, zip_file),
-                                     'w') as archive:
+                # If the analysis has failed, we help debugging. The
+                # failure archive is written by the archiver process, so the
+                # worker is not blocked by collecting the dependencies.
+                LOG.debug("Fetching other dependent files from analyzer "
+                          "output...")
+                try:
+                    other_files = set()
                     if len(rh.analyzer_stdout) > 0:
-                        LOG.debug("[ZIP] Writing analyzer STDOUT to /stdout")
-                        archive.writestr("stdout", rh.analyzer_stdout)
+                        other_files.update(
+                            source_analyzer.get_analyzer_mentioned_files(
+                                rh.analyzer_stdout))
 
                     if len(rh.analyzer_stderr) > 0:
-                        LOG.debug("[ZIP] Writing analyzer STDERR to /stderr")
-                        archive.writestr("stderr", rh.analyzer_stderr)
-
-                    LOG.debug("Generating dependent headers via compiler...")
-                    try:
-                        dependencies = set(create_dependencies(rh.buildaction))
-                    except Exception as ex:
-                        LOG.debug("Couldn't create dependencies:")
-                        LOG.debug(str(ex))
-                        archive.writestr("no-sources", str(ex))
-                        dependencies = set()
-
-                    LOG.debug("Fetching other dependent files from analyzer "
-                              "output...")
-                    try:
-                        other_files = set()
-                        if len(rh.analyzer_stdout) > 0:
-                            other_files.update(
-                                source_analyzer.get_analyzer_mentioned_files(
-                                    rh.analyzer_stdout))
-
-                        if len(rh.analyzer_stderr) > 0:
-                            other_files.update(
-                                source_analyzer.get_analyzer_mentioned_files(
-                                    rh.analyzer_stderr))
-                    except Exception as ex:
-                        LOG.debug("Couldn't generate list of other files "
-                                  "from analyzer output:")
-                        LOG.debug(str(ex))
-                        other_files = set()
-
-                    dependencies.update(other_files)
-
-                    LOG.debug("Writing dependent files to archive.")
-                    for dependent_source in dependencies:
-                        LOG.debug("[ZIP] Writing '" + dependent_source + "' "
-                                  "to the archive.")
-                        archive_path = dependent_source.lstrip('/')
-
-                        try:
-                            archive.write(
-                                dependent_source,
-                                os.path.join("sources-root",
-                                             archive_path),
-                                zipfile.ZIP_DEFLATED)
-                        except Exception as ex:
-                            # In certain cases, the output could contain
-                            # invalid tokens (such as error messages that were
-                            # printed even though the dependency generation
-                            # returned 0).
-                            LOG.debug("[ZIP] Couldn't write, because " +
-                                      str(ex))
-                            archive.writestr(
-                                os.path.join("failed-sources-root",
-                                             archive_path),
-                                "Couldn't write this file, because:\n" +
-                                str(ex))
-
-                    LOG.debug("[ZIP] Writing extra information...")
-
-                    archive.writestr("build-action",
-                                     rh.buildaction.original_command)
-                    archive.writestr("analyzer-command",
-                                     ' '.join(rh.analyzer_cmd))
-                    archive.writestr("return-code",
-                                     str(rh.analyzer_returncode))
-
-                LOG.debug("ZIP file written at '" +
-                          os.path.join(failed_dir, zip_file) + "'")
+                        other_files.update(
+                            source_analyzer.get_analyzer_mentioned_files(
+                                rh.analyzer_stderr))
+                except Exception as ex:
+                    LOG.debug("Couldn't generate list of other files "
+                              "from analyzer output:")
+                    LOG.debug(str(ex))
+                    other_files = set()
+
+                failure = {'zip_file': os.path.join(failed_dir,
+                                                    result_base + '.zip'),
+                           'action': rh.buildaction,
+                           'stdout': rh.analyzer_stdout,
+                           'stderr': rh.analyzer_stderr,
+                           'other_files': other_files,
+                           'analyzer_command': ' '.join(rh.analyzer_cmd),
+                           'return_code': rh.analyzer_returncode,
+                           'dependencies': dependencies}
+                if failure_queue is not None:
+                    failure_queue.put(failure)
+                else:
+                    write_failure_archive(
+                        failure,
+                        blob_store.BlobStore(os.path.join(output_dir,
+                                                          FAILURE_BLOB_DIR)))
+
                 LOG.error("Analyzing '" + source_file_name + "' with " +
                           action.analyzer_type + " failed.")
                 if rh.analyzer_stdout != '' and not quiet_output_on_stdout:
@@ -401,34 +602,100 @@ def check(check_data):
                     LOG.error(rh.analyzer_stderr)
                 return_codes = rh.analyzer_returncode
 
-                # Remove files that successfully analyzed earlier on.
-                plist_file = result_base + ".plist"
-                if os.path.exists(plist_file):
-                    os.remove(plist_file)
+                # Remove files that successfully analyzed earlier on, and the
+                # result file written from the output stream of the analyzer.
+                for failed_result in set([result_file,
+                                          rh.analyzer_result_file]):
+                    if os.path.exists(failed_result):
+                        os.remove(failed_result)
 
         progress_checked_num.value += 1
 
+        # The duration of the analysis is recorded for the scheduling of
+        # the next analysis.
+        durations = {}
+        if not skipped and not reused:
+            durations[get_action_key(action)] = time.time() - start_time
+
         return return_codes, skipped, reanalyzed, action.analyzer_type, \
-            result_file
+            result_file, reused, fingerprints, result_sources, durations
 
     except Exception as e:
         LOG.debug_analyzer(str(e))
         traceback.print_exc(file=sys.stdout)
-        return 1, skipped, reanalyzed, action.analyzer_type, None
+        return 1, skipped, reanalyzed, action.analyzer_type, None, \
+            reused, {}, {}, {}
+
+
+def get_action_key(action):
+    """
+    Return a key which identifies the analysis of a build action with an
+    analyzer between analyses.
+    """
+    return hashlib.md5(str(action.analyzer_type) + '_' +
+                       action.original_command).hexdigest()
+
+
+def schedule_actions(actions, durations):
+    """
+    Order the actions so that the longest ones are started first, and the
+    analysis does not end with a few long actions running alone.
+
+    The length of an action is the duration of its previous analysis if
+    it is known. Otherwise it is estimated from the size of its source
+    files, scaled by the average analysis speed of the known actions.
+    """
+    def source_size(action):
+        size = 0
+        for source in action.sources:
+            try:
+                size += os.path.getsize(source)
+            except OSError:
+                pass
+        return size
+
+    sizes = [source_size(action) for action in actions]
+    keys = [get_action_key(action) for action in actions]
+
+    known_time = 0.0
+    known_size = 0
+    for key, size in zip(keys, sizes):
+        if key in durations:
+            known_time += durations[key]
+            known_size += size
+
+    # Seconds of analysis per byte of source code.
+    speed = known_time / known_size if known_time and known_size else 1.0
+
+    costs = [durations[key] if key in durations else size * speed
+             for key, size in zip(keys, sizes)]
+
+    order = sorted(range(len(actions)), key=lambda i: costs[i], reverse=True)
+    return [actions[i] for i in order]
 
 
 def start_workers(actions, context, analyzer_config_map,
                   jobs, output_path, skip_handler, metadata,
-                  quiet_analyze, capture_analysis_output):
+                  quiet_analyze, capture_analysis_output, incremental=False):
     """
     Start the workers in the process pool.
     For every build action there is worker which makes the analysis.
+
+    In incremental mode the actions which have the same fingerprint as in
+    the previous analysis (stored in the metadata) are not analyzed again.
+
+    The failure archives of the failed analyses are written by a few low
+    priority archiver processes while the analysis goes on. The blobs of the
+    source files which are not archived in this analysis are removed
+    afterwards.
     """
 
     # Handle SIGINT to stop this script running.
     def signal_handler(*arg, **kwarg):
         try:
             pool.terminate()
+            for archiver in archivers:
+                archiver.terminate()
         finally:
             sys.exit(1)
 
@@ -437,18 +704,42 @@ def start_workers(actions, context, analyzer_config_map,
     # Start checking parallel.
     checked_var = multiprocessing.Value('i', 1)
     actions_num = multiprocessing.Value('i', len(actions))
+
+    fingerprints = None
+    config_hash = ''
+    if incremental:
+        fingerprints = metadata.setdefault('fingerprints', {})
+        config_hash = json.dumps(
+            {'versions': metadata['versions'],
+             'skip': skip_handler.skip_lines if skip_handler else []},
+            sort_keys=True)
+
+    archive_start_time = time.time()
+    failures = multiprocessing.Queue()
+    archivers = [multiprocessing.Process(target=archive_failures,
+                                         args=(failures, output_path))
+                 for _ in range(max(1, min(jobs, FAILURE_ARCHIVER_JOBS)))]
+    for archiver in archivers:
+        archiver.start()
+
     pool = multiprocessing.Pool(jobs,
                                 initializer=init_worker,
                                 initargs=(checked_var,
-                                          actions_num))
-
+                                          actions_num,
+                                          fingerprints,
+                                          config_hash,
+                                          failures))
+
+    # Start the longest actions first. Only the durations of the current
+    # actions are kept.
+    durations = metadata.get('action_durations', {})
+    actions = schedule_actions(actions, durations)
+    metadata['action_durations'] = {
+        key: durations[key] for key in map(get_action_key, actions)
+        if key in durations}
+
+    result_handler = WorkerResultHandler(metadata, len(actions))
     try:
-        # Workaround, equivalent of map.
-        # The main script does not get signal
-        # while map or map_async function is running.
-        # It is a python bug, this does not happen if a timeout is specified;
-        # then receive the interrupt immediately.
-
         analyzed_actions = [(build_action,
                              context,
                              analyzer_config_map,
@@ -458,12 +749,19 @@ def start_workers(actions, context, analyzer_config_map,
                              capture_analysis_output)
                             for build_action in actions]
 
-        pool.map_async(check,
-                       analyzed_actions,
-                       1,
-                       callback=lambda results: worker_result_handler(
-                           results, metadata, output_path)
-                       ).get(float('inf'))
+        # The results are processed as soon as an action is finished.
+        # Workaround: the main script does not get signal while waiting for
+        # the next result without a timeout. It is a python bug, this does
+        # not happen if a timeout is specified; then receive the interrupt
+        # immediately.
+        results = pool.imap_unordered(check, analyzed_actions)
+        while True:
+            try:
+                result_handler.handle(results.next(1))
+            except multiprocessing.TimeoutError:
+                continue
+            except StopIteration:
+                break
 
         pool.close()
     except Exception:
@@ -471,3 +769,14 @@ def start_workers(actions, context, analyzer_config_map,
         raise
     finally:
         pool.join()
+
+        # The analysis is finished, the remaining failure archives are
+        # written before returning.
+        for archiver in archivers:
+            failures.put(None)
+        for archiver in archivers:
+            archiver.join()
+
+        blob_store.BlobStore(os.path.join(output_path, FAILURE_BLOB_DIR)) \
+            .remove_unused(archive_start_time)
+        result_handler.summary()
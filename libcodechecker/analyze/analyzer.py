@@ -83,10 +83,23 @@ def perform_analysis(args, context, actions, metadata):
     analyzers, _ = analyzer_types.check_supported_analyzers(
         analyzers, context)
 
+    incremental = 'incremental' in args
+    incremental_collect = False
+
     ctu_collect = False
     ctu_analyze = False
     ctu_dir = ''
     if 'ctu_phases' in args:
+        if incremental:
+            # The result of a CTU analysis depends on other translation
+            # units too, which are not part of the fingerprints. Only the
+            # collected files of the unchanged translation units are reused.
+            LOG.warning("Incremental analysis is not supported with CTU, "
+                        "every compilation command will be analyzed. Only "
+                        "the CTU collect phase is incremental.")
+            incremental = False
+            incremental_collect = True
+
         ctu_collect = args.ctu_phases[0]
         ctu_analyze = args.ctu_phases[1]
         ctu_dir = os.path.join(args.output_path, 'ctu-dir')
@@ -112,9 +125,9 @@ def perform_analysis(args, context, actions, metadata):
                 continue
             metadata['checkers'][analyzer].append(check)
 
-    if ctu_collect:
+    if ctu_collect and not incremental_collect:
         shutil.rmtree(ctu_dir, ignore_errors=True)
-    elif ctu_analyze and not os.path.exists(ctu_dir):
+    elif not ctu_collect and ctu_analyze and not os.path.exists(ctu_dir):
         LOG.error("CTU directory:'" + ctu_dir + "' does not exist.")
         return
 
@@ -124,15 +137,28 @@ def perform_analysis(args, context, actions, metadata):
 
     if ctu_collect:
         ctu_manager.do_ctu_collect(actions, context, config_map, args.jobs,
-                                   __get_skip_handler(args), ctu_dir)
+                                   __get_skip_handler(args), ctu_dir,
+                                   metadata, incremental_collect)
 
     if ctu_analyze or (not ctu_analyze and not ctu_collect):
-        analysis_manager.start_workers(actions, context, config_map,
-                                       args.jobs, args.output_path,
-                                       __get_skip_handler(args),
-                                       metadata,
-                                       'quiet' in args,
-                                       'capture_analysis_output' in args)
+        # The compressed AST dumps are analyzed from a scratch directory.
+        scratch_dir = None
+        if ctu_analyze:
+            scratch_dir = ctu_manager.prepare_analysis_dir(ctu_dir)
+            if scratch_dir:
+                config_map[analyzer_types.CLANG_SA].ctu_dir = scratch_dir
+
+        try:
+            analysis_manager.start_workers(actions, context, config_map,
+                                           args.jobs, args.output_path,
+                                           __get_skip_handler(args),
+                                           metadata,
+                                           'quiet' in args,
+                                           'capture_analysis_output' in args,
+                                           incremental)
+        finally:
+            if scratch_dir:
+                shutil.rmtree(scratch_dir, ignore_errors=True)
 
     end_time = time.time()
     LOG.info("Analysis length: " + str(end_time - start_time) + " sec.")
@@ -140,5 +166,7 @@ def perform_analysis(args, context, actions, metadata):
     metadata['timestamps'] = {'begin': start_time,
                               'end': end_time}
 
-    if ctu_collect and ctu_analyze:
+    # In incremental mode the collected files are kept for the next
+    # collection.
+    if ctu_collect and ctu_analyze and not incremental_collect:
         shutil.rmtree(ctu_dir, ignore_errors=True)
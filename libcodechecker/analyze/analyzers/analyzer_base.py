@@ -7,14 +7,20 @@
 from abc import ABCMeta, abstractmethod
 import os
 import shlex
+import shutil
 import signal
 import subprocess
 import sys
+import tempfile
 
 from libcodechecker.logger import LoggerFactory
 
 LOG = LoggerFactory.get_new_logger('ANALYZER (BASE)')
 
+# At most this much of the streamed standard output of a successful analysis
+# is kept in memory.
+STREAMED_STDOUT_KEPT_SIZE = 1024 * 1024
+
 
 class SourceAnalyzer(object):
     """
@@ -98,8 +104,13 @@ class SourceAnalyzer(object):
         res_handler.analyzer_cmd = analyzer_cmd
         analyzer_cmd = ' '.join(analyzer_cmd)
         try:
-            ret_code, stdout, stderr = SourceAnalyzer.run_proc(analyzer_cmd,
-                                                               env)
+            if res_handler.streams_stdout:
+                ret_code, stdout, stderr = SourceAnalyzer.run_proc_streaming(
+                    analyzer_cmd, res_handler.handle_stdout_stream, env,
+                    stdout_capture_file=res_handler.stdout_capture_file)
+            else:
+                ret_code, stdout, stderr = SourceAnalyzer.run_proc(
+                    analyzer_cmd, env)
             res_handler.analyzer_returncode = ret_code
             res_handler.analyzer_stdout = stdout
             res_handler.analyzer_stderr = stderr
@@ -145,3 +156,76 @@ class SourceAnalyzer(object):
 
         (stdout, stderr) = proc.communicate()
         return proc.returncode, stdout, stderr
+
+    @staticmethod
+    def run_proc_streaming(command, stdout_handler, env=None, cwd=None,
+                           stdout_capture_file=None):
+        """
+        Run the given command and pass the lines of its stdout to the
+        stdout_handler while it is running. Return the return code and the
+        stdout and stderr outputs of the process, like run_proc().
+
+        The stdout is spooled to a temporary file as it is read, and only its
+        beginning is returned if the process succeeded, so the memory usage
+        does not depend on the length of the output. The whole stdout of a
+        successful process is copied into the stdout_capture_file if it is
+        given. The stderr is written into a temporary file, so the process is
+        not blocked by a full pipe.
+        """
+
+        def signal_handler(*args, **kwargs):
+            # Clang does not kill its child processes, so I have to.
+            try:
+                g_pid = proc.pid
+                os.killpg(g_pid, signal.SIGTERM)
+            finally:
+                sys.exit(os.EX_OK)
+
+        signal.signal(signal.SIGINT, signal_handler)
+        cmd = shlex.split(command)
+
+        with tempfile.TemporaryFile() as stderr_file, \
+                tempfile.SpooledTemporaryFile(
+                    STREAMED_STDOUT_KEPT_SIZE) as stdout_file:
+            proc = subprocess.Popen(cmd,
+                                    bufsize=-1,
+                                    env=env,
+                                    preexec_fn=os.setsid,
+                                    cwd=cwd,
+                                    stdout=subprocess.PIPE,
+                                    stderr=stderr_file)
+
+            def lines():
+                for line in proc.stdout:
+                    stdout_file.write(line)
+                    yield line.rstrip('\r\n')
+
+            try:
+                stdout_handler(lines())
+            finally:
+                # The rest of the output is read even if the handler did not
+                # need it, so the process can finish.
+                for _ in lines():
+                    pass
+                proc.wait()
+
+            stdout_size = stdout_file.tell()
+            stdout_file.seek(0)
+            if proc.returncode == 0 and stdout_capture_file and \
+                    stdout_size > 0:
+                with open(stdout_capture_file, 'w') as capture:
+                    shutil.copyfileobj(stdout_file, capture)
+                stdout_file.seek(0)
+
+            if proc.returncode == 0 and \
+                    stdout_size > STREAMED_STDOUT_KEPT_SIZE:
+                stdout = stdout_file.read(STREAMED_STDOUT_KEPT_SIZE) + \
+                    "\n[Truncated {0} bytes of the output.]\n".format(
+                        stdout_size - STREAMED_STDOUT_KEPT_SIZE)
+            else:
+                stdout = stdout_file.read()
+
+            stderr_file.seek(0)
+            stderr = stderr_file.read()
+
+        return proc.returncode, stdout, stderr
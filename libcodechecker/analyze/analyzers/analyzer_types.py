@@ -281,6 +281,7 @@ def __build_clangsa_config_handler(args, context):
         config_handler.ctu_dir = os.path.join(args.output_path,
                                               args.ctu_dir)
         config_handler.ctu_in_memory = 'ctu_in_memory' in args
+        config_handler.ctu_compress_ast = 'ctu_compress_ast' in args
         config_handler.log_file = args.logfile
         config_handler.path_env_extra = context.path_env_extra
         config_handler.ld_lib_path_extra = context.ld_lib_path_extra
@@ -22,6 +22,7 @@ class ClangSAConfigHandler(config_handler.AnalyzerConfigHandler):
         self.__checker_configs = []
         self.__ctu_dir = ''
         self.__ctu_in_memory = False
+        self.__ctu_compress_ast = False
         self.__log_file = ''
         self.__path_env_extra = ''
         self.__ld_lib_path_extra = ''
@@ -78,6 +79,14 @@ class ClangSAConfigHandler(config_handler.AnalyzerConfigHandler):
     def ctu_in_memory(self, value):
         self.__ctu_in_memory = value
 
+    @property
+    def ctu_compress_ast(self):
+        return self.__ctu_compress_ast
+
+    @ctu_compress_ast.setter
+    def ctu_compress_ast(self, value):
+        self.__ctu_compress_ast = value
+
     @property
     def log_file(self):
         return self.__log_file
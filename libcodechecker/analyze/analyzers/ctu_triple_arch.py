@@ -7,10 +7,19 @@
 Helpers for determining triple arch of a compile action
 """
 
+import re
 import shlex
 
+from libcodechecker.analyze import compiler_info_cache
 from libcodechecker.analyze.analyzers import analyzer_base
 
+# The compiler options which select the target of the compilation.
+TARGET_OPTION_PATTERN = re.compile(
+    r'^(--target=|-target$|--?m|-arch$|--sysroot|-isysroot)')
+
+TARGET_OPTIONS_WITH_ARG = frozenset(['-target', '-arch', '-isysroot',
+                                     '--sysroot'])
+
 
 def get_compile_command(action, config, source='', output=''):
     """ Generate a standardized and cleaned compile command serving as a base
@@ -32,20 +41,55 @@ def get_compile_command(action, config, source='', output=''):
     return cmd
 
 
+def get_target_flags(cmd):
+    """
+    Return the options of the compile command which influence the target
+    triple of the compilation.
+    """
+    # Some arguments contain multiple options, e.g. the extra arguments of
+    # the analyzer.
+    options = []
+    for arg in cmd:
+        try:
+            options.extend(shlex.split(arg))
+        except ValueError:
+            options.append(arg)
+
+    flags = []
+    i = 0
+    while i < len(options):
+        if TARGET_OPTION_PATTERN.match(options[i]):
+            flags.append(options[i])
+            if options[i] in TARGET_OPTIONS_WITH_ARG and \
+                    i + 1 < len(options):
+                i += 1
+                flags.append(options[i])
+        i += 1
+    return flags
+
+
 def get_triple_arch(action, source, config, env):
     """Returns the architecture part of the target triple for the given
     compilation command. """
 
     cmd = get_compile_command(action, config, source)
-    cmd.insert(1, '-###')
-    cmdstr = ' '.join(cmd)
-    _, stdout, stderr = analyzer_base.SourceAnalyzer.run_proc(cmdstr, env)
-    last_line = (stdout + stderr).splitlines()[-1]
-    res_cmd = shlex.split(last_line)
-    arch = ""
-    i = 0
-    while i < len(res_cmd) and res_cmd[i] != "-triple":
-        i += 1
-    if i < (len(res_cmd) - 1):
-        arch = res_cmd[i + 1].split("-")[0]
-    return arch
+
+    def get_arch():
+        cmdstr = ' '.join([cmd[0], '-###'] + cmd[1:])
+        _, stdout, stderr = \
+            analyzer_base.SourceAnalyzer.run_proc(cmdstr, env)
+        last_line = (stdout + stderr).splitlines()[-1]
+        res_cmd = shlex.split(last_line)
+        arch = ""
+        i = 0
+        while i < len(res_cmd) and res_cmd[i] != "-triple":
+            i += 1
+        if i < (len(res_cmd) - 1):
+            arch = res_cmd[i + 1].split("-")[0]
+        return arch
+
+    # The triple depends only on the target options, so the compiler is
+    # invoked only once for every distinct set of them.
+    return compiler_info_cache.get_cache().get(
+        'triple_arch', config.analyzer_binary,
+        [action.lang] + get_target_flags(cmd[1:]), get_arch)
@@ -38,6 +38,10 @@ class ResultHandler(object):
     __metaclass__ = ABCMeta
     # Handle the output stdout, or plist or both for an analyzer.
 
+    # Result handlers which process the standard output of the analyzer
+    # while it is running set this, see handle_stdout_stream().
+    streams_stdout = False
+
     def __init__(self, action, workspace):
         """
         Put the temporary files for the workspace.
@@ -47,6 +51,7 @@ class ResultHandler(object):
         self.__analyzer_cmd = []
         self.__analyzer_stdout = ''
         self.__analyzer_stderr = ''
+        self.__stdout_capture_file = None
         self.__severity_map = {}
         self.__skiplist_handler = None
         self.__analyzed_source_file = None
@@ -151,6 +156,22 @@ class ResultHandler(object):
         """
         self.__analyzer_stderr = stderr
 
+    @property
+    def stdout_capture_file(self):
+        """
+        File where the whole stdout of a successful streamed analysis is
+        copied, as only its beginning is kept in analyzer_stdout.
+        """
+        return self.__stdout_capture_file
+
+    @stdout_capture_file.setter
+    def stdout_capture_file(self, file_path):
+        """
+        File where the whole stdout of a successful streamed analysis is
+        copied, as only its beginning is kept in analyzer_stdout.
+        """
+        self.__stdout_capture_file = file_path
+
     @property
     def analyzed_source_file(self):
         """
@@ -203,6 +224,14 @@ class ResultHandler(object):
                 # There might be no result file if analysis failed.
                 LOG.debug(oserr)
 
+    def handle_stdout_stream(self, stdout):
+        """
+        Process the lines of the standard output of the analyzer while it is
+        running, if streams_stdout is set. The analyzer_stdout contains only
+        the beginning of a long output of a successful analysis then.
+        """
+        pass
+
     def postprocess_result(self):
         """
         Postprocess result if needed.
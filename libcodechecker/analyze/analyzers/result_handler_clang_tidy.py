@@ -16,16 +16,16 @@ LOG = LoggerFactory.get_new_logger('CLANG-TIDY RESULT HANDLER')
 
 def generate_plist_from_tidy_result(output_file, tidy_stdout):
     """
-    Generate a plist file from the clang tidy analyzer results.
+    Generate a plist file from the clang tidy analyzer results. The lines of
+    the output are converted and written into the plist file while they are
+    iterated.
     """
     parser = tidy_output_converter.OutputParser()
-
-    messages = parser.parse_messages(tidy_stdout)
+    messages = parser.iter_messages(tidy_stdout)
 
     plist_converter = tidy_output_converter.PListConverter()
-    plist_converter.add_messages(messages)
-
-    plist_converter.write_to_file(output_file)
+    with open(output_file, 'wb') as plist_file:
+        plist_converter.write_messages(messages, plist_file)
 
 
 class ClangTidyPlistToFile(ResultHandler):
@@ -33,15 +33,15 @@ class ClangTidyPlistToFile(ResultHandler):
     Create a plist file from clang-tidy results.
     """
 
-    def postprocess_result(self):
+    streams_stdout = True
+
+    def handle_stdout_stream(self, stdout):
         """
         Generate plist file which can be parsed and processed for
-        results which can be stored into the database.
+        results which can be stored into the database, from the output of
+        clang-tidy while it is running.
         """
-        output_file = self.analyzer_result_file
-        LOG.debug_analyzer(self.analyzer_stdout)
-        tidy_stdout = self.analyzer_stdout.splitlines()
-        generate_plist_from_tidy_result(output_file, tidy_stdout)
+        generate_plist_from_tidy_result(self.analyzer_result_file, stdout)
 
 
 class ClangTidyPlistToStdout(PlistToStdout):
@@ -49,12 +49,11 @@ class ClangTidyPlistToStdout(PlistToStdout):
     Print the clang tidy results to the standard output.
     """
 
-    def postprocess_result(self):
+    streams_stdout = True
+
+    def handle_stdout_stream(self, stdout):
         """
         Clang-tidy results are post processed to have the same format as the
-        clang static analyzer result files.
+        clang static analyzer result files, while clang-tidy is running.
         """
-
-        output_file = self.analyzer_result_file
-        tidy_stdout = self.analyzer_stdout.splitlines()
-        generate_plist_from_tidy_result(output_file, tidy_stdout)
+        generate_plist_from_tidy_result(self.analyzer_result_file, stdout)
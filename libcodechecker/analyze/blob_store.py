@@ -0,0 +1,163 @@
+# -------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -------------------------------------------------------------------------
+"""
+Content addressed store of compressed files. The files are compressed only
+once, and their compressed data is copied into the ZIP archives as it is.
+"""
+
+import hashlib
+import os
+import struct
+import sys
+import tempfile
+import time
+import zipfile
+import zlib
+
+# The CRC-32 checksum and the size of the uncompressed content precede the
+# raw deflate stream in the blob files, as they are needed by the ZIP entry.
+BLOB_HEADER = struct.Struct('<LQ')
+
+# The compressed data is written into the ZIP archives by following what
+# ZipFile.writestr() of Python 2.7 does, using the private members of the
+# ZipFile. With other Python versions the blobs are decompressed and written
+# by the public interface of the zipfile module.
+RAW_ENTRIES = sys.version_info[:2] == (2, 7) and \
+    hasattr(zipfile.ZipFile, '_writecheck')
+
+
+class BlobStore(object):
+    """
+    Blobs of the raw deflate stream of files, stored by the hash of their
+    content. The hashes of the files are cached while their modification
+    time and size are unchanged, because the same headers are stored for
+    many translation units.
+    """
+
+    def __init__(self, root):
+        self.__root = root
+        self.__hashes = {}
+
+    def __get_hash(self, path, file_stat):
+        cached = self.__hashes.get(path)
+        if cached and cached[:2] == (file_stat.st_mtime, file_stat.st_size):
+            return cached[2]
+
+        hasher = hashlib.sha256()
+        with open(path, 'rb') as content:
+            for chunk in iter(lambda: content.read(1024 * 1024), ''):
+                hasher.update(chunk)
+        content_hash = hasher.hexdigest()
+
+        self.__hashes[path] = (file_stat.st_mtime, file_stat.st_size,
+                               content_hash)
+        return content_hash
+
+    def put(self, path):
+        """
+        Store the file if its content is not stored yet, and return the path
+        of its blob.
+        """
+        file_stat = os.stat(path)
+        content_hash = self.__get_hash(path, file_stat)
+
+        blob_dir = os.path.join(self.__root, content_hash[:2])
+        blob_path = os.path.join(blob_dir, content_hash)
+        if os.path.isfile(blob_path):
+            # The modification time marks the blob as used.
+            os.utime(blob_path, None)
+            return blob_path
+
+        if not os.path.isdir(blob_dir):
+            try:
+                os.makedirs(blob_dir)
+            except OSError:
+                pass
+
+        # The blob is written into a temporary file first, so a partially
+        # written blob is never referred.
+        compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION,
+                                      zlib.DEFLATED, -15)
+        crc = 0
+        size = 0
+        with open(path, 'rb') as content, \
+                tempfile.NamedTemporaryFile(dir=blob_dir,
+                                            delete=False) as blob:
+            blob.write(BLOB_HEADER.pack(0, 0))
+            for chunk in iter(lambda: content.read(1024 * 1024), ''):
+                crc = zlib.crc32(chunk, crc)
+                size += len(chunk)
+                blob.write(compressor.compress(chunk))
+            blob.write(compressor.flush())
+
+            blob.seek(0)
+            blob.write(BLOB_HEADER.pack(crc & 0xffffffff, size))
+
+        os.rename(blob.name, blob_path)
+        return blob_path
+
+    def remove_unused(self, since):
+        """
+        Remove the blobs which were not stored or used since the given time,
+        so the store does not grow with the sources of earlier analyses.
+        """
+        if not os.path.isdir(self.__root):
+            return
+
+        for blob_dir in os.listdir(self.__root):
+            blob_dir = os.path.join(self.__root, blob_dir)
+            for blob in os.listdir(blob_dir):
+                blob = os.path.join(blob_dir, blob)
+                try:
+                    if os.stat(blob).st_mtime < since:
+                        os.remove(blob)
+                except OSError:
+                    pass
+
+            try:
+                os.rmdir(blob_dir)
+            except OSError:
+                # The directory is not empty.
+                pass
+
+
+def write_blob(archive, arcname, blob_path, file_stat):
+    """
+    Write the blob into the ZIP archive as a deflated entry without
+    compressing its content again.
+    """
+    with open(blob_path, 'rb') as blob:
+        crc, size = BLOB_HEADER.unpack(blob.read(BLOB_HEADER.size))
+        data = blob.read()
+
+    zinfo = zipfile.ZipInfo(arcname,
+                            time.localtime(file_stat.st_mtime)[:6])
+    zinfo.external_attr = (file_stat.st_mode & 0xFFFF) << 16
+    zinfo.compress_type = zipfile.ZIP_DEFLATED
+    zinfo.file_size = size
+    zinfo.compress_size = len(data)
+    zinfo.CRC = crc
+
+    if not RAW_ENTRIES or \
+            not all(hasattr(archive, member) for member in
+                    ['fp', '_didModify', 'filelist', 'NameToInfo']):
+        decompressor = zlib.decompressobj(-15)
+        content = decompressor.decompress(data) + decompressor.flush()
+        archive.writestr(zinfo, content)
+        return
+
+    # The same as ZipFile.writestr() of Python 2.7 does after compressing
+    # the content.
+    zip64 = zinfo.file_size > zipfile.ZIP64_LIMIT or \
+        zinfo.compress_size > zipfile.ZIP64_LIMIT
+    zinfo.header_offset = archive.fp.tell()
+    archive._writecheck(zinfo)
+    archive._didModify = True
+    archive.fp.write(zinfo.FileHeader(zip64))
+    archive.fp.write(data)
+    archive.fp.flush()
+    archive.filelist.append(zinfo)
+    archive.NameToInfo[zinfo.filename] = zinfo
@@ -0,0 +1,127 @@
+# -------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -------------------------------------------------------------------------
+"""
+Persistent cache of the information queried from compilers (default include
+paths, targets and target triples), so the compilers are not invoked again
+for the same query in every analysis.
+
+An entry is keyed by the kind of the information, the compiler binary, its
+modification time and the compiler flags which influence the result, so
+replacing the compiler invalidates its entries.
+"""
+
+from distutils.spawn import find_executable
+import fcntl
+import json
+import os
+import tempfile
+
+from libcodechecker import util
+from libcodechecker.logger import LoggerFactory
+
+LOG = LoggerFactory.get_new_logger('COMPILER INFO CACHE')
+
+CACHE_FILE_NAME = 'compiler_info_cache.json'
+
+
+class CompilerInfoCache(object):
+    """
+    The entries are loaded once per process. New entries are merged into
+    the cache file right away, so the processes of a parallel analysis can
+    share the results of each other. The merge holds a lock on a file next
+    to the cache file, so the entries of concurrent processes are not lost.
+    """
+
+    def __init__(self, cache_file):
+        self.__cache_file = cache_file
+        self.__entries = self.__load()
+        self.__compiler_mtimes = {}
+
+    def __load(self):
+        try:
+            with open(self.__cache_file, 'r') as cache:
+                entries = json.load(cache)
+            if isinstance(entries, dict):
+                return entries
+        except (IOError, ValueError) as ex:
+            LOG.debug("Compiler info cache '{0}' could not be read: {1}"
+                      .format(self.__cache_file, ex))
+        return {}
+
+    def __save(self, key, value):
+        """
+        Merge the new entry into the cache file. The file is replaced
+        atomically so concurrent readers never see a partial file.
+        """
+        cache_dir = os.path.dirname(self.__cache_file)
+        try:
+            if not os.path.isdir(cache_dir):
+                os.makedirs(cache_dir)
+
+            with open(self.__cache_file + '.lock', 'a') as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+
+                entries = self.__load()
+                entries[key] = value
+
+                fd, tmp_file = tempfile.mkstemp(dir=cache_dir)
+                with os.fdopen(fd, 'w') as cache:
+                    json.dump(entries, cache)
+                os.rename(tmp_file, self.__cache_file)
+
+            # The entries of the other processes are used from now on too.
+            self.__entries.update(entries)
+        except (IOError, OSError) as ex:
+            LOG.debug("Compiler info cache '{0}' could not be written: {1}"
+                      .format(self.__cache_file, ex))
+
+    def __get_compiler_mtime(self, compiler):
+        if compiler not in self.__compiler_mtimes:
+            path = compiler if os.path.isabs(compiler) \
+                else find_executable(compiler)
+            try:
+                mtime = os.path.getmtime(os.path.realpath(path))
+            except (OSError, TypeError, AttributeError):
+                mtime = None
+            self.__compiler_mtimes[compiler] = mtime
+
+        return self.__compiler_mtimes[compiler]
+
+    def get(self, kind, compiler, flags, compute):
+        """
+        Return the information of the given kind queried from the compiler
+        with the given flags. The compute function is called to query the
+        compiler if the information is not cached yet. None results are not
+        cached.
+        """
+        key = json.dumps([kind,
+                          compiler,
+                          self.__get_compiler_mtime(compiler),
+                          flags])
+
+        if key in self.__entries:
+            return self.__entries[key]
+
+        value = compute()
+        if value is not None:
+            self.__entries[key] = value
+            self.__save(key, value)
+        return value
+
+
+__cache = None
+
+
+def get_cache():
+    """
+    Return the compiler info cache stored in the user's CodeChecker
+    workspace.
+    """
+    global __cache
+    if __cache is None:
+        __cache = CompilerInfoCache(
+            os.path.join(util.get_default_workspace(), CACHE_FILE_NAME))
+    return __cache
@@ -8,14 +8,21 @@ Arranges the 1st phase of 2 phase executions for CTU
 """
 
 import glob
+import gzip
+import hashlib
+import heapq
+import json
+import mmap
 import multiprocessing
 import os
 import shutil
 import signal
+import struct
 import sys
 import tempfile
 import traceback
 
+from libcodechecker.analyze import analysis_manager
 from libcodechecker.analyze.analyzers import analyzer_base
 from libcodechecker.analyze.analyzers import analyzer_types
 from libcodechecker.analyze.analyzers import ctu_triple_arch
@@ -24,6 +31,43 @@ from libcodechecker.logger import LoggerFactory
 
 LOG = LoggerFactory.get_new_logger('CTU MANAGER')
 
+# The number of function map lines which are sorted in memory at once when
+# the global function map is built.
+FUNC_MAP_CHUNK_SIZE = 1000000
+
+# The global function map of an architecture in the CTU directory.
+CTU_FUNC_MAP_FILE = 'externalFnMap.txt'
+
+# The global function map is accompanied by a table of the offsets of its
+# lines, so a function can be looked up by binary search.
+FUNC_MAP_INDEX_SUFFIX = '.idx'
+FUNC_MAP_OFFSET = struct.Struct('<Q')
+
+# In incremental mode the function maps of the translation units are kept in
+# this folder, and the sorted lines of all of them, tagged with the key of
+# their translation unit, are kept next to the global function map. So the
+# global map is updated by replacing the lines of the changed translation
+# units only.
+FUNC_MAP_FOLDER = 'externalFnMaps'
+FUNC_MAP_LINES_SUFFIX = '.lines'
+
+# The fingerprints of the translation units collected into the CTU directory.
+FINGERPRINTS_FILE = 'fingerprints.json'
+
+# The AST dumps are stored by the fingerprint of their translation unit in
+# this folder, optionally compressed. The AST dumps of the sources (which are
+# referred by the function maps) are links to the stored AST dumps.
+AST_STORE_FOLDER = 'ast-store'
+AST_COMPRESSED_SUFFIX = '.gz'
+
+# The AST dumps are compressed fast rather than small.
+AST_COMPRESS_LEVEL = 1
+
+# Incremental collection. The fingerprints of the previous collection are
+# None if every translation unit has to be collected.
+previous_fingerprints = None
+config_fingerprint = ''
+
 
 def generate_func_map_lines(fnmap_dir):
     """ Iterate over all lines of input files in random order. """
@@ -32,41 +76,122 @@ def generate_func_map_lines(fnmap_dir):
     for filename in files:
         with open(filename, 'r') as in_file:
             for line in in_file:
-                yield line
+                if line.strip():
+                    yield line if line.endswith('\n') else line + '\n'
 
 
-def create_global_ctu_function_map(func_map_lines):
-    """ Takes iterator of individual function maps and creates a global map
-    keeping only unique names. We leave conflicting names out of CTU.
-    A function map contains the id of a function (mangled name) and the
-    originating source (the corresponding AST file) name."""
+def __write_sorted_run(lines, tmp_dir):
+    lines.sort()
+    with tempfile.NamedTemporaryFile(mode='w', dir=tmp_dir,
+                                     delete=False) as run_file:
+        run_file.writelines(lines)
+        return run_file.name
 
-    mangled_to_asts = {}
 
+def sort_func_map_lines(func_map_lines, tmp_dir,
+                        chunk_size=FUNC_MAP_CHUNK_SIZE):
+    """ Sort the function map lines by external merge sort. At most
+    chunk_size lines are sorted in memory at once and written into a sorted
+    run file in tmp_dir. The runs are merged while the sorted lines are
+    iterated. """
+
+    run_files = []
+    chunk = []
     for line in func_map_lines:
-        mangled_name, ast_file = line.strip().split(' ', 1)
-        # We collect all occurences of a function name into a list
-        if mangled_name not in mangled_to_asts:
-            mangled_to_asts[mangled_name] = {ast_file}
-        else:
-            mangled_to_asts[mangled_name].add(ast_file)
+        chunk.append(line)
+        if len(chunk) >= chunk_size:
+            run_files.append(__write_sorted_run(chunk, tmp_dir))
+            chunk = []
+    if chunk:
+        run_files.append(__write_sorted_run(chunk, tmp_dir))
+
+    runs = [open(run_file, 'r') for run_file in run_files]
+    try:
+        for line in heapq.merge(*runs):
+            yield line
+    finally:
+        for run in runs:
+            run.close()
+
+
+def create_global_ctu_function_map(sorted_func_map_lines):
+    """ Takes iterator of the sorted lines of the individual function maps
+    and iterates over the (mangled name, ast file) pairs of the global map
+    keeping only unique names. We leave conflicting names out of CTU.
+    A function map contains the id of a function (mangled name) and the
+    originating source (the corresponding AST file) name.
 
-    mangled_ast_pairs = []
+    The lines of a mangled name are adjacent in the sorted input, because
+    the name is followed by a space which precedes every character of the
+    mangled names. So only the AST files of one name are kept in memory."""
 
-    for mangled_name, ast_files in mangled_to_asts.items():
-        if len(ast_files) == 1:
-            mangled_ast_pairs.append((mangled_name, ast_files.pop()))
+    current_name = None
+    ast_files = set()
 
-    return mangled_ast_pairs
+    for line in sorted_func_map_lines:
+        mangled_name, ast_file = line.strip().split(' ', 1)
+        if mangled_name != current_name:
+            if len(ast_files) == 1:
+                yield current_name, ast_files.pop()
+            current_name = mangled_name
+            ast_files = set()
+        ast_files.add(ast_file)
+
+    if len(ast_files) == 1:
+        yield current_name, ast_files.pop()
 
 
 def write_global_map(ctu_dir, arch, ctu_func_map_file, mangled_ast_pairs):
-    """ Write (mangled function name, ast file) pairs into final file. """
+    """ Write (mangled function name, ast file) pairs into final file and
+    the offsets of its lines into the index file next to it. """
 
     extern_fns_map_file = os.path.join(ctu_dir, arch, ctu_func_map_file)
-    with open(extern_fns_map_file, 'w') as out_file:
+    with open(extern_fns_map_file, 'w') as out_file, \
+            open(extern_fns_map_file + FUNC_MAP_INDEX_SUFFIX,
+                 'wb') as index_file:
+        offset = 0
         for mangled_name, ast_file in mangled_ast_pairs:
-            out_file.write('%s %s\n' % (mangled_name, ast_file))
+            line = '%s %s\n' % (mangled_name, ast_file)
+            out_file.write(line)
+            index_file.write(FUNC_MAP_OFFSET.pack(offset))
+            offset += len(line)
+
+
+def lookup_global_map(extern_fns_map_file, mangled_name):
+    """ Return the AST file of the function from the global function map, or
+    None if the function is not in the map. The map and its offset table are
+    memory mapped and searched by binary search, so they are not read into
+    memory. """
+
+    index_path = extern_fns_map_file + FUNC_MAP_INDEX_SUFFIX
+    if not os.path.getsize(index_path):
+        return None
+
+    with open(extern_fns_map_file, 'rb') as map_file, \
+            open(index_path, 'rb') as index_file:
+        fn_map = mmap.mmap(map_file.fileno(), 0, access=mmap.ACCESS_READ)
+        index = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            def read_line(i):
+                offset = FUNC_MAP_OFFSET.unpack_from(
+                    index, i * FUNC_MAP_OFFSET.size)[0]
+                end = fn_map.find('\n', offset)
+                return fn_map[offset:end].split(' ', 1)
+
+            low, high = 0, len(index) // FUNC_MAP_OFFSET.size
+            while low < high:
+                middle = (low + high) // 2
+                name, ast_file = read_line(middle)
+                if name == mangled_name:
+                    return ast_file
+                elif name < mangled_name:
+                    low = middle + 1
+                else:
+                    high = middle
+            return None
+        finally:
+            fn_map.close()
+            index.close()
 
 
 def merge_ctu_func_maps(ctu_dir, ctu_func_map_file, ctu_temp_fnmap_folder):
@@ -77,7 +202,9 @@ def merge_ctu_func_maps(ctu_dir, ctu_func_map_file, ctu_temp_fnmap_folder):
     These function maps contain the mangled names of functions and the source
     (AST generated from the source) which had them.
     These files should be merged at the end into a global map file:
-    ctu_func_map_file."""
+    ctu_func_map_file. The global map is sorted by the mangled names and is
+    built by external merge sort, so the memory usage does not depend on the
+    number of the functions."""
 
     triple_arches = glob.glob(os.path.join(ctu_dir, '*'))
     for triple_path in triple_arches:
@@ -86,36 +213,193 @@ def merge_ctu_func_maps(ctu_dir, ctu_func_map_file, ctu_temp_fnmap_folder):
             fnmap_dir = os.path.join(ctu_dir, triple_arch,
                                      ctu_temp_fnmap_folder)
 
-            func_map_lines = generate_func_map_lines(fnmap_dir)
-            mangled_ast_pairs = create_global_ctu_function_map(func_map_lines)
-            write_global_map(ctu_dir, triple_arch, ctu_func_map_file,
-                             mangled_ast_pairs)
+            sort_dir = tempfile.mkdtemp(dir=triple_path)
+            try:
+                func_map_lines = generate_func_map_lines(fnmap_dir)
+                sorted_lines = sort_func_map_lines(func_map_lines, sort_dir)
+                mangled_ast_pairs = \
+                    create_global_ctu_function_map(sorted_lines)
+                write_global_map(ctu_dir, triple_arch, ctu_func_map_file,
+                                 mangled_ast_pairs)
+            finally:
+                # Remove all temporary files
+                shutil.rmtree(sort_dir, ignore_errors=True)
+                shutil.rmtree(fnmap_dir, ignore_errors=True)
+
+
+def __generate_tagged_lines(fnmap_dir, tu_keys):
+    """ Iterate over the lines of the function maps of the given translation
+    units, tagged with the key of their translation unit. """
+
+    for tu_key in tu_keys:
+        fnmap_file = os.path.join(fnmap_dir, tu_key)
+        if not os.path.isfile(fnmap_file):
+            continue
+        with open(fnmap_file, 'r') as in_file:
+            for line in in_file:
+                if line.strip():
+                    yield line.rstrip('\n') + ' ' + tu_key + '\n'
 
-            # Remove all temporary files
-            shutil.rmtree(fnmap_dir, ignore_errors=True)
 
+def __untag_lines(tagged_lines, lines_file):
+    """ Write the tagged lines into the lines file while iterating over them
+    without their tag. """
 
-def generate_ast(triple_arch, action, source, config, env):
-    """ Generates ASTs for the current compilation command. """
+    for line in tagged_lines:
+        lines_file.write(line)
+        yield line.rsplit(' ', 1)[0] + '\n'
 
-    ast_joined_path = os.path.join(config.ctu_dir, triple_arch, 'ast',
+
+def update_ctu_func_map(ctu_dir, triple_arch, ctu_func_map_file,
+                        changed_keys, stale_keys):
+    """ Update the global function map of the architecture incrementally.
+
+    The lines of the stale translation units (which were changed or removed
+    since the previous collection) are left out of the kept sorted lines of
+    the previous collection, and the sorted lines of the function maps of the
+    changed translation units are merged into them. Only the function maps of
+    the changed translation units are read and sorted."""
+
+    triple_path = os.path.join(ctu_dir, triple_arch)
+    fnmap_dir = os.path.join(triple_path, FUNC_MAP_FOLDER)
+    lines_path = os.path.join(triple_path,
+                              ctu_func_map_file + FUNC_MAP_LINES_SUFFIX)
+
+    sort_dir = tempfile.mkdtemp(dir=triple_path)
+    old_lines = open(lines_path, 'r') if os.path.isfile(lines_path) else []
+    try:
+        kept_lines = (line for line in old_lines
+                      if line.rsplit(' ', 1)[1].rstrip('\n')
+                      not in stale_keys)
+        new_lines = sort_func_map_lines(
+            __generate_tagged_lines(fnmap_dir, sorted(changed_keys)),
+            sort_dir)
+
+        with tempfile.NamedTemporaryFile(mode='w', dir=triple_path,
+                                         delete=False) as lines_file:
+            sorted_lines = __untag_lines(heapq.merge(kept_lines, new_lines),
+                                         lines_file)
+            write_global_map(ctu_dir, triple_arch, ctu_func_map_file,
+                             create_global_ctu_function_map(sorted_lines))
+        os.rename(lines_file.name, lines_path)
+    finally:
+        if old_lines:
+            old_lines.close()
+        shutil.rmtree(sort_dir, ignore_errors=True)
+
+
+def get_ast_path(ctu_dir, triple_arch, source):
+    """ Returns the path of the AST dump of the source file, which is a link
+    to the AST dump in the AST store. """
+
+    ast_joined_path = os.path.join(ctu_dir, triple_arch, 'ast',
                                    os.path.realpath(source)[1:] + '.ast')
-    ast_path = os.path.abspath(ast_joined_path)
-    ast_dir = os.path.dirname(ast_path)
-    if not os.path.isdir(ast_dir):
+    return os.path.abspath(ast_joined_path)
+
+
+def get_ast_store_path(ctu_dir, triple_arch, ast_key):
+    """ Returns the path of the uncompressed AST dump of the key in the AST
+    store. """
+
+    return os.path.abspath(os.path.join(ctu_dir, triple_arch, AST_STORE_FOLDER,
+                                        ast_key + '.ast'))
+
+
+def find_ast(ctu_dir, triple_arch, ast_key):
+    """ Returns the path of the stored AST dump of the key, which is either
+    compressed or not, or None if the AST dump is not stored. """
+
+    ast_path = get_ast_store_path(ctu_dir, triple_arch, ast_key)
+    for path in [ast_path, ast_path + AST_COMPRESSED_SUFFIX]:
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def get_tu_key(action, source):
+    """ Return a key which identifies the collection of a source file of a
+    build action between collections. """
+
+    return hashlib.md5(action.original_command + '_' + source).hexdigest()
+
+
+def get_collect_fingerprint(compile_cmd, triple_arch, dependencies):
+    """ Create the fingerprint of the collection of a translation unit from
+    the compile command (which contains the compiler and the compilation
+    options), the target architecture, the version of the analyzer, the
+    function mapping tool and the content of the source file and of the
+    headers it depends on. The fingerprint is the key of the AST dump of the
+    translation unit in the AST store too. """
+
+    hasher = hashlib.sha256()
+    hasher.update(config_fingerprint)
+    hasher.update(' '.join(compile_cmd))
+    hasher.update(triple_arch)
+    for dependency in sorted(dependencies):
+        hasher.update(dependency)
+        hasher.update(analysis_manager.get_file_hash(dependency))
+    return hasher.hexdigest()
+
+
+def __makedirs(path):
+    if not os.path.isdir(path):
         try:
-            os.makedirs(ast_dir)
+            os.makedirs(path)
         except OSError:
             pass
 
+
+def generate_ast(triple_arch, action, source, config, env, ast_key):
+    """ Generates ASTs for the current compilation command into the AST
+    store, compressed if it is configured. The AST dump is written into a
+    temporary file first, so the workers generating the same AST dump do not
+    see each other's partial dumps. """
+
+    ast_path = get_ast_store_path(config.ctu_dir, triple_arch, ast_key)
+    __makedirs(os.path.dirname(ast_path))
+    tmp_path = '%s.%d.tmp' % (ast_path, os.getpid())
+
     cmd = ctu_triple_arch.get_compile_command(action, config, source)
-    cmd.extend(['-emit-ast', '-w', '-o', ast_path])
+    cmd.extend(['-emit-ast', '-w', '-o', tmp_path])
 
     cmdstr = ' '.join(cmd)
     LOG.debug_analyzer("Generating AST using '%s'" % cmdstr)
     ret_code, _, _ = analyzer_base.SourceAnalyzer.run_proc(cmdstr, env)
     if ret_code != 0:
         LOG.error("Error generating AST using '%s'", cmdstr)
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return
+
+    if config.ctu_compress_ast:
+        with open(tmp_path, 'rb') as ast_file, \
+                gzip.open(tmp_path + AST_COMPRESSED_SUFFIX, 'wb',
+                          AST_COMPRESS_LEVEL) as compressed:
+            shutil.copyfileobj(ast_file, compressed)
+        os.remove(tmp_path)
+        os.rename(tmp_path + AST_COMPRESSED_SUFFIX,
+                  ast_path + AST_COMPRESSED_SUFFIX)
+    else:
+        os.rename(tmp_path, ast_path)
+
+
+def link_ast(ctu_dir, triple_arch, source, ast_key):
+    """ Link the AST dump of the source file to the stored AST dump of the
+    key. The link is relative, so the CTU directory can be moved. """
+
+    stored_ast = find_ast(ctu_dir, triple_arch, ast_key)
+    if not stored_ast:
+        return
+
+    ast_path = get_ast_path(ctu_dir, triple_arch, source)
+    ast_dir = os.path.dirname(ast_path)
+    __makedirs(ast_dir)
+
+    # The link is replaced atomically, the analysis of another translation
+    # unit may read it.
+    tmp_link = '%s.%d.tmp' % (ast_path, os.getpid())
+    os.symlink(os.path.relpath(stored_ast, ast_dir), tmp_link)
+    os.rename(tmp_link, ast_path)
 
 
 def func_map_list_src_to_ast(func_src_list, ctu_in_memory):
@@ -140,8 +424,10 @@ def func_map_list_src_to_ast(func_src_list, ctu_in_memory):
 
 
 def map_functions(triple_arch, action, source, config, env,
-                  func_map_cmd, temp_fnmap_folder):
-    """ Generate function map file for the current source. """
+                  func_map_cmd, temp_fnmap_folder, tu_key=None):
+    """ Generate function map file for the current source. The function map
+    is written into a temporary file, or into the file named by the key of
+    the translation unit if it is given. """
 
     cmd = ctu_triple_arch.get_compile_command(action, config)
     cmd[0] = func_map_cmd
@@ -166,20 +452,73 @@ def map_functions(triple_arch, action, source, config, env,
         except OSError:
             pass
 
-    if func_ast_list:
+    if tu_key:
+        # The empty function maps are kept too, so the translation unit is
+        # known to be collected.
+        with open(os.path.join(extern_fns_map_folder, tu_key),
+                  'w') as out_file:
+            out_file.writelines(line + "\n" for line in func_ast_list)
+    elif func_ast_list:
         with tempfile.NamedTemporaryFile(mode='w',
                                          dir=extern_fns_map_folder,
                                          delete=False) as out_file:
             out_file.write("\n".join(func_ast_list) + "\n")
 
 
+def init_worker(fingerprints=None, config_hash=''):
+    global previous_fingerprints, config_fingerprint
+    previous_fingerprints = fingerprints
+    config_fingerprint = config_hash
+
+
+def __is_unchanged(tu_key, fingerprint, triple_arch, source, config):
+    """ Returns whether the translation unit has the same fingerprint as at
+    the previous collection and its collected files are still present. """
+
+    previous = previous_fingerprints.get(tu_key)
+    if not fingerprint or not previous or \
+            previous['fingerprint'] != fingerprint or \
+            previous['triple_arch'] != triple_arch:
+        return False
+
+    fnmap_file = os.path.join(config.ctu_dir, triple_arch, FUNC_MAP_FOLDER,
+                              tu_key)
+    if not os.path.isfile(fnmap_file):
+        return False
+
+    return config.ctu_in_memory or \
+        os.path.isfile(get_ast_path(config.ctu_dir, triple_arch, source))
+
+
+def __get_source_hash(compile_cmd, triple_arch, source):
+    """ Returns the key of the AST dump of a translation unit whose headers
+    are not known. Such an AST dump is not reused from a previous
+    collection. """
+
+    hasher = hashlib.sha256()
+    hasher.update(config_fingerprint)
+    hasher.update(' '.join(compile_cmd))
+    hasher.update(triple_arch)
+    hasher.update(analysis_manager.get_file_hash(source))
+    return hasher.hexdigest()
+
+
 def collect_build_action(params):
-    """ Preprocess sources by generating all data needed by CTU analysis. """
+    """ Preprocess sources by generating all data needed by CTU analysis.
+
+    In incremental mode the AST dumps are stored by their fingerprint, so
+    identical translation units (e.g. of several build configurations) share
+    their AST dump. Otherwise they are stored by the hash of the source.
+
+    In incremental mode the fingerprints of the collected translation units
+    are returned with whether they changed since the previous collection. """
 
     action, context, analyzer_config_map, skip_handler, \
         ctu_temp_fnmap_folder = params
 
+    collected = []
     try:
+        dependencies = None
         for source in action.sources:
             if skip_handler and skip_handler.should_skip(source):
                 continue
@@ -192,22 +531,154 @@ def collect_build_action(params):
             triple_arch = ctu_triple_arch.get_triple_arch(action, source,
                                                           config,
                                                           analyzer_environment)
+            compile_cmd = ctu_triple_arch.get_compile_command(action, config,
+                                                              source)
+
+            # The headers of the translation unit are collected only for the
+            # fingerprint of an incremental collection.
+            fingerprint = None
+            if previous_fingerprints is not None:
+                try:
+                    if dependencies is None:
+                        dependencies = \
+                            analysis_manager.create_dependencies(action)
+
+                    fingerprint = get_collect_fingerprint(compile_cmd,
+                                                          triple_arch,
+                                                          dependencies)
+                except Exception as ex:
+                    LOG.debug("Couldn't create the fingerprint of the "
+                              "collection of " + source + ":")
+                    LOG.debug(str(ex))
+
+            tu_key = None
+            if previous_fingerprints is not None:
+                tu_key = get_tu_key(action, source)
+                unchanged = __is_unchanged(tu_key, fingerprint, triple_arch,
+                                           source, config)
+                collected.append((tu_key,
+                                  {'fingerprint': fingerprint,
+                                   'triple_arch': triple_arch,
+                                   'source': source},
+                                  not unchanged))
+                if unchanged:
+                    LOG.debug_analyzer("Collection of " + source +
+                                       " is skipped, it is unchanged since "
+                                       "the previous collection.")
+                    continue
+
             if not config.ctu_in_memory:
-                generate_ast(triple_arch, action, source, config,
-                             analyzer_environment)
+                ast_key = fingerprint or \
+                    __get_source_hash(compile_cmd, triple_arch, source)
+                if fingerprint and \
+                        find_ast(config.ctu_dir, triple_arch, ast_key):
+                    LOG.debug_analyzer("AST of " + source + " is already "
+                                       "stored.")
+                else:
+                    generate_ast(triple_arch, action, source, config,
+                                 analyzer_environment, ast_key)
+                link_ast(config.ctu_dir, triple_arch, source, ast_key)
+
             map_functions(triple_arch, action, source, config,
                           analyzer_environment, context.ctu_func_map_cmd,
-                          ctu_temp_fnmap_folder)
+                          ctu_temp_fnmap_folder, tu_key)
     except Exception as ex:
         LOG.debug_analyzer(str(ex))
         traceback.print_exc(file=sys.stdout)
         raise
 
+    return collected
+
+
+def __remove_collected_files(ctu_dir, stale, current):
+    """ Remove the function maps of the stale translation units which were
+    collected for a different architecture or are not collected anymore, the
+    AST dump links of the sources which are not collected anymore and the
+    stored AST dumps which are not linked anymore. """
+
+    current_asts = set(get_ast_path(ctu_dir, entry['triple_arch'],
+                                    entry['source'])
+                       for entry in current.values())
+
+    for tu_key, entry in stale.items():
+        current_entry = current.get(tu_key)
+        if current_entry and \
+                current_entry['triple_arch'] == entry['triple_arch']:
+            continue
+
+        fnmap_file = os.path.join(ctu_dir, entry['triple_arch'],
+                                  FUNC_MAP_FOLDER, tu_key)
+        ast_file = get_ast_path(ctu_dir, entry['triple_arch'],
+                                entry['source'])
+        for collected_file in [fnmap_file, ast_file]:
+            if collected_file in current_asts:
+                continue
+            try:
+                os.remove(collected_file)
+            except OSError:
+                pass
+
+    linked_asts = set(os.path.realpath(ast) for ast in current_asts)
+    for store_dir in glob.glob(os.path.join(ctu_dir, '*', AST_STORE_FOLDER)):
+        for stored_ast in os.listdir(store_dir):
+            stored_ast = os.path.realpath(os.path.join(store_dir, stored_ast))
+            if stored_ast not in linked_asts:
+                os.remove(stored_ast)
+
+
+def update_ctu_func_maps(ctu_dir, ctu_func_map_file, previous, collected):
+    """ Update the global function maps of the architectures whose
+    translation units changed since the previous collection, and return the
+    fingerprints of the current collection. """
+
+    current = {}
+    changed_keys = set()
+    for tu_key, entry, changed in collected:
+        current[tu_key] = entry
+        if changed:
+            changed_keys.add(tu_key)
+
+    # The function map lines of the changed and of the removed translation
+    # units are replaced in the global maps.
+    stale = {tu_key: entry for tu_key, entry in previous.items()
+             if tu_key in changed_keys or tu_key not in current}
+    stale_keys = changed_keys | set(stale)
+
+    triple_arches = set(entry['triple_arch'] for entry in stale.values())
+    triple_arches.update(current[tu_key]['triple_arch']
+                         for tu_key in changed_keys)
+
+    LOG.info("CTU collect: {0} of {1} translation units changed, {2} "
+             "removed since the previous collection."
+             .format(len(changed_keys), len(current),
+                     len(set(stale) - set(current))))
+
+    __remove_collected_files(ctu_dir, stale, current)
+
+    for triple_arch in triple_arches:
+        arch_changed_keys = set(tu_key for tu_key in changed_keys
+                                if current[tu_key]['triple_arch'] ==
+                                triple_arch)
+        update_ctu_func_map(ctu_dir, triple_arch, ctu_func_map_file,
+                            arch_changed_keys, stale_keys)
+
+    return current
+
 
 def do_ctu_collect(actions, context, analyzer_config_map,
-                   jobs, skip_handler, ctu_dir):
+                   jobs, skip_handler, ctu_dir, metadata=None,
+                   incremental=False):
     """
     Start the workers for CTU collect phase.
+
+    The fingerprint of the translation units contains the versions of the
+    analyzers from the metadata, so the AST dumps of another analyzer
+    version are not reused.
+
+    In incremental mode the translation units which have the same
+    fingerprint as in the previous collection (stored in the CTU directory)
+    are not collected again, and the global function map is updated only
+    with the function maps of the changed translation units.
     """
 
     def signal_handler(*arg, **kwarg):
@@ -217,10 +688,42 @@ def do_ctu_collect(actions, context, analyzer_config_map,
             sys.exit(1)
 
     ctu_temp_fnmap_folder = 'tmpExternalFnMaps'
-    ctu_func_map_file = 'externalFnMap.txt'
+    ctu_func_map_file = CTU_FUNC_MAP_FILE
+
+    config = analyzer_config_map.get(analyzer_types.CLANG_SA)
+    config_hash = json.dumps(
+        {'versions': metadata['versions'] if metadata else {},
+         'func_map_cmd': context.ctu_func_map_cmd,
+         'in_memory': config.ctu_in_memory},
+        sort_keys=True)
+
+    fingerprints = None
+    fingerprints_file = os.path.join(ctu_dir, FINGERPRINTS_FILE)
+    if incremental:
+        ctu_temp_fnmap_folder = FUNC_MAP_FOLDER
+
+        if os.path.isfile(fingerprints_file):
+            with open(fingerprints_file, 'r') as fp_file:
+                previous = json.load(fp_file)
+            if previous.get('config') == config_hash:
+                fingerprints = previous['fingerprints']
+
+        if fingerprints is None:
+            # The contents of the CTU directory can not be reused without
+            # the fingerprints of a finished collection with the same
+            # configuration.
+            shutil.rmtree(ctu_dir, ignore_errors=True)
+            fingerprints = {}
+        else:
+            # The fingerprints are removed until the collection is finished,
+            # so an interrupted collection is not taken as valid.
+            os.remove(fingerprints_file)
 
     signal.signal(signal.SIGINT, signal_handler)
-    pool = multiprocessing.Pool(jobs)
+    pool = multiprocessing.Pool(jobs,
+                                initializer=init_worker,
+                                initargs=(fingerprints,
+                                          config_hash))
     try:
         collect_actions = [(build_action,
                             context,
@@ -228,7 +731,8 @@ def do_ctu_collect(actions, context, analyzer_config_map,
                             skip_handler,
                             ctu_temp_fnmap_folder)
                            for build_action in actions]
-        pool.map_async(collect_build_action, collect_actions).get(float('inf'))
+        collected = pool.map_async(collect_build_action,
+                                   collect_actions).get(float('inf'))
         pool.close()
     except Exception:
         pool.terminate()
@@ -236,6 +740,79 @@ def do_ctu_collect(actions, context, analyzer_config_map,
     finally:
         pool.join()
 
-    merge_ctu_func_maps(ctu_dir,
-                        ctu_func_map_file,
-                        ctu_temp_fnmap_folder)
+    if not incremental:
+        merge_ctu_func_maps(ctu_dir,
+                            ctu_func_map_file,
+                            ctu_temp_fnmap_folder)
+        return
+
+    current = update_ctu_func_maps(ctu_dir, ctu_func_map_file, fingerprints,
+                                   [tu for tus in collected for tu in tus])
+
+    with open(fingerprints_file, 'w') as fp_file:
+        json.dump({'config': config_hash, 'fingerprints': current}, fp_file)
+
+
+def prepare_analysis_dir(ctu_dir):
+    """ Returns the directory which contains the uncompressed AST dumps and
+    the global function maps for the CTU analysis, or None if the CTU
+    directory can be analyzed as it is.
+
+    If some of the AST dumps referred by the global function maps are
+    compressed, they are decompressed into a new scratch directory next to
+    the CTU directory, which should be removed after the analysis. The other
+    files are linked into it.
+    """
+
+    # The global function maps, which may be huge, are not read if none of
+    # the stored AST dumps are compressed.
+    if not any(stored_ast.endswith(AST_COMPRESSED_SUFFIX)
+               for store_dir in glob.glob(os.path.join(ctu_dir, '*',
+                                                       AST_STORE_FOLDER))
+               for stored_ast in os.listdir(store_dir)):
+        return None
+
+    references = {}
+    compressed = False
+    for map_file in glob.glob(os.path.join(ctu_dir, '*',
+                                           CTU_FUNC_MAP_FILE)):
+        triple_arch = os.path.basename(os.path.dirname(map_file))
+        with open(map_file, 'r') as fn_map:
+            ast_files = set(line.rstrip('\n').split(' ', 1)[1]
+                            for line in fn_map if line.strip())
+
+        references[triple_arch] = {}
+        for ast_file in ast_files:
+            stored_ast = os.path.realpath(
+                os.path.join(ctu_dir, triple_arch, ast_file))
+            references[triple_arch][ast_file] = stored_ast
+            compressed = compressed or \
+                stored_ast.endswith(AST_COMPRESSED_SUFFIX)
+
+    if not compressed:
+        return None
+
+    # The scratch directory is in the output directory instead of the
+    # system temporary directory, because the AST dumps may be huge.
+    scratch_dir = tempfile.mkdtemp(
+        prefix='ctu-', dir=os.path.dirname(os.path.abspath(ctu_dir)))
+    LOG.info("Decompressing the AST dumps into '" + scratch_dir + "' ...")
+    for triple_arch, ast_files in references.items():
+        triple_path = os.path.join(scratch_dir, triple_arch)
+        os.makedirs(triple_path)
+        os.symlink(os.path.join(os.path.abspath(ctu_dir), triple_arch,
+                                CTU_FUNC_MAP_FILE),
+                   os.path.join(triple_path, CTU_FUNC_MAP_FILE))
+
+        for ast_file, stored_ast in ast_files.items():
+            ast_path = os.path.join(triple_path, ast_file)
+            __makedirs(os.path.dirname(ast_path))
+            if not stored_ast.endswith(AST_COMPRESSED_SUFFIX):
+                os.symlink(stored_ast, ast_path)
+                continue
+
+            with gzip.open(stored_ast, 'rb') as compressed_ast, \
+                    open(ast_path, 'wb') as ast:
+                shutil.copyfileobj(compressed_ast, ast)
+
+    return scratch_dir
@@ -12,6 +12,7 @@ import subprocess
 import sys
 import traceback
 
+from libcodechecker.analyze import compiler_info_cache
 # TODO: This is a cross-subpackage import!
 from libcodechecker.log import build_action
 from libcodechecker.log import option_parser
@@ -124,7 +125,9 @@ def get_compiler_includes(compiler, lang, compile_opts, output_path=None,
         " " + sysroot + " - -v "
 
     LOG.debug("Retrieving default includes via '" + cmd + "'")
-    err = get_compiler_err(cmd)
+    err = compiler_info_cache.get_cache().get(
+        'includes', compiler, [lang, sysroot] + extra_opts,
+        lambda: get_compiler_err(cmd))
     if output_path is not None:
         LOG.debug("Dumping default includes " + compiler)
         dump_compiler_info(output_path, compiler_includes_dump_file,
@@ -140,7 +143,8 @@ def get_compiler_target(compiler, output_path=None):
     cmd = compiler + ' -v'
     LOG.debug("Retrieving target platform information via '" + cmd + "'")
 
-    err = get_compiler_err(cmd)
+    err = compiler_info_cache.get_cache().get(
+        'target', compiler, [], lambda: get_compiler_err(cmd))
     if output_path is not None:
         dump_compiler_info(output_path, compiler_target_dump_file,
                            {compiler: err})
@@ -152,9 +156,58 @@ def remove_file_if_exists(filename):
         os.remove(filename)
 
 
-def parse_compile_commands_json(logfile, output_path=None,
-                                add_compiler_defaults=False):
-    import json
+def iter_json_array(stream, chunk_size=1024 * 1024):
+    """
+    Iterate over the elements of the JSON array in the given stream without
+    loading the whole document into the memory. The stream is read in chunks
+    and the elements are decoded one by one as soon as they are complete.
+    """
+    decoder = json.JSONDecoder()
+    whitespace = re.compile(r'[\s,]*')
+
+    buf = ''
+    pos = 0
+    eof = False
+    in_array = False
+
+    while True:
+        pos = whitespace.match(buf, pos).end()
+
+        if pos < len(buf):
+            if not in_array:
+                if buf[pos] != '[':
+                    raise ValueError("The JSON document is not an array.")
+                in_array = True
+                pos += 1
+                continue
+
+            if buf[pos] == ']':
+                return
+
+            try:
+                element, pos = decoder.raw_decode(buf, pos)
+                yield element
+                continue
+            except ValueError:
+                # The element is not complete yet.
+                if eof:
+                    raise
+
+        if eof:
+            raise ValueError("Unexpected end of the JSON document.")
+
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        buf = buf[pos:] + chunk
+        pos = 0
+
+
+def iter_compile_commands_json(logfile, output_path=None,
+                               add_compiler_defaults=False):
+    """
+    Yield the build actions of the JSON compilation database as it is read.
+    Duplicate compilation commands are yielded only once.
+    """
     # The add-compiler-defaults is a deprecated argument
     # and we always perform target and include auto-detection.
     add_compiler_defaults = True
@@ -166,17 +219,16 @@ def parse_compile_commands_json(logfile, output_path=None,
         remove_file_if_exists(os.path.join(output_path,
                                            compiler_target_dump_file))
 
-    actions = []
-    filtered_build_actions = {}
+    # The binary digests of the keys of the already seen build actions.
+    seen_actions = set()
 
     logfile.seek(0)
-    data = json.load(logfile)
 
     compiler_includes = {}
     compiler_target = ''
 
     counter = 0
-    for entry in data:
+    for entry in iter_json_array(logfile):
         sourcefile = entry['file']
 
         if not os.path.isabs(sourcefile):
@@ -248,18 +300,19 @@ def parse_compile_commands_json(logfile, output_path=None,
         # TODO: Check arch.
         action.directory = entry['directory']
         action.sources = sourcefile
-        # Filter out duplicate compilation commands.
-        unique_key = action.cmp_key
-        if filtered_build_actions.get(unique_key) is None:
-            filtered_build_actions[unique_key] = action
-
-        del action
         counter += 1
 
-    for _, ba in filtered_build_actions.items():
-        actions.append(ba)
+        # Filter out duplicate compilation commands.
+        unique_key = action.cmp_key.decode('hex')
+        if unique_key not in seen_actions:
+            seen_actions.add(unique_key)
+            yield action
 
-    return actions
+
+def parse_compile_commands_json(logfile, output_path=None,
+                                add_compiler_defaults=False):
+    return list(iter_compile_commands_json(logfile, output_path,
+                                           add_compiler_defaults))
 
 
 def parse_log(logfilepath, output_path=None, add_compiler_defaults=False):
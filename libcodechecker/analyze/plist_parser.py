@@ -70,6 +70,41 @@ def get_report_hash(diagnostic, files):
     return report_hash
 
 
+def get_reports(plist):
+    """
+    Create the reports from the content of an already parsed plist file.
+    Returns the list of files and the list of reports.
+    """
+    reports = []
+    files = plist['files']
+
+    for diag in plist['diagnostics']:
+
+        available_keys = diag.keys()
+
+        main_section = {}
+        for key in available_keys:
+            # Skip path it is handled separately.
+            if key != 'path':
+                main_section.update({key: diag[key]})
+
+        # We need to extend information for plist files generated
+        # by older clang version (before 3.7).
+        main_section['check_name'] = get_checker_name(diag)
+
+        # We need to extend information for plist files generated
+        # by older clang version (before 3.8).
+        main_section['issue_hash_content_of_line_in_context'] = \
+            get_report_hash(diag, files)
+
+        bug_path_items = [item for item in diag['path']]
+
+        report = Report(main_section, bug_path_items)
+        reports.append(report)
+
+    return files, reports
+
+
 def parse_plist(path):
     """
     Parse the reports from a plist file.
@@ -82,31 +117,7 @@ def parse_plist(path):
     try:
         plist = plistlib.readPlist(path)
 
-        files = plist['files']
-
-        for diag in plist['diagnostics']:
-
-            available_keys = diag.keys()
-
-            main_section = {}
-            for key in available_keys:
-                # Skip path it is handled separately.
-                if key != 'path':
-                    main_section.update({key: diag[key]})
-
-            # We need to extend information for plist files generated
-            # by older clang version (before 3.7).
-            main_section['check_name'] = get_checker_name(diag)
-
-            # We need to extend information for plist files generated
-            # by older clang version (before 3.8).
-            main_section['issue_hash_content_of_line_in_context'] = \
-                get_report_hash(diag, files)
-
-            bug_path_items = [item for item in diag['path']]
-
-            report = Report(main_section, bug_path_items)
-            reports.append(report)
+        files, reports = get_reports(plist)
 
     except ExpatError as err:
         LOG.error('Failed to process plist file: ' + path +
@@ -220,21 +231,8 @@ def remove_report_from_plist(plist_content, skip_handler):
         LOG.error(ex)
         return plist_content
 
-    file_ids_to_remove = []
-
     try:
-        for i, f in enumerate(report_data['files']):
-            if skip_handler.should_skip(f):
-                file_ids_to_remove.append(i)
-
-        fids, kept_diagnostics = fids_in_path(report_data, file_ids_to_remove)
-        report_data['diagnostics'] = kept_diagnostics
-
-        remove_file = True
-        for f in file_ids_to_remove:
-            if f in fids:
-                remove_file = False
-                break
+        remove_skipped_diagnostics(report_data, skip_handler)
 
         new_data = report_data
         res = plistlib.writePlistToString(new_data)
@@ -246,6 +244,27 @@ def remove_report_from_plist(plist_content, skip_handler):
         return plist_content
 
 
+def remove_skipped_diagnostics(report_data, skip_handler):
+    """
+    Remove the diagnostics which should be skipped from the already parsed
+    plist content. Returns whether any diagnostic was removed.
+
+    Throws KeyError if the plist content is not valid.
+    """
+    file_ids_to_remove = []
+
+    for i, f in enumerate(report_data['files']):
+        if skip_handler.should_skip(f):
+            file_ids_to_remove.append(i)
+
+    _, kept_diagnostics = fids_in_path(report_data, file_ids_to_remove)
+
+    removed = len(kept_diagnostics) != len(report_data['diagnostics'])
+    report_data['diagnostics'] = kept_diagnostics
+
+    return removed
+
+
 def skip_report_from_plist(plist_file, skip_handler):
     """
     Rewrites the provided plist file where reports
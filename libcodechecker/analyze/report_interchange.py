@@ -0,0 +1,144 @@
+# -------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -------------------------------------------------------------------------
+"""
+Pre-parsed report interchange format.
+
+Parsing the plist XML files is expensive, so every result file is parsed
+only once, right after the analysis, and the reports are written next to the
+plist file in a compact stream which can be read back without an XML parser
+by the store command and by the server.
+
+The stream is a text file of JSON documents separated by new lines. The first
+document is a header with the format version and the list of the files the
+reports refer to. Every following document is one report with its main
+section and bug path.
+"""
+
+import json
+import os
+import plistlib
+from xml.parsers.expat import ExpatError
+
+from libcodechecker.analyze import plist_parser
+from libcodechecker.logger import LoggerFactory
+from libcodechecker.report import Report
+
+LOG = LoggerFactory.get_new_logger('REPORT INTERCHANGE')
+
+FORMAT_VERSION = 1
+
+EXTENSION = '.reports'
+
+
+def get_interchange_file(plist_file):
+    """
+    Return the path of the interchange file belonging to a plist file.
+    """
+    return plist_file + EXTENSION
+
+
+def is_up_to_date(plist_file):
+    """
+    The interchange file can be used instead of the plist file if it exists
+    and was not written before the last modification of the plist file.
+    """
+    interchange_file = get_interchange_file(plist_file)
+    try:
+        return os.path.getmtime(interchange_file) >= \
+            os.path.getmtime(plist_file)
+    except OSError:
+        return False
+
+
+def dumps(files, reports):
+    """
+    Serialize the files and the reports parsed from a plist file.
+    """
+    lines = [json.dumps({'version': FORMAT_VERSION, 'files': files},
+                        separators=(',', ':'))]
+    for report in reports:
+        lines.append(json.dumps({'main': report.main,
+                                 'path': report.bug_path},
+                                separators=(',', ':')))
+    lines.append('')
+    return '\n'.join(lines)
+
+
+def write(interchange_file, files, reports):
+    with open(interchange_file, 'w') as output:
+        output.write(dumps(files, reports))
+
+
+def __read_header(stream):
+    header = json.loads(stream.readline())
+    if header.get('version') != FORMAT_VERSION:
+        raise ValueError("Unsupported report interchange format version: " +
+                         str(header.get('version')))
+    return header['files']
+
+
+def read_files(interchange_file):
+    """
+    Read only the list of the files referred by the reports.
+    """
+    with open(interchange_file, 'r') as stream:
+        return __read_header(stream)
+
+
+def read(interchange_file):
+    """
+    Read the files and the reports from an interchange file.
+    """
+    with open(interchange_file, 'r') as stream:
+        files = __read_header(stream)
+        reports = []
+        for line in stream:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            reports.append(Report(record['main'], record['path']))
+
+    return files, reports
+
+
+def load(plist_file):
+    """
+    Return the files and the reports of a plist file. The interchange file is
+    used if it is up to date, otherwise the plist file is parsed.
+    """
+    if is_up_to_date(plist_file):
+        try:
+            return read(get_interchange_file(plist_file))
+        except (IOError, ValueError, KeyError) as ex:
+            LOG.debug("Failed to read the report interchange file of " +
+                      plist_file)
+            LOG.debug(ex)
+
+    return plist_parser.parse_plist(plist_file)
+
+
+def write_from_plist(plist_file, skip_handler=None):
+    """
+    Parse the plist file produced by an analyzer, remove the reports which
+    should be skipped and write the interchange file next to it.
+    """
+    try:
+        plist = plistlib.readPlist(plist_file)
+    except (ExpatError, IOError) as ex:
+        LOG.error("Failed to parse " + plist_file)
+        LOG.error(ex)
+        return
+
+    try:
+        if skip_handler and \
+                plist_parser.remove_skipped_diagnostics(plist, skip_handler):
+            plistlib.writePlist(plist, plist_file)
+
+        files, reports = plist_parser.get_reports(plist)
+        write(get_interchange_file(plist_file), files, reports)
+    except (KeyError, IndexError, TypeError) as ex:
+        LOG.error("Failed to process the reports of " + plist_file)
+        LOG.error(ex)
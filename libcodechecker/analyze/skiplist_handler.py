@@ -42,6 +42,13 @@ class SkipListHandler(object):
             rexpr = re.compile(fnmatch.translate(line[1:].strip() + '*'))
             self.__skip.append((line, rexpr))
 
+    @property
+    def skip_lines(self):
+        """
+        The valid patterns of the skip file in order.
+        """
+        return [line for line, _ in self.__skip]
+
     def should_skip(self, source):
         """
         Check if the given source should be skipped.
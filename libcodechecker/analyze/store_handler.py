@@ -5,6 +5,7 @@
 # -------------------------------------------------------------------------
 
 import base64
+from collections import defaultdict
 from hashlib import sha256
 import json
 import os
@@ -21,6 +22,10 @@ from libcodechecker.server.database.run_db_model import *
 
 LOG = LoggerFactory.get_new_logger('STORE HANDLER')
 
+# The number of bind parameters used in a single IN clause. SQLite does not
+# support more than 999 parameters in one statement.
+IN_CLAUSE_SIZE = 500
+
 
 def metadata_info(metadata_file):
     check_commands = []
@@ -172,20 +177,22 @@ def is_same_event_path(report_id, events, session):
     events argument.
     """
     try:
-        q = session.query(BugPathEvent) \
+        q = session.query(BugPathEvent, File.filepath) \
+            .outerjoin(File, BugPathEvent.file_id == File.id) \
             .filter(BugPathEvent.report_id == report_id) \
             .order_by(BugPathEvent.order)
 
-        for i, point2 in enumerate(q):
+        file_paths = get_file_paths(session,
+                                    set(event.fileId for event in events))
+
+        for i, (point2, file2path) in enumerate(q):
             if i == len(events):
                 return False
 
             point1 = events[i]
 
-            file1name = os.path.basename(session.query(File).
-                                         get(point1.fileId).filepath)
-            file2name = os.path.basename(session.query(File).
-                                         get(point2.file_id).filepath)
+            file1name = os.path.basename(file_paths[point1.fileId])
+            file2name = os.path.basename(file2path)
 
             if point1.startCol != point2.col_begin or \
                     point1.endCol != point2.col_end or \
@@ -504,3 +511,340 @@ def addFileRecord(session, filepath, content_hash):
         return file_record.id
     finally:
         session.close()
+
+
+def chunks(sequence, size):
+    """
+    Split the given sequence into lists of the given size.
+    """
+    sequence = list(sequence)
+    for i in range(0, len(sequence), size):
+        yield sequence[i:i + size]
+
+
+def get_file_paths(session, file_ids):
+    """
+    Return the paths of the given files in a file id to path map.
+    """
+    file_paths = {}
+    for ids in chunks(file_ids, IN_CLAUSE_SIZE):
+        file_paths.update(session.query(File.id, File.filepath)
+                          .filter(File.id.in_(ids)))
+
+    return file_paths
+
+
+def get_missing_content_hashes(session, content_hashes):
+    """
+    Return the content hashes from the given ones which have no file content
+    stored in the database.
+    """
+    missing = set(content_hashes)
+    for hashes in chunks(missing.copy(), IN_CLAUSE_SIZE):
+        q = session.query(FileContent.content_hash) \
+            .filter(FileContent.content_hash.in_(hashes))
+        missing.difference_update(content_hash for content_hash, in q)
+
+    return list(missing)
+
+
+def __report_review_status():
+    """
+    Review status of the reports in the statistics. The reports without a
+    review status entry are unreviewed.
+    """
+    return func.coalesce(cast(ReviewStatus.status, String), 'unreviewed')
+
+
+def update_run_statistics(session, run_id):
+    """
+    Recount the report statistics of the given run. This has to be called
+    in the storage transaction after every report of the run was stored and
+    the detection statuses were updated.
+    """
+    session.query(ReportStatistics) \
+        .filter(ReportStatistics.run_id == run_id) \
+        .delete(synchronize_session=False)
+
+    review_status = __report_review_status()
+    q = session.query(Report.run_id,
+                      Report.bug_id,
+                      Report.checker_id,
+                      Report.severity,
+                      cast(Report.detection_status, String),
+                      review_status,
+                      Report.file_id,
+                      func.count(literal_column('*'))) \
+        .outerjoin(ReviewStatus,
+                   ReviewStatus.bug_hash == Report.bug_id) \
+        .filter(Report.run_id == run_id) \
+        .group_by(Report.run_id,
+                  Report.bug_id,
+                  Report.checker_id,
+                  Report.severity,
+                  cast(Report.detection_status, String),
+                  review_status,
+                  Report.file_id)
+
+    columns = [ReportStatistics.run_id,
+               ReportStatistics.bug_hash,
+               ReportStatistics.checker_id,
+               ReportStatistics.severity,
+               ReportStatistics.detection_status,
+               ReportStatistics.review_status,
+               ReportStatistics.file_id,
+               ReportStatistics.count]
+    session.execute(ReportStatistics.__table__.insert()
+                    .from_select(columns, q.statement))
+
+
+def change_review_status_statistics(session, bug_hash, old_status,
+                                    new_status):
+    """
+    Move the reports with the given hash from the old review status to the
+    new one in the statistics of every run.
+    """
+    if old_status == new_status:
+        return
+
+    session.query(ReportStatistics) \
+        .filter(ReportStatistics.bug_hash == bug_hash) \
+        .update({ReportStatistics.review_status: new_status},
+                synchronize_session=False)
+
+
+class BulkReportStorage(object):
+    """
+    Batched alternative of addReport() for storing every report of a run.
+
+    The existing reports of the run and their bug path events are fetched
+    with one query each when the storage starts, so the duplicate check of
+    addReport() is done in memory. New bug path events and report points and
+    the changes of already stored reports are buffered and written to the
+    database with executemany() style bulk statements when the buffer is full
+    and when flush() is called.
+
+    flush() must be called before finishCheckerRun().
+    """
+
+    def __init__(self, storage_session, run_id, file_id_to_path,
+                 batch_size=10000):
+        """
+        file_id_to_path -- A dictionary which maps the IDs of the files
+                           referenced by the reports to their paths.
+        """
+        self.__storage_session = storage_session
+        self.__run_id = run_id
+        self.__batch_size = batch_size
+        self.__file_names = {file_id: os.path.basename(path)
+                             for file_id, path in file_id_to_path.items()}
+
+        session = storage_session.get_transaction(run_id)
+
+        # Bug hash -> list of [report id, checker id, detection status].
+        self.__reports = defaultdict(list)
+        q = session.query(Report.id,
+                          Report.bug_id,
+                          Report.checker_id,
+                          Report.detection_status) \
+            .filter(Report.run_id == run_id)
+        for report_id, bug_id, checker_id, detection_status in q:
+            self.__reports[bug_id].append([report_id,
+                                           checker_id,
+                                           detection_status])
+
+        # Report id -> list of (col_begin, col_end, file name, message) of
+        # the bug path events in order. This is the data compared by
+        # is_same_event_path().
+        self.__events = defaultdict(list)
+        q = session.query(BugPathEvent.report_id,
+                          BugPathEvent.col_begin,
+                          BugPathEvent.col_end,
+                          File.filename,
+                          BugPathEvent.msg) \
+            .join(Report, Report.id == BugPathEvent.report_id) \
+            .outerjoin(File, File.id == BugPathEvent.file_id) \
+            .filter(Report.run_id == run_id) \
+            .order_by(BugPathEvent.report_id, BugPathEvent.order)
+        for report_id, col_begin, col_end, file_name, msg in q:
+            self.__events[report_id].append((col_begin, col_end,
+                                             file_name, msg))
+
+        self.__report_updates = {}
+        self.__replaced_paths = set()
+        self.__new_points = {}
+        self.__new_events = {}
+        self.__pending_rows = 0
+
+    def __event_key(self, event):
+        return (event.startCol, event.endCol,
+                self.__file_names.get(event.fileId), event.msg)
+
+    def __is_same_event_path(self, report_id, events):
+        """
+        In-memory equivalent of is_same_event_path().
+        """
+        for i, stored_event in enumerate(self.__events[report_id]):
+            if i == len(events):
+                return False
+
+            if self.__event_key(events[i]) != stored_event:
+                return False
+
+        return True
+
+    def __set_path_and_events(self, report_id, bugpath, events):
+        """
+        Buffer the given bug path and events as the path of the report.
+        Previously buffered, not yet written rows of the report are dropped.
+        """
+        self.__pending_rows -= len(self.__new_points.get(report_id, [])) + \
+            len(self.__new_events.get(report_id, []))
+
+        self.__new_points[report_id] = \
+            [{'line_begin': piece.startLine,
+              'col_begin': piece.startCol,
+              'line_end': piece.endLine,
+              'col_end': piece.endCol,
+              'order': i,
+              'file_id': piece.fileId,
+              'report_id': report_id}
+             for i, piece in enumerate(bugpath)]
+
+        self.__new_events[report_id] = \
+            [{'line_begin': event.startLine,
+              'col_begin': event.startCol,
+              'line_end': event.endLine,
+              'col_end': event.endCol,
+              'order': i,
+              'msg': event.msg,
+              'file_id': event.fileId,
+              'report_id': report_id}
+             for i, event in enumerate(events)]
+
+        self.__events[report_id] = [self.__event_key(event)
+                                    for event in events]
+
+        self.__pending_rows += len(bugpath) + len(events)
+
+    def add_report(self,
+                   file_id,
+                   main_section,
+                   bugpath,
+                   events,
+                   checker_id,
+                   severity,
+                   detection_time):
+        """
+        Batched equivalent of addReport(). Returns the ID of the report.
+        """
+        try:
+            session = self.__storage_session.get_transaction(self.__run_id)
+
+            bug_hash = main_section['issue_hash_content_of_line_in_context']
+            checker_id = checker_id or 'NOT FOUND'
+
+            for report in self.__reports[bug_hash]:
+                report_id, report_checker_id, detection_status = report
+
+                if report_checker_id != checker_id or \
+                        not self.__is_same_event_path(report_id, events):
+                    continue
+
+                new_status = None
+                if detection_status == 'new' and not \
+                        self.__storage_session.is_touched(self.__run_id,
+                                                          report_id) or \
+                        detection_status == 'unresolved' or \
+                        detection_status == 'reopened':
+                    new_status = 'unresolved'
+                    update = {'file_id': file_id}
+                elif detection_status == 'resolved':
+                    new_status = 'reopened'
+                    update = {'file_id': file_id,
+                              'fixed_at': None}
+
+                if new_status:
+                    report[2] = new_status
+                    update['id'] = report_id
+                    update['detection_status'] = new_status
+                    self.__report_updates.setdefault(report_id, {}) \
+                        .update(update)
+
+                    self.__replaced_paths.add(report_id)
+                    self.__set_path_and_events(report_id, bugpath, events)
+
+                self.__storage_session.touch_report(self.__run_id, report_id)
+                self.__flush_if_full()
+
+                return report_id
+
+            report = {'run_id': self.__run_id,
+                      'bug_id': bug_hash,
+                      'file_id': file_id,
+                      'checker_message': main_section['description'],
+                      'checker_id': checker_id,
+                      'checker_cat': main_section['category'],
+                      'bug_type': main_section['type'],
+                      'line': main_section['location']['line'],
+                      'column': main_section['location']['col'],
+                      'severity': severity,
+                      'detection_status': 'new',
+                      'detected_at': detection_time}
+
+            # The ID of the new report is needed by its path and events, so
+            # reports are inserted one by one.
+            session.bulk_insert_mappings(Report, [report],
+                                         return_defaults=True)
+            report_id = report['id']
+
+            self.__reports[bug_hash].append([report_id, checker_id, 'new'])
+            self.__set_path_and_events(report_id, bugpath, events)
+
+            self.__storage_session.touch_report(self.__run_id, report_id)
+            self.__flush_if_full()
+
+            return report_id
+
+        except Exception as ex:
+            raise shared.ttypes.RequestFailed(
+                shared.ttypes.ErrorCode.GENERAL,
+                str(ex))
+
+    def __flush_if_full(self):
+        if self.__pending_rows >= self.__batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Write the buffered changes to the database.
+        """
+        session = self.__storage_session.get_transaction(self.__run_id)
+
+        for report_ids in chunks(self.__replaced_paths, IN_CLAUSE_SIZE):
+            session.query(BugPathEvent) \
+                .filter(BugPathEvent.report_id.in_(report_ids)) \
+                .delete(synchronize_session=False)
+            session.query(BugReportPoint) \
+                .filter(BugReportPoint.report_id.in_(report_ids)) \
+                .delete(synchronize_session=False)
+
+        if self.__report_updates:
+            session.bulk_update_mappings(Report,
+                                         self.__report_updates.values())
+
+        points = [point for report_points in self.__new_points.values()
+                  for point in report_points]
+        if points:
+            session.bulk_insert_mappings(BugReportPoint, points)
+
+        events = [event for report_events in self.__new_events.values()
+                  for event in report_events]
+        if events:
+            session.bulk_insert_mappings(BugPathEvent, events)
+
+        self.__report_updates = {}
+        self.__replaced_paths = set()
+        self.__new_points = {}
+        self.__new_events = {}
+        self.__pending_rows = 0
@@ -119,18 +119,31 @@ class OutputParser(object):
             tidy_out: something iterable (e.g.: a file object)
         """
 
+        for message in self.iter_messages(tidy_out):
+            self.messages.append(message)
+
+        return self.messages
+
+    def iter_messages(self, tidy_out):
+        """
+        Iterate over the messages of the given clang-tidy output while it is
+        parsed, so the messages are not kept in memory. The lines of the
+        output are read from iter(tidy_out) only as needed.
+
+        Parameters:
+            tidy_out: something iterable (e.g.: a file object)
+        """
+
         titer = iter(tidy_out)
         try:
             next_line = titer.next()
             while True:
                 message, next_line = self._parse_message(titer, next_line)
                 if message is not None:
-                    self.messages.append(message)
+                    yield message
         except StopIteration:
             pass
 
-        return self.messages
-
     def _parse_message(self, titer, line):
         """
         Parse the given line. Returns a (message, next_line) pair or throws a
@@ -185,6 +198,7 @@ class OutputParser(object):
 
             message_text = line.strip()
             if message_text == '':
+                line = titer.next()
                 continue
 
             message.fixits.append(Note(message.path, message.line,
@@ -369,6 +383,41 @@ class PListConverter(object):
         fmap = self._add_files_from_messages(messages)
         self._add_diagnostics(messages, fmap)
 
+    def write_messages(self, messages, file):
+        """
+        Writes out the plist XML of the diagnostics of the plist and of the
+        given clang-tidy messages using the given file object. The messages
+        are converted and written while they are iterated, only the file list
+        of the plist is kept in memory. The result is the same as writing
+        the plist after adding the messages.
+        """
+
+        fmap = {path: idx for idx, path in enumerate(self.plist['files'])}
+
+        writer = plistlib.PlistWriter(file)
+        writer.writeln("<plist version=\"1.0\">")
+        writer.beginElement("dict")
+
+        writer.simpleElement("key", "diagnostics")
+        writer.beginElement("array")
+        for diag in self.plist['diagnostics']:
+            writer.writeValue(diag)
+
+        for message in messages:
+            for path in [message.path] + [nt.path for nt in message.notes]:
+                if path not in fmap:
+                    fmap[path] = len(self.plist['files'])
+                    self.plist['files'].append(path)
+
+            writer.writeValue(PListConverter._create_diag(message, fmap))
+        writer.endElement("array")
+
+        writer.simpleElement("key", "files")
+        writer.writeValue(self.plist['files'])
+
+        writer.endElement("dict")
+        writer.writeln("</plist>")
+
     def write_to_file(self, path):
         """
         Writes out the plist XML to the given path.
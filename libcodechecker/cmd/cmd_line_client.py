@@ -93,6 +93,29 @@ def add_filter_conditions(report_filter, filter_str):
         report_filter.filepath = map(lambda x: '*' + x + '*',
                                      paths.split(','))
 
+
+def get_all_run_results(client, run_ids, sort_mode, report_filter, cmp_data):
+    """
+    Query every result of the given runs page by page. The pages are
+    continued by the cursor returned with the previous page.
+    """
+    limit = constants.MAX_QUERY_SIZE
+
+    all_results = []
+    cursor = ''
+    while True:
+        page = client.getRunResultsPage(run_ids,
+                                        limit,
+                                        cursor,
+                                        sort_mode,
+                                        report_filter,
+                                        cmp_data)
+        all_results.extend(page.reports)
+
+        cursor = page.nextCursor
+        if not cursor:
+            return all_results
+
 # ---------------------------------------------------------------------------
 # Argument handlers for the 'CodeChecker cmd' subcommands.
 # ---------------------------------------------------------------------------
@@ -124,22 +147,12 @@ def handle_list_results(args):
 
     run = run_info.get(args.name)
 
-    limit = constants.MAX_QUERY_SIZE
-    offset = 0
-
     report_filter = ttypes.ReportFilter()
 
     add_filter_conditions(report_filter, args.filter)
 
-    all_results = []
-    results = client.getRunResults([run.runId], limit, offset, None,
-                                   report_filter, None)
-
-    while results:
-        all_results.extend(results)
-        offset += limit
-        results = client.getRunResults([run.runId], limit, offset, None,
-                                       report_filter, None)
+    all_results = get_all_run_results(client, [run.runId], None,
+                                      report_filter, None)
 
     if args.output_format == 'json':
         print(CmdLineOutputEncoder().encode(all_results))
@@ -183,27 +196,9 @@ def handle_diff_results(args):
         sort_mode = [(ttypes.SortMode(
             ttypes.SortType.FILENAME,
             ttypes.Order.ASC))]
-        limit = constants.MAX_QUERY_SIZE
-        offset = 0
-
-        all_results = []
-        results = client.getRunResults(baseids,
-                                       limit,
-                                       offset,
-                                       sort_mode,
-                                       report_filter,
-                                       cmp_data)
-
-        while results:
-            all_results.extend(results)
-            offset += limit
-            results = client.getRunResults(baseids,
-                                           limit,
-                                           offset,
-                                           sort_mode,
-                                           report_filter,
-                                           cmp_data)
-        return all_results
+
+        return get_all_run_results(client, baseids, sort_mode,
+                                   report_filter, cmp_data)
 
     def getReportDirResults(reportdir):
         all_reports = []
@@ -247,25 +242,9 @@ def handle_diff_results(args):
         sort_mode = [(ttypes.SortMode(
             ttypes.SortType.FILENAME,
             ttypes.Order.ASC))]
-        limit = constants.MAX_QUERY_SIZE
-        offset = 0
-
-        base_results = []
-        results = client.getRunResults(baseids,
-                                       limit,
-                                       offset,
-                                       sort_mode,
-                                       report_filter,
-                                       None)
-        while results:
-            base_results.extend(results)
-            offset += limit
-            results = client.getRunResults(baseids,
-                                           limit,
-                                           offset,
-                                           sort_mode,
-                                           report_filter,
-                                           None)
+
+        base_results = get_all_run_results(client, baseids, sort_mode,
+                                           report_filter, None)
         base_hashes = {}
         for res in base_results:
             base_hashes[res.bugHash] = res
@@ -417,18 +396,11 @@ def handle_diff_results(args):
 
 
 def handle_list_result_types(args):
-    def getStatistics(client, run_ids, field, values):
-        report_filter = ttypes.ReportFilter()
-        report_filter.isUnique = True
-        setattr(report_filter, field, values)
-        checkers = client.getCheckerCounts(run_ids,
-                                           report_filter,
-                                           None)
-
-        return dict((res.name, res.count) for res in checkers)
-
-    def checkerCount(dict, key):
-        return dict[key] if key in dict else 0
+    review_status_keys = {
+        ttypes.ReviewStatus.UNREVIEWED: 'unreviewed',
+        ttypes.ReviewStatus.CONFIRMED: 'confirmed',
+        ttypes.ReviewStatus.FALSE_POSITIVE: 'false_positive',
+        ttypes.ReviewStatus.INTENTIONAL: 'intentional'}
 
     client = setup_client(args.product_url)
 
@@ -439,42 +411,39 @@ def handle_list_result_types(args):
 
     run_ids = map(lambda run: run.runId, items.values())
 
-    all_checkers_report_filter = ttypes.ReportFilter()
-    all_checkers_report_filter.isUnique = True
-
-    all_checkers = client.getCheckerCounts(run_ids, all_checkers_report_filter,
-                                           None)
-    all_checkers_dict = dict((res.name, res) for res in all_checkers)
-
-    unrev_checkers = getStatistics(client, run_ids, 'reviewStatus',
-                                   [ttypes.ReviewStatus.UNREVIEWED])
-
-    confirmed_checkers = getStatistics(client, run_ids, 'reviewStatus',
-                                       [ttypes.ReviewStatus.CONFIRMED])
-
-    false_checkers = getStatistics(client, run_ids, 'reviewStatus',
-                                   [ttypes.ReviewStatus.FALSE_POSITIVE])
-
-    intentional_checkers = getStatistics(client, run_ids, 'reviewStatus',
-                                         [ttypes.ReviewStatus.INTENTIONAL])
-
-    resolved_checkers = getStatistics(client, run_ids, 'detectionStatus',
-                                      [ttypes.DetectionStatus.RESOLVED])
+    report_filter = ttypes.ReportFilter()
+    report_filter.isUnique = True
+
+    status_counts = client.getCheckerStatusCounts(run_ids, report_filter,
+                                                  None)
+
+    checkers = {}
+    for status_count in status_counts:
+        checker = status_count.checkerName
+        if checker not in checkers:
+            checkers[checker] = dict(
+                checker=checker,
+                severity=status_count.severity,
+                reports=0,
+                unreviewed=0,
+                confirmed=0,
+                false_positive=0,
+                intentional=0,
+                resolved=0)
+
+        stat = checkers[checker]
+        stat['reports'] += status_count.count
+        stat[review_status_keys[status_count.reviewStatus]] += \
+            status_count.count
+        stat['resolved'] += status_count.detectionStatusCounts.get(
+            ttypes.DetectionStatus.RESOLVED, 0)
 
     all_results = []
-    for key, checker_data in sorted(all_checkers_dict.items(),
-                                    key=lambda x: x[1].severity,
-                                    reverse=True):
-        all_results.append(dict(
-            checker=key,
-            severity=ttypes.Severity._VALUES_TO_NAMES[checker_data.severity],
-            reports=checker_data.count,
-            unreviewed=checkerCount(unrev_checkers, key),
-            confirmed=checkerCount(confirmed_checkers, key),
-            false_positive=checkerCount(false_checkers, key),
-            intentional=checkerCount(intentional_checkers, key),
-            resolved=checkerCount(resolved_checkers, key),
-         ))
+    for key, stat in sorted(checkers.items(),
+                            key=lambda x: x[1]['severity'],
+                            reverse=True):
+        stat['severity'] = ttypes.Severity._VALUES_TO_NAMES[stat['severity']]
+        all_results.append(stat)
 
     if args.output_format == 'json':
         print(CmdLineOutputEncoder().encode(all_results))
@@ -27,6 +27,8 @@ class ThriftAuthHelper():
         self.__port = port
         url = util.create_product_url(protocol, host, port, uri)
         self.transport = THttpClient.THttpClient(url)
+        # The API version check is done through this service, so it uses the
+        # JSON protocol which is understood by the servers of every version.
         self.protocol = TJSONProtocol.TJSONProtocol(self.transport)
         self.client = codeCheckerAuthentication.Client(self.protocol)
 
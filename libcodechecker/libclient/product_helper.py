@@ -9,7 +9,7 @@ import os
 import socket
 
 from thrift.transport import THttpClient
-from thrift.protocol import TJSONProtocol
+from thrift.protocol import TBinaryProtocol
 from thrift.protocol.TProtocol import TProtocolException
 
 import shared
@@ -24,8 +24,11 @@ class ThriftProductHelper(object):
         self.__host = host
         self.__port = port
         url = util.create_product_url(protocol, host, port, uri)
-        self.transport = THttpClient.THttpClient(url)
-        self.protocol = TJSONProtocol.TJSONProtocol(self.transport)
+        # The binary protocol is requested, its messages are smaller and
+        # faster to process than the JSON messages of the web viewer.
+        self.transport = THttpClient.THttpClient(url + '?protocol=binary')
+        self.protocol = \
+            TBinaryProtocol.TBinaryProtocolAccelerated(self.transport)
         self.client = codeCheckerProductService.Client(self.protocol)
 
         if session_token:
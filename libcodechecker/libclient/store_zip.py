@@ -0,0 +1,361 @@
+# -------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -------------------------------------------------------------------------
+"""
+Assembling the mass store ZIP of the analysis results which is sent to the
+server by 'CodeChecker store'.
+"""
+
+import errno
+import functools
+from hashlib import sha256
+import json
+import multiprocessing
+import os
+import traceback
+import zipfile
+import zlib
+
+from libcodechecker.analyze import plist_parser
+from libcodechecker.analyze import report_interchange
+from libcodechecker.logger import LoggerFactory
+
+LOG = LoggerFactory.get_new_logger('STORE')
+
+# The files are read and the compressed ZIP file is sent to the server in
+# chunks of this size.
+STORE_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+def full_traceback(func):
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            msg = "{}\n\nOriginal {}".format(e, traceback.format_exc())
+            raise type(e)(msg)
+    return wrapper
+
+
+@full_traceback
+def parse_report_file(plist_file):
+    """
+    Return the source files of the plist file and the serialized reports
+    to be sent to the server. The reports are serialized only if the
+    analysis did not write them in the interchange format already.
+    The source files are None if the reports can not be stored because the
+    plist could not be parsed or it refers to a missing source file.
+    """
+    try:
+        if report_interchange.is_up_to_date(plist_file):
+            interchange_file = \
+                report_interchange.get_interchange_file(plist_file)
+            files = report_interchange.read_files(interchange_file)
+            interchange = None
+        else:
+            files, reports = plist_parser.parse_plist(plist_file)
+            interchange = report_interchange.dumps(files, reports)
+    except Exception as ex:
+        LOG.error('Parsing the plist failed: ' + str(ex))
+        return plist_file, None, None
+
+    for f in files:
+        if not os.path.isfile(f):
+            LOG.warning("Skipping '{0}' because it contains "
+                        "a missing source file.".format(plist_file))
+            return plist_file, None, None
+
+    return plist_file, files, interchange
+
+
+@full_traceback
+def hash_source_file(source_file):
+    """
+    Return the sha256 hash of the content of the given file, or None if the
+    file can not be read.
+    """
+    hasher = sha256()
+    try:
+        with open(source_file, 'rb') as content:
+            for chunk in iter(lambda: content.read(STORE_CHUNK_SIZE), ''):
+                hasher.update(chunk)
+    except (IOError, OSError) as ex:
+        LOG.warning("Couldn't hash '{0}': {1}".format(source_file, ex))
+        return source_file, None
+    return source_file, hasher.hexdigest()
+
+
+class SourceHashCache(object):
+    """
+    Content hashes of the source files keyed by their path. A cached hash is
+    used only while the inode, the modification time and the size of the
+    file are the same as when it was hashed, so every file is read at most
+    once.
+
+    The cache can be persisted in the report directories, so subsequent
+    stores of the same results hash only the changed source files. It also
+    remembers which content hashes are already stored on the server the
+    results were sent to, so their presence does not have to be queried
+    again.
+    """
+
+    CACHE_FILE = '.store_cache.json'
+
+    VERSION = 1
+
+    def __init__(self, server_url=None):
+        self.__server_url = server_url
+        self.__hashes = {}
+        self.__used = set()
+        self.__stored_hashes = {}
+
+    @classmethod
+    def load(cls, report_dirs, server_url):
+        """
+        Create a cache from the cache files of the given report directories.
+        """
+        cache = cls(server_url)
+        for report_dir in report_dirs:
+            cache_file = os.path.join(report_dir, cls.CACHE_FILE)
+            if not os.path.isfile(cache_file):
+                continue
+
+            try:
+                with open(cache_file, 'r') as cache_data:
+                    content = json.load(cache_data)
+
+                if content.get('version') != cls.VERSION:
+                    continue
+
+                cache.__hashes.update(content['files'])
+                for url, hashes in content['servers'].items():
+                    cache.__stored_hashes.setdefault(url, set()) \
+                        .update(hashes)
+            except (IOError, ValueError, KeyError, AttributeError) as ex:
+                LOG.debug("Failed to read the store cache '{0}': {1}"
+                          .format(cache_file, ex))
+
+        return cache
+
+    def save(self, report_dirs):
+        """
+        Write the cache to the given report directories. Only the source
+        files used since the cache was loaded are kept.
+        """
+        content = {
+            'version': self.VERSION,
+            'files': {f: self.__hashes[f] for f in self.__used
+                      if f in self.__hashes},
+            'servers': {url: list(hashes) for url, hashes
+                        in self.__stored_hashes.items()}}
+
+        for report_dir in report_dirs:
+            cache_file = os.path.join(report_dir, self.CACHE_FILE)
+            try:
+                with open(cache_file, 'w') as cache_data:
+                    json.dump(content, cache_data)
+            except IOError as ex:
+                LOG.debug("Failed to write the store cache '{0}': {1}"
+                          .format(cache_file, ex))
+
+    def __stat_key(self, source_file):
+        stat = os.stat(source_file)
+        return [stat.st_ino, stat.st_mtime, stat.st_size]
+
+    def get(self, source_file):
+        self.__used.add(source_file)
+        entry = self.__hashes.get(source_file)
+        if entry and entry[:3] == self.__stat_key(source_file):
+            return entry[3]
+
+    def put(self, source_file, content_hash):
+        self.__used.add(source_file)
+        self.__hashes[source_file] = \
+            self.__stat_key(source_file) + [content_hash]
+
+    def get_stored_hashes(self):
+        """
+        Return the content hashes known to be stored on the server.
+        """
+        return self.__stored_hashes.get(self.__server_url, set())
+
+    def set_stored_hashes(self, content_hashes):
+        self.__stored_hashes[self.__server_url] = set(content_hashes)
+
+    def get_used_hashes(self):
+        """
+        Return the content hashes of the source files used since the cache
+        was loaded.
+        """
+        return set(self.__hashes[f][3] for f in self.__used
+                   if f in self.__hashes)
+
+    def clear_stored_hashes(self):
+        self.__stored_hashes.pop(self.__server_url, None)
+
+
+def _map(pool, func, iterable):
+    """
+    Map the function over the iterable in the process pool if there is any.
+    The results are returned in order.
+    """
+    if pool:
+        return pool.imap(func, iterable, chunksize=16)
+    return (func(item) for item in iterable)
+
+
+def get_report_dirs(inputs):
+    """
+    Return the directories of the analysis results given as input.
+    """
+    report_dirs = set()
+    for input_path in inputs:
+        input_path = os.path.abspath(input_path)
+        if os.path.isfile(input_path):
+            input_path = os.path.dirname(input_path)
+        if os.path.isdir(input_path):
+            report_dirs.add(input_path)
+
+    return sorted(report_dirs)
+
+
+def _collect_report_files(inputs):
+    report_files = []
+    metadata_files = []
+    for input_path in inputs:
+        input_path = os.path.abspath(input_path)
+
+        if not os.path.exists(input_path):
+            raise OSError(errno.ENOENT,
+                          "Input path does not exist", input_path)
+
+        if os.path.isfile(input_path):
+            files = [input_path]
+            input_path = os.path.dirname(input_path)
+        else:
+            _, _, files = next(os.walk(input_path), ([], [], []))
+
+        for f in files:
+            if f.endswith(".plist"):
+                report_files.append(os.path.join(input_path, f))
+            elif f == 'metadata.json':
+                metadata_files.append(os.path.join(input_path, f))
+
+    return report_files, metadata_files
+
+
+def assemble_zip(inputs, zip_file, client, jobs=1, hash_cache=None):
+    """
+    Collect the reports and the source files needed by the server into the
+    mass store ZIP. The plist files are parsed and the source files are
+    hashed in a pool of the given number of processes.
+    """
+    if hash_cache is None:
+        hash_cache = SourceHashCache()
+
+    hash_to_file = {}
+    # There can be files with same hash,
+    # but different path.
+    file_to_hash = {}
+
+    report_files, metadata_files = _collect_report_files(inputs)
+
+    pool = multiprocessing.Pool(jobs) if jobs > 1 else None
+    try:
+        with zipfile.ZipFile(zip_file, 'a') as zipf:
+            parsed_reports = []
+            source_files = set()
+            for plist_file, files, interchange in \
+                    _map(pool, parse_report_file, report_files):
+                if files is None:
+                    continue
+
+                parsed_reports.append((plist_file, files, interchange))
+                source_files.update(files)
+
+            to_hash = []
+            for f in source_files:
+                content_hash = hash_cache.get(f)
+                if content_hash:
+                    file_to_hash[f] = content_hash
+                else:
+                    to_hash.append(f)
+
+            LOG.debug("Hashing {0} source files ({1} cached)..."
+                      .format(len(to_hash), len(file_to_hash)))
+            for f, content_hash in _map(pool, hash_source_file, to_hash):
+                if content_hash is None:
+                    continue
+                hash_cache.put(f, content_hash)
+                file_to_hash[f] = content_hash
+
+            # The reports are written after the source files are hashed, so
+            # the reports referring to a source file which could not be read
+            # are skipped.
+            for plist_file, files, interchange in parsed_reports:
+                if any(f not in file_to_hash for f in files):
+                    LOG.warning("Skipping '{0}' because it contains "
+                                "a source file which could not be read."
+                                .format(plist_file))
+                    continue
+
+                LOG.debug("Copying reports of '{0}' to ZIP assembly dir..."
+                          .format(plist_file))
+                zip_name = os.path.join(
+                    'reports',
+                    os.path.basename(plist_file) +
+                    report_interchange.EXTENSION)
+                if interchange is None:
+                    zipf.write(report_interchange.get_interchange_file(
+                        plist_file), zip_name)
+                else:
+                    zipf.writestr(zip_name, interchange)
+
+            for metadata_file in metadata_files:
+                zipf.write(metadata_file, os.path.join('reports',
+                                                       'metadata.json'))
+
+            for f, content_hash in file_to_hash.items():
+                hash_to_file[content_hash] = f
+
+            # The contents already sent to the server in a previous store
+            # are not queried again.
+            stored_hashes = hash_cache.get_stored_hashes()
+            necessary_hashes = client.getMissingContentHashes(
+                [h for h in hash_to_file if h not in stored_hashes])
+            for f, h in file_to_hash.items():
+                if h in necessary_hashes:
+                    LOG.debug("File contents for '{0}' needed by the server"
+                              .format(f))
+
+                    zipf.write(f, os.path.join('root', f.lstrip('/')))
+
+            zipf.writestr('content_hashes.json', json.dumps(file_to_hash))
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+    # Compressing .zip file
+    compressed_file = zip_file + '.z'
+    compress_file(zip_file, compressed_file)
+    os.rename(compressed_file, zip_file)
+
+    LOG.debug("[ZIP] Mass store zip written at '{0}'".format(zip_file))
+
+
+def compress_file(source_file, target_file):
+    """
+    Compress the given file with zlib. The file is streamed through a fixed
+    size buffer so it is never held in memory as a whole.
+    """
+    compressor = zlib.compressobj(zlib.Z_BEST_COMPRESSION)
+    with open(source_file, 'rb') as source, \
+            open(target_file, 'wb') as target:
+        for chunk in iter(lambda: source.read(STORE_CHUNK_SIZE), ''):
+            target.write(compressor.compress(chunk))
+        target.write(compressor.flush())
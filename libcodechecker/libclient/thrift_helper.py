@@ -9,7 +9,7 @@ import socket
 import sys
 
 from thrift.transport import THttpClient
-from thrift.protocol import TJSONProtocol
+from thrift.protocol import TBinaryProtocol
 from thrift.protocol.TProtocol import TProtocolException
 
 import shared
@@ -29,8 +29,11 @@ class ThriftClientHelper(object):
         self.__host = host
         self.__port = port
         url = util.create_product_url(protocol, host, port, uri)
-        self.transport = THttpClient.THttpClient(url)
-        self.protocol = TJSONProtocol.TJSONProtocol(self.transport)
+        # The binary protocol is requested, its messages are smaller and
+        # faster to process than the JSON messages of the web viewer.
+        self.transport = THttpClient.THttpClient(url + '?protocol=binary')
+        self.protocol = \
+            TBinaryProtocol.TBinaryProtocolAccelerated(self.transport)
         self.client = codeCheckerDBAccess.Client(self.protocol)
 
         if session_token:
@@ -152,6 +155,11 @@ class ThriftClientHelper(object):
                       cmpData):
         pass
 
+    @ThriftClientCall
+    def getRunResultsPage(self, runIds, limit, cursor, sortType, reportFilter,
+                          cmpData):
+        pass
+
     @ThriftClientCall
     def getRunResultCount(self, runIds, reportFilter, cmpData):
         pass
@@ -180,6 +188,10 @@ class ThriftClientHelper(object):
     def getCheckerCounts(self, base_run_ids, reportFilter, cmpData):
         pass
 
+    @ThriftClientCall
+    def getCheckerStatusCounts(self, runIds, reportFilter, cmpData):
+        pass
+
     # STORAGE RELATED API CALLS
 
     @ThriftClientCall
@@ -189,3 +201,35 @@ class ThriftClientHelper(object):
     @ThriftClientCall
     def massStoreRun(self, name, tag, version, zipdir, force):
         pass
+
+    @ThriftClientCall
+    def beginMassStoreRun(self, name, tag, version, force):
+        pass
+
+    def appendMassStoreRunChunk(self, store_token, offset, chunk):
+        """
+        Unlike the other API calls, connection errors are not handled here
+        but are propagated to the caller, so an interrupted upload can be
+        resumed.
+        """
+        self.transport.open()
+        try:
+            return self.client.appendMassStoreRunChunk(store_token, offset,
+                                                       chunk)
+        finally:
+            self.transport.close()
+
+    def getMassStoreRunOffset(self, store_token):
+        """
+        Connection errors are propagated to the caller, see
+        appendMassStoreRunChunk().
+        """
+        self.transport.open()
+        try:
+            return self.client.getMassStoreRunOffset(store_token)
+        finally:
+            self.transport.close()
+
+    @ThriftClientCall
+    def commitMassStoreRun(self, store_token):
+        pass
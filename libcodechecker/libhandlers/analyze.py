@@ -148,6 +148,22 @@ def add_arguments_to_parser(parser):
                              "reports and overwrites only those files that "
                              "were update by the current build command).")
 
+    parser.add_argument('--incremental',
+                        dest="incremental",
+                        required=False,
+                        action='store_true',
+                        default=argparse.SUPPRESS,
+                        help="Do not analyze the compilation commands again "
+                             "whose source file, included headers, compiler "
+                             "options, analyzer version and checker "
+                             "configuration are the same as at the previous "
+                             "analysis into the output directory, but keep "
+                             "their previous results. With CTU analysis "
+                             "only the 'collect' phase is incremental: the "
+                             "AST dumps and function maps of the unchanged "
+                             "translation units are reused and kept in "
+                             "'<OUTPUT_DIR>/ctu-dir' after the analysis.")
+
     parser.add_argument('-n', '--name',
                         dest="name",
                         required=False,
@@ -260,6 +276,16 @@ def add_arguments_to_parser(parser):
                                    "in-memory recompilation of the source "
                                    "files.")
 
+        ctu_opts.add_argument('--ctu-compress-ast',
+                              action='store_true',
+                              dest='ctu_compress_ast',
+                              default=argparse.SUPPRESS,
+                              help="If specified, the AST dumps created by "
+                                   "the 'collect' phase are stored "
+                                   "compressed, and are decompressed into a "
+                                   "temporary directory of the output "
+                                   "directory for the 'analyze' phase.")
+
     checkers_opts = parser.add_argument_group(
         "checker configuration",
         "See 'codechecker-checkers' for the list of available checkers. "
@@ -333,8 +359,10 @@ def main(args):
     # We clear the output directory in the following cases.
     ctu_dir = os.path.join(args.output_path, 'ctu-dir')
     if 'ctu_phases' in args and args.ctu_phases[0] and \
-            os.path.isdir(ctu_dir):
-        # Clear the CTU-dir if the user turned on the collection phase.
+            'incremental' not in args and os.path.isdir(ctu_dir):
+        # Clear the CTU-dir if the user turned on the collection phase. In
+        # incremental mode the collected files of the unchanged translation
+        # units are reused.
         LOG.debug("Previous CTU contents have been deleted.")
         shutil.rmtree(ctu_dir)
 
@@ -384,12 +412,21 @@ def main(args):
             metadata_prev = json.load(data)
             metadata['result_source_files'] =\
                 metadata_prev['result_source_files']
+            metadata['action_durations'] = \
+                metadata_prev.get('action_durations', {})
 
-    analyzer.perform_analysis(args, context, actions, metadata)
+            if 'incremental' in args:
+                metadata['fingerprints'] = \
+                    metadata_prev.get('fingerprints', {})
 
-    LOG.debug("Analysis metadata write to '" + metadata_file + "'")
-    with open(metadata_file, 'w') as metafile:
-        json.dump(metadata, metafile)
+    try:
+        analyzer.perform_analysis(args, context, actions, metadata)
+    finally:
+        # The metadata of the finished actions is kept even if the analysis
+        # failed or was interrupted.
+        LOG.debug("Analysis metadata write to '" + metadata_file + "'")
+        with open(metadata_file, 'w') as metafile:
+            json.dump(metadata, metafile)
 
     # WARN: store command will search for this file!!!!
     compile_cmd_json = os.path.join(args.output_path, 'compile_cmd.json')
@@ -183,6 +183,20 @@ def add_arguments_to_parser(parser):
                                     "overwrites only those files that were "
                                     "update by the current build command).")
 
+    analyzer_opts.add_argument('--incremental',
+                               dest="incremental",
+                               required=False,
+                               action='store_true',
+                               default=argparse.SUPPRESS,
+                               help="Do not analyze the compilation commands "
+                                    "again whose source file, included "
+                                    "headers, compiler options, analyzer "
+                                    "version and checker configuration are "
+                                    "the same as at the previous analysis "
+                                    "into the output directory, but keep "
+                                    "their previous results. (Only useful "
+                                    "if '--output' is given.)")
+
     analyzer_opts.add_argument('-i', '--ignore', '--skip',
                                dest="skipfile",
                                required=False,
@@ -297,6 +311,16 @@ def add_arguments_to_parser(parser):
                                    "in-memory recompilation of the source "
                                    "files.")
 
+        ctu_opts.add_argument('--ctu-compress-ast',
+                              action='store_true',
+                              dest='ctu_compress_ast',
+                              default=argparse.SUPPRESS,
+                              help="If specified, the AST dumps created by "
+                                   "the 'collect' phase are stored "
+                                   "compressed, and are decompressed into a "
+                                   "temporary directory of the output "
+                                   "directory for the 'analyze' phase.")
+
     checkers_opts = parser.add_argument_group(
         "checker configuration",
         "See 'codechecker-checkers' for the list of available checkers. "
@@ -437,8 +461,10 @@ def main(args):
                           'clangsa_args_cfg_file',
                           'tidy_args_cfg_file',
                           'capture_analysis_output',
+                          'incremental',
                           'ctu_phases',
                           'ctu_in_memory',
+                          'ctu_compress_ast',
                           'ordered_checkers'  # --enable and --disable.
                           ]
         for key in args_to_update:
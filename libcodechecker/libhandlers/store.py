@@ -10,25 +10,24 @@ database.
 
 import argparse
 import base64
-import errno
-import functools
-from hashlib import sha256
+import httplib
 import json
 import os
 import shutil
+import socket
 import sys
 import tempfile
-import traceback
-import zipfile
-import zlib
+import time
 
-from shared.ttypes import Permission
+from thrift.transport.TTransport import TTransportException
+
+from shared.ttypes import ErrorCode, Permission, RequestFailed
 
 from libcodechecker import generic_package_context
 from libcodechecker import host_check
 from libcodechecker import util
-from libcodechecker.analyze import plist_parser
 from libcodechecker.libclient import client as libclient
+from libcodechecker.libclient import store_zip
 from libcodechecker.logger import add_verbose_arguments
 from libcodechecker.logger import LoggerFactory
 from libcodechecker.util import split_product_url
@@ -36,17 +35,8 @@ from libcodechecker.util import split_product_url
 
 LOG = LoggerFactory.get_new_logger('STORE')
 
-
-def full_traceback(func):
-
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        try:
-            return func(*args, **kwargs)
-        except Exception as e:
-            msg = "{}\n\nOriginal {}".format(e, traceback.format_exc())
-            raise type(e)(msg)
-    return wrapper
+# The number of times an interrupted upload is attempted to be resumed.
+STORE_MAX_RETRIES = 5
 
 
 def get_argparser_ctor_args():
@@ -144,6 +134,15 @@ def add_arguments_to_parser(parser):
                                   "results for, in the format of "
                                   "'[http[s]://]host:port/Endpoint'.")
 
+    parser.add_argument('-j', '--jobs',
+                        type=int,
+                        dest="jobs",
+                        required=False,
+                        default=1,
+                        help="Number of processes to use for parsing the "
+                             "analysis results and hashing the source files "
+                             "before sending them to the server.")
+
     add_verbose_arguments(parser)
     parser.set_defaults(func=main)
 
@@ -181,78 +180,41 @@ def res_handler(results):
     LOG.info("Successful " + str(results.count(0)) + "/" + str(len(results)))
 
 
-def assemble_zip(inputs, zip_file, client):
-    hash_to_file = {}
-    # There can be files with same hash,
-    # but different path.
-    file_to_hash = {}
-
-    def collect_file_hashes_from_plist(plist_file):
-        try:
-            files, _ = plist_parser.parse_plist(plist_file)
-
-            for f in files:
-                if not os.path.isfile(f):
-                    return False
-
-                with open(f) as content:
-                    hasher = sha256()
-                    hasher.update(content.read())
-                    content_hash = hasher.hexdigest()
-                    hash_to_file[content_hash] = f
-                    file_to_hash[f] = content_hash
-
-            return True
-        except Exception as ex:
-            LOG.error('Parsing the plist failed: ' + str(ex))
-
-    with zipfile.ZipFile(zip_file, 'a') as zipf:
-        for input_path in inputs:
-            input_path = os.path.abspath(input_path)
-
-            if not os.path.exists(input_path):
-                raise OSError(errno.ENOENT,
-                              "Input path does not exist", input_path)
-
-            if os.path.isfile(input_path):
-                files = [input_path]
-            else:
-                _, _, files = next(os.walk(input_path), ([], [], []))
-
-            for f in files:
-                plist_file = os.path.join(input_path, f)
-                if f.endswith(".plist"):
-                    if collect_file_hashes_from_plist(plist_file):
-                        LOG.debug(
-                            "Copying file '{0}' to ZIP assembly dir..."
-                            .format(plist_file))
-                        zipf.write(plist_file, os.path.join('reports', f))
-                    else:
-                        LOG.warning("Skipping '{0}' because it contains "
-                                    "a missing source file."
-                                    .format(plist_file))
-                elif f == 'metadata.json':
-                    zipf.write(plist_file, os.path.join('reports', f))
-
-        necessary_hashes = client.getMissingContentHashes(hash_to_file.keys())
-        for f, h in file_to_hash.items():
-            if h in necessary_hashes:
-                LOG.debug("File contents for '{0}' needed by the server"
-                          .format(f))
+def upload_zip(client, zip_file, name, tag, version, force):
+    """
+    Upload the compressed mass store ZIP file to the server chunk by chunk and
+    store it as the given run. If the connection drops during the upload, it
+    is resumed from the last chunk acknowledged by the server.
+    """
+    store_token = client.beginMassStoreRun(name, tag, version, force)
 
-                zipf.write(f, os.path.join('root', f.lstrip('/')))
+    zip_size = os.path.getsize(zip_file)
+    offset = 0
+    retries = 0
+    with open(zip_file, 'rb') as zipf:
+        while offset < zip_size:
+            try:
+                if retries:
+                    offset = client.getMassStoreRunOffset(store_token)
 
-        zipf.writestr('content_hashes.json', json.dumps(file_to_hash))
+                zipf.seek(offset)
+                chunk = zipf.read(store_zip.STORE_CHUNK_SIZE)
+                offset = client.appendMassStoreRunChunk(
+                    store_token, offset, base64.b64encode(chunk))
+                retries = 0
 
-    # Compressing .zip file
-    with open(zip_file, 'rb') as source:
-        compressed = zlib.compress(source.read(),
-                                   zlib.Z_BEST_COMPRESSION)
+                LOG.debug("Uploaded {0}/{1} bytes.".format(offset, zip_size))
+            except (socket.error, httplib.HTTPException,
+                    TTransportException) as ex:
+                retries += 1
+                if retries > STORE_MAX_RETRIES:
+                    raise
 
-    with open(zip_file, 'wb') as target:
-        target.write(compressed)
+                LOG.warning("Upload was interrupted ({0}), resuming..."
+                            .format(ex))
+                time.sleep(retries)
 
-    LOG.debug("[ZIP] Mass store zip written at '{0}'".format(zip_file))
+    return client.commitMassStoreRun(store_token)
 
 
 def main(args):
@@ -313,18 +275,45 @@ def main(args):
     _, zip_file = tempfile.mkstemp('.zip')
     LOG.debug("Will write mass store ZIP to '{0}'...".format(zip_file))
 
-    try:
-        assemble_zip(args.input, zip_file, client)
-        with open(zip_file, 'rb') as zf:
-            b64zip = base64.b64encode(zf.read())
+    report_dirs = store_zip.get_report_dirs(args.input)
+    hash_cache = store_zip.SourceHashCache.load(
+        report_dirs,
+        util.create_product_url(protocol, host, port, '/' + product_name))
+
+    def store():
+        # The ZIP is opened for appending so it has to be emptied first.
+        open(zip_file, 'w').close()
+
+        store_zip.assemble_zip(args.input, zip_file, client, args.jobs,
+                               hash_cache)
 
         context = generic_package_context.get_context()
 
-        client.massStoreRun(args.name,
-                            args.tag if 'tag' in args else None,
-                            str(context.version),
-                            b64zip,
-                            'force' in args)
+        upload_zip(client,
+                   zip_file,
+                   args.name,
+                   args.tag if 'tag' in args else None,
+                   str(context.version),
+                   'force' in args)
+
+    try:
+        try:
+            store()
+        except RequestFailed as reqfail:
+            if reqfail.errorCode != ErrorCode.SOURCE_MISSING or \
+                    not hash_cache.get_stored_hashes():
+                raise
+
+            # Some of the source file contents the server was believed to
+            # have were removed from it since the previous store, so the
+            # contents are sent again based on the server's answer.
+            LOG.info("Storing failed, retrying without the contents "
+                     "remembered to be stored on the server...")
+            hash_cache.clear_stored_hashes()
+            store()
+
+        hash_cache.set_stored_hashes(hash_cache.get_used_hashes())
+        hash_cache.save(report_dirs)
 
         LOG.info("Storage finished successfully.")
     except Exception as ex:
@@ -233,6 +233,7 @@ class ThriftAuthHandler(object):
             handler.add_permission(auth_name, is_group)
 
             session.commit()
+            permissions.invalidate_permission_cache()
             return True
 
         except sqlalchemy.exc.SQLAlchemyError as alchemy_ex:
@@ -264,6 +265,7 @@ class ThriftAuthHandler(object):
             handler.remove_permission(auth_name, is_group)
 
             session.commit()
+            permissions.invalidate_permission_cache()
             return True
 
         except sqlalchemy.exc.SQLAlchemyError as alchemy_ex:
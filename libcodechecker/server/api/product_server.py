@@ -407,6 +407,7 @@ class ThriftProductHandler(object):
                 'productID': orm_prod.id
             })
             session.commit()
+            permissions.invalidate_permission_cache()
             LOG.debug("Product configuration added to database successfully.")
 
             # The orm_prod object above is not bound to the database as it
@@ -632,6 +633,7 @@ class ThriftProductHandler(object):
 
             session.delete(product)
             session.commit()
+            permissions.invalidate_permission_cache()
             return True
 
         except sqlalchemy.exc.SQLAlchemyError as alchemy_ex:
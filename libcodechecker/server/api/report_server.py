@@ -9,8 +9,10 @@ Handle Thrift requests.
 
 import base64
 import codecs
+import copy
 from collections import defaultdict
 from datetime import datetime
+import functools
 import json
 import os
 import shutil
@@ -18,6 +20,7 @@ import sys
 import tempfile
 import threading
 import time
+import uuid
 import zipfile
 import zlib
 
@@ -32,6 +35,7 @@ from libcodechecker import generic_package_context
 from libcodechecker import suppress_handler
 # TODO: Cross-subpackage import here.
 from libcodechecker.analyze import plist_parser
+from libcodechecker.analyze import report_interchange
 from libcodechecker.analyze import store_handler
 from libcodechecker.logger import LoggerFactory
 from libcodechecker.profiler import timeit
@@ -40,6 +44,9 @@ from libcodechecker.server.database.run_db_model import *
 
 LOG = LoggerFactory.get_new_logger('RUN ACCESS HANDLER')
 
+# Size of the buffer used when streaming the uploaded mass store ZIP files.
+STORE_BUFFER_SIZE = 1024 * 1024
+
 
 class CountFilter:
     FILE = 0
@@ -51,6 +58,17 @@ class CountFilter:
     RUN_HISTORY_TAG = 6
 
 
+def cached_response(func):
+    """
+    Decorator of the read-only API methods whose responses can be served
+    from the response cache of the product until the stored data changes.
+    """
+    @functools.wraps(func)
+    def wrapper(self, *args):
+        return self._cached_response(func, args)
+    return wrapper
+
+
 def conv(text):
     """
     Convert * to % got from clients for the database queries.
@@ -151,31 +169,44 @@ def process_report_filter_v2(report_filter, count_filter=None):
     return filter_expr
 
 
-def get_diff_hashes_for_query(base_run_ids, base_line_hashes, new_run_ids,
-                              new_check_hashes, diff_type):
+def get_diff_hashes_for_query(base_run_ids, new_run_ids, diff_type):
     """
-    Get the report hash list for the result comparison.
+    Get the subquery of the report hashes for the result comparison.
 
-    Returns the list of hashes (NEW, RESOLVED, UNRESOLVED) and
-    the run ids which should be queried for the reports.
+    Returns the subquery selecting the hashes (NEW, RESOLVED, UNRESOLVED)
+    and the run ids which should be queried for the reports. The difference
+    is computed by the database, the hashes are not fetched.
     """
     if diff_type == DiffType.NEW:
-        df = [] + list(new_check_hashes.difference(base_line_hashes))
-        return df, new_run_ids
-
+        run_ids, other_run_ids, in_other_runs = \
+            new_run_ids, base_run_ids, False
     elif diff_type == DiffType.RESOLVED:
-        df = [] + list(base_line_hashes.difference(new_check_hashes))
-        return df, base_run_ids
-
+        run_ids, other_run_ids, in_other_runs = \
+            base_run_ids, new_run_ids, False
     elif diff_type == DiffType.UNRESOLVED:
-        df = [] + list(base_line_hashes.intersection(new_check_hashes))
-        return df, new_run_ids
+        run_ids, other_run_ids, in_other_runs = \
+            new_run_ids, base_run_ids, True
     else:
         msg = 'Unsupported diff type: ' + str(diff_type)
         LOG.error(msg)
         raise shared.ttypes.RequestFailed(shared.ttypes.ErrorCode.DATABASE,
                                           msg)
 
+    # The tables are aliased so the subquery is not correlated with the
+    # reports of the query it is used in.
+    reports = Report.__table__.alias('diff_reports')
+    other_reports = Report.__table__.alias('diff_other_reports')
+
+    other_exists = exists().where(
+        and_(other_reports.c.bug_id == reports.c.bug_id,
+             other_reports.c.run_id.in_(other_run_ids)))
+
+    diff_hashes = select([reports.c.bug_id]) \
+        .where(and_(reports.c.run_id.in_(run_ids),
+                    other_exists if in_other_runs else ~other_exists))
+
+    return diff_hashes, run_ids
+
 
 def get_run_result_query_helper(session, run_ids, report_filter, is_unique,
                                 is_count=False):
@@ -210,6 +241,91 @@ def get_run_result_query_helper(session, run_ids, report_filter, is_unique,
     return q
 
 
+def get_sort_keys(sort_types):
+    """
+    Return the (expression, order) pairs the results are sorted by in the
+    cursor based pagination. The report id is the last key, so the keys of
+    every result are unique. NULL values are replaced because they are
+    ordered differently by the database engines.
+    """
+    sort_type_map = {
+        SortType.FILENAME: [func.coalesce(File.filepath, '')],
+        SortType.CHECKER_NAME: [func.coalesce(Report.checker_id, '')],
+        SortType.SEVERITY: [func.coalesce(Report.severity, 0)],
+        SortType.REVIEW_STATUS: [func.coalesce(ReviewStatus.status,
+                                               'unreviewed')],
+        SortType.DETECTION_STATUS: [Report.detection_status]}
+
+    if sort_types is None:
+        sort_types = [SortMode(SortType.SEVERITY, Order.DESC)]
+
+    sort_keys = []
+    for sort in sort_types:
+        for expr in sort_type_map.get(sort.type, []):
+            sort_keys.append((expr, sort.ord))
+
+    sort_keys.append((Report.id, Order.ASC))
+    return sort_keys
+
+
+def encode_cursor(sort_values):
+    """
+    Create the continuation token of a result page from the sort key values
+    of its last result.
+    """
+    return base64.urlsafe_b64encode(json.dumps(sort_values))
+
+
+def decode_cursor(cursor, sort_keys):
+    try:
+        sort_values = json.loads(base64.urlsafe_b64decode(str(cursor)))
+    except (TypeError, ValueError):
+        sort_values = None
+
+    if not isinstance(sort_values, list) or \
+            len(sort_values) != len(sort_keys):
+        msg = 'Invalid result cursor: ' + cursor
+        LOG.error(msg)
+        raise shared.ttypes.RequestFailed(shared.ttypes.ErrorCode.GENERAL,
+                                          msg)
+
+    return sort_values
+
+
+def get_keyset_filter(sort_keys, sort_values):
+    """
+    Filter the results which come after the result with the given sort key
+    values in the order of the sort keys.
+    """
+    OR = []
+    for i, (expr, order) in enumerate(sort_keys):
+        AND = [prev_expr == value for (prev_expr, _), value
+               in zip(sort_keys[:i], sort_values[:i])]
+        if order == Order.DESC:
+            AND.append(expr < sort_values[i])
+        else:
+            AND.append(expr > sort_values[i])
+        OR.append(and_(*AND))
+
+    return or_(*OR)
+
+
+def report_db_to_api(report, source_file, review_status):
+    return ReportData(runId=report.run_id,
+                      bugHash=report.bug_id,
+                      checkedFile=source_file.filepath,
+                      checkerMsg=report.checker_message,
+                      reportId=report.id,
+                      fileId=source_file.id,
+                      line=report.line,
+                      column=report.column,
+                      checkerId=report.checker_id,
+                      severity=report.severity,
+                      reviewData=create_review_data(review_status),
+                      detectionStatus=detection_status_enum(
+                          report.detection_status))
+
+
 def bugpathevent_db_to_api(bpe):
     return ttypes.BugPathEvent(
         startLine=bpe.line_begin,
@@ -229,6 +345,39 @@ def bugreportpoint_db_to_api(brp):
         fileId=brp.file_id)
 
 
+def get_bug_items(session, report_id, item_type):
+    """
+    Return the bug path events or the bug report points of a report in
+    order, together with the path of their files.
+    """
+    return session.query(item_type, File.filepath) \
+        .outerjoin(File, item_type.file_id == File.id) \
+        .filter(item_type.report_id == report_id) \
+        .order_by(item_type.order) \
+        .all()
+
+
+def get_report_details(session, report_id):
+    """
+    Return the bug path events and the bug report points of a report. The
+    file paths are loaded by the same queries, not one by one.
+    """
+    bug_events_list = []
+    for event, file_path in get_bug_items(session, report_id, BugPathEvent):
+        event = bugpathevent_db_to_api(event)
+        event.filePath = file_path
+        bug_events_list.append(event)
+
+    bug_point_list = []
+    for bug_point, file_path in get_bug_items(session, report_id,
+                                              BugReportPoint):
+        bug_point = bugreportpoint_db_to_api(bug_point)
+        bug_point.filePath = file_path
+        bug_point_list.append(bug_point)
+
+    return ReportDetails(bug_events_list, bug_point_list)
+
+
 def detection_status_enum(status):
     if status == 'new':
         return DetectionStatus.NEW
@@ -280,13 +429,35 @@ def unzip(b64zip):
     the name of the extracted directory.
     """
 
+    _, compressed_file = tempfile.mkstemp('.zip.z')
+    with open(compressed_file, 'wb') as compressed_f:
+        compressed_f.write(base64.b64decode(b64zip))
+
+    try:
+        return unzip_compressed(compressed_file)
+    finally:
+        os.remove(compressed_file)
+
+
+def unzip_compressed(compressed_file):
+    """
+    This function decompresses the zlib compressed zip file at the given path
+    and extracts it to a temporary directory. The decompression is streamed
+    through a fixed size buffer so the ZIP file is never held in memory as a
+    whole. The function returns the name of the extracted directory.
+    """
+
     _, zip_file = tempfile.mkstemp('.zip')
     temp_dir = tempfile.mkdtemp()
     LOG.debug("Unzipping mass storage ZIP '{0}' to '{1}'..."
               .format(zip_file, temp_dir))
 
-    with open(zip_file, 'wb') as zip_f:
-        zip_f.write(zlib.decompress(base64.b64decode(b64zip)))
+    decompressor = zlib.decompressobj()
+    with open(compressed_file, 'rb') as compressed_f, \
+            open(zip_file, 'wb') as zip_f:
+        for chunk in iter(lambda: compressed_f.read(STORE_BUFFER_SIZE), ''):
+            zip_f.write(decompressor.decompress(chunk))
+        zip_f.write(decompressor.flush())
 
     with zipfile.ZipFile(zip_file, 'r') as zipf:
         try:
@@ -318,6 +489,86 @@ def create_count_expression(report_filter):
         return func.count(literal_column('*'))
 
 
+def is_statistics_filter(report_filter, cmp_data):
+    """
+    The report counts can be read from the pre-aggregated report statistics
+    if the reports are filtered only by properties which are kept there.
+    """
+    if cmp_data:
+        return False
+
+    if report_filter is None:
+        return True
+
+    return report_filter.checkerMsg is None and \
+        report_filter.reportHash is None and \
+        report_filter.runHistoryTag is None and \
+        report_filter.firstDetectionDate is None and \
+        report_filter.fixDate is None
+
+
+def process_statistics_filter(report_filter, count_filter=None):
+    """
+    Process the report filter on the report statistics table. Only the
+    filters accepted by is_statistics_filter() are handled.
+    """
+
+    if report_filter is None:
+        return text('')
+
+    AND = []
+    if report_filter.filepath is not None and count_filter != CountFilter.FILE:
+        OR = [File.filepath.ilike(conv(fp))
+              for fp in report_filter.filepath]
+        AND.append(or_(*OR))
+
+    if report_filter.checkerName is not None and \
+       count_filter != CountFilter.CHECKER_NAME:
+        OR = [ReportStatistics.checker_id.ilike(conv(cn))
+              for cn in report_filter.checkerName]
+        AND.append(or_(*OR))
+
+    if report_filter.severity is not None and \
+       count_filter != CountFilter.SEVERITY:
+        AND.append(ReportStatistics.severity.in_(report_filter.severity))
+
+    if report_filter.detectionStatus is not None and \
+       count_filter != CountFilter.DETECTION_STATUS:
+        dst = list(map(detection_status_str,
+                       report_filter.detectionStatus))
+        AND.append(ReportStatistics.detection_status.in_(dst))
+
+    if report_filter.reviewStatus is not None and \
+       count_filter != CountFilter.REVIEW_STATUS:
+        rst = list(map(review_status_str, report_filter.reviewStatus))
+        AND.append(ReportStatistics.review_status.in_(rst))
+
+    filter_expr = and_(*AND)
+    return filter_expr
+
+
+def get_statistics_query(session, run_ids, report_filter, count_filter,
+                         *columns):
+    """
+    Query the number of the reports from the report statistics table. The
+    given columns are returned before the count, the caller should group
+    the results by them. The unique reports are counted by their bug hash.
+    """
+    filter_expression = process_statistics_filter(report_filter,
+                                                  count_filter)
+
+    if report_filter is not None and report_filter.isUnique:
+        count_expr = func.count(ReportStatistics.bug_hash.distinct())
+    else:
+        count_expr = func.sum(ReportStatistics.count)
+
+    return session.query(*(columns + (count_expr,))) \
+        .filter(ReportStatistics.run_id.in_(run_ids)) \
+        .outerjoin(File,
+                   ReportStatistics.file_id == File.id) \
+        .filter(filter_expression)
+
+
 class StorageSession:
     """
     This class is a singleton which helps to handle a transaction which
@@ -351,6 +602,8 @@ class StorageSession:
                          Report.fixed_at: run_history_time},
                         synchronize_session='fetch')
 
+            store_handler.update_run_statistics(transaction, run_id)
+
             transaction.commit()
             transaction.close()
 
@@ -402,6 +655,111 @@ class StorageSession:
         return getattr(self.instance, name)
 
 
+class MassStoreUpload:
+    """
+    This class is a singleton which keeps track of the chunked mass store
+    uploads in progress. Every upload has its own temporary directory where
+    the received chunks of the compressed ZIP file are appended, so the
+    uploaded file is never kept in memory. Uploads which are not touched for
+    UPLOAD_TIMEOUT seconds are considered abandoned and are removed.
+    """
+
+    UPLOAD_TIMEOUT = 3600
+
+    class __MassStoreUpload:
+        def __init__(self):
+            self.__uploads = dict()
+            self.__lock = threading.Lock()
+
+        def begin_upload(self, product_id, name, tag, version, force):
+            self._timeout_uploads()
+
+            token = uuid.uuid4().hex
+            upload_dir = tempfile.mkdtemp(prefix='cc_store_')
+            upload_file = os.path.join(upload_dir, 'store.zip.z')
+            open(upload_file, 'wb').close()
+
+            with self.__lock:
+                self.__uploads[token] = {
+                    'product_id': product_id,
+                    'name': name,
+                    'tag': tag,
+                    'version': version,
+                    'force': force,
+                    'file': upload_file,
+                    'dir': upload_dir,
+                    'size': 0,
+                    'lock': threading.Lock(),
+                    'timer': time.time()}
+
+            return token
+
+        def __get_upload(self, product_id, token):
+            with self.__lock:
+                upload = self.__uploads.get(token)
+
+            if not upload or upload['product_id'] != product_id:
+                raise shared.ttypes.RequestFailed(
+                    shared.ttypes.ErrorCode.GENERAL,
+                    "No upload in progress with the given token.")
+
+            upload['timer'] = time.time()
+            return upload
+
+        def append_chunk(self, product_id, token, offset, chunk):
+            upload = self.__get_upload(product_id, token)
+
+            with upload['lock']:
+                # A chunk which does not continue the received data exactly
+                # is dropped. This is the case when the client resends a
+                # chunk whose acknowledgement was lost.
+                if offset == upload['size']:
+                    with open(upload['file'], 'ab') as upload_file:
+                        upload_file.write(chunk)
+                    upload['size'] += len(chunk)
+
+                return upload['size']
+
+        def get_size(self, product_id, token):
+            return self.__get_upload(product_id, token)['size']
+
+        def finish_upload(self, product_id, token):
+            """
+            Closes the upload and returns its data. The caller is responsible
+            for removing the upload's directory.
+            """
+            upload = self.__get_upload(product_id, token)
+
+            with self.__lock:
+                self.__uploads.pop(token, None)
+
+            return upload
+
+        def _timeout_uploads(self):
+            with self.__lock:
+                expired = [token for token, upload
+                           in self.__uploads.iteritems()
+                           if time.time() - upload['timer'] >
+                           MassStoreUpload.UPLOAD_TIMEOUT]
+
+                for token in expired:
+                    LOG.info("Upload timeout for run '{0}'"
+                             .format(self.__uploads[token]['name']))
+                    shutil.rmtree(self.__uploads[token]['dir'],
+                                  ignore_errors=True)
+                    del self.__uploads[token]
+
+    instance = None
+
+    def __init__(self):
+        if not MassStoreUpload.instance:
+            MassStoreUpload.instance = \
+                MassStoreUpload.__MassStoreUpload()
+
+    def __getattr__(self, name):
+        return getattr(self.instance, name)
+
+
 class ThriftRequestHandler(object):
     """
     Connect to database and handle thrift client requests.
@@ -430,6 +788,7 @@ class ThriftRequestHandler(object):
         self.__package_version = package_version
         self.__Session = Session
         self.__storage_session = StorageSession()
+        self.__store_upload = MassStoreUpload()
 
         self.__permission_args = {
             'productID': product.id
@@ -469,6 +828,22 @@ class ThriftRequestHandler(object):
     def __require_store(self):
         self.__require_permission([permissions.PRODUCT_STORE])
 
+    def _cached_response(self, func, args):
+        """
+        Return the response of the API method from the response cache of
+        the product. The access is checked even if the response is cached.
+        """
+        self.__require_access()
+        return self.__product.response_cache.get(
+            func.__name__, args, lambda: func(self, *args))
+
+    def __invalidate_responses(self):
+        """
+        Drop the cached responses after the stored data of the product was
+        modified.
+        """
+        self.__product.response_cache.invalidate()
+
     def __sortResultsQuery(self, query, sort_types=None, is_unique=False):
         """
         Helper method for __queryDiffResults and queryResults to apply sorting.
@@ -515,8 +890,8 @@ class ThriftRequestHandler(object):
         return run_ids
 
     @timeit
+    @cached_response
     def getRunData(self, run_filter):
-        self.__require_access()
         try:
             session = self.__Session()
 
@@ -670,9 +1045,9 @@ class ThriftRequestHandler(object):
             session.close()
 
     @timeit
+    @cached_response
     def getRunResults(self, run_ids, limit, offset, sort_types,
                       report_filter, cmp_data):
-        self.__require_access()
         max_query_limit = constants.MAX_QUERY_SIZE
         if limit > max_query_limit:
             LOG.debug('Query limit ' + str(limit) +
@@ -694,9 +1069,6 @@ class ThriftRequestHandler(object):
                 diff_hashes, run_ids = self._cmp_helper(session,
                                                         run_ids,
                                                         cmp_data)
-                if not diff_hashes:
-                    # There is no difference.
-                    return results
 
             is_unique = report_filter is not None and report_filter.isUnique
             q = get_run_result_query_helper(session, run_ids, report_filter,
@@ -734,23 +1106,9 @@ class ThriftRequestHandler(object):
             else:
                 for report, source_file, review_status in \
                         q.limit(limit).offset(offset):
-
-                    review_data = create_review_data(review_status)
-                    results.append(
-                        ReportData(runId=report.run_id,
-                                   bugHash=report.bug_id,
-                                   checkedFile=source_file.filepath,
-                                   checkerMsg=report.checker_message,
-                                   reportId=report.id,
-                                   fileId=source_file.id,
-                                   line=report.line,
-                                   column=report.column,
-                                   checkerId=report.checker_id,
-                                   severity=report.severity,
-                                   reviewData=review_data,
-                                   detectionStatus=detection_status_enum(
-                                       report.detection_status))
-                    )
+                    results.append(report_db_to_api(report,
+                                                    source_file,
+                                                    review_status))
 
             return results
 
@@ -763,13 +1121,87 @@ class ThriftRequestHandler(object):
             session.close()
 
     @timeit
+    @cached_response
+    def getRunResultsPage(self, run_ids, limit, cursor, sort_types,
+                          report_filter, cmp_data):
+        """
+        Return a page of the results. The pages are selected by the sort key
+        values of the last result of the previous page instead of an offset,
+        so the database does not have to sort and skip the previous pages.
+        """
+        if report_filter is not None and report_filter.isUnique:
+            msg = 'Unique results can not be queried by pages.'
+            LOG.error(msg)
+            raise shared.ttypes.RequestFailed(shared.ttypes.ErrorCode.GENERAL,
+                                              msg)
+
+        max_query_limit = constants.MAX_QUERY_SIZE
+        if limit > max_query_limit:
+            LOG.debug('Query limit ' + str(limit) +
+                      ' was larger than max query limit ' +
+                      str(max_query_limit) + ', setting limit to ' +
+                      str(max_query_limit))
+            limit = max_query_limit
+
+        sort_keys = get_sort_keys(sort_types)
+
+        session = self.__Session()
+
+        try:
+
+            page = ReportDataPage(reports=[], nextCursor='')
+
+            if not run_ids:
+                run_ids = self.__get_run_ids_to_query(session, cmp_data)
+
+            if cmp_data:
+                diff_hashes, run_ids = self._cmp_helper(session,
+                                                        run_ids,
+                                                        cmp_data)
+
+            q = get_run_result_query_helper(session, run_ids, report_filter,
+                                            False) \
+                .add_columns(*[expr for expr, _ in sort_keys])
+
+            if cmp_data:
+                q = q.filter(Report.bug_id.in_(diff_hashes))
+
+            if cursor:
+                q = q.filter(get_keyset_filter(
+                    sort_keys, decode_cursor(cursor, sort_keys)))
+
+            for expr, order in sort_keys:
+                q = q.order_by(desc(expr) if order == Order.DESC
+                               else asc(expr))
+
+            rows = q.limit(limit).all()
+            for row in rows:
+                report, source_file, review_status = row[:3]
+                page.reports.append(report_db_to_api(report,
+                                                     source_file,
+                                                     review_status))
+
+            if rows and len(rows) == limit:
+                page.nextCursor = encode_cursor(list(rows[-1][3:]))
+
+            return page
+
+        except sqlalchemy.exc.SQLAlchemyError as alchemy_ex:
+            msg = str(alchemy_ex)
+            LOG.error(msg)
+            raise shared.ttypes.RequestFailed(shared.ttypes.ErrorCode.DATABASE,
+                                              msg)
+        finally:
+            session.close()
+
+    @timeit
+    @cached_response
     def getRunReportCounts(self, run_ids, report_filter):
         """
           Count the results separately for multiple runs.
           If an empty run id list is provided the report
           counts will be calculated for all of the available runs.
         """
-        self.__require_access()
         results = []
         session = self.__Session()
         try:
@@ -802,11 +1234,12 @@ class ThriftRequestHandler(object):
                                               msg)
         finally:
             session.close()
-            return results
+
+        return results
 
     @timeit
+    @cached_response
     def getRunResultCount(self, run_ids, report_filter, cmp_data):
-        self.__require_access()
         session = self.__Session()
 
         try:
@@ -818,9 +1251,6 @@ class ThriftRequestHandler(object):
                 diff_hashes, run_ids = self._cmp_helper(session,
                                                         run_ids,
                                                         cmp_data)
-                if not diff_hashes:
-                    # There is no difference.
-                    return 0
 
             is_unique = report_filter is not None and report_filter.isUnique
             q = get_run_result_query_helper(session, run_ids, report_filter,
@@ -845,21 +1275,6 @@ class ThriftRequestHandler(object):
         finally:
             session.close()
 
-    @timeit
-    def __construct_bug_item_list(self, session, report_id, item_type):
-
-        q = session.query(item_type) \
-            .filter(item_type.report_id == report_id) \
-            .order_by(item_type.order)
-
-        bug_items = []
-
-        for event in q:
-            f = session.query(File).get(event.file_id)
-            bug_items.append((event, f.filepath))
-
-        return bug_items
-
     @timeit
     def getReportDetails(self, reportId):
         """
@@ -870,28 +1285,7 @@ class ThriftRequestHandler(object):
         try:
             session = self.__Session()
 
-            report = session.query(Report).get(reportId)
-
-            events = self.__construct_bug_item_list(session,
-                                                    report.id,
-                                                    BugPathEvent)
-            bug_events_list = []
-            for event, file_path in events:
-                event = bugpathevent_db_to_api(event)
-                event.filePath = file_path
-                bug_events_list.append(event)
-
-            points = self.__construct_bug_item_list(session,
-                                                    report.id,
-                                                    BugReportPoint)
-
-            bug_point_list = []
-            for bug_point, file_path in points:
-                bug_point = bugreportpoint_db_to_api(bug_point)
-                bug_point.filePath = file_path
-                bug_point_list.append(bug_point)
-
-            return ReportDetails(bug_events_list, bug_point_list)
+            return get_report_details(session, reportId)
 
         except sqlalchemy.exc.SQLAlchemyError as alchemy_ex:
             msg = str(alchemy_ex)
@@ -917,6 +1311,9 @@ class ThriftRequestHandler(object):
                 if review_status is None:
                     review_status = ReviewStatus()
                     review_status.bug_hash = report.bug_id
+                    old_status = 'unreviewed'
+                else:
+                    old_status = review_status.status
 
                 user = self.__auth_session.user \
                     if self.__auth_session else "Anonymous"
@@ -929,6 +1326,9 @@ class ThriftRequestHandler(object):
                 session.add(review_status)
                 session.flush()
 
+                store_handler.change_review_status_statistics(
+                    session, report.bug_id, old_status, review_status.status)
+
                 return True
             else:
                 msg = 'Report id ' + str(report_id) + \
@@ -953,6 +1353,7 @@ class ThriftRequestHandler(object):
             session.commit()
         finally:
             session.close()
+            self.__invalidate_responses()
 
         return res
 
@@ -1236,37 +1637,32 @@ class ThriftRequestHandler(object):
 
     def _cmp_helper(self, session, run_ids, cmp_data):
         """
-        Get the report hashes for all of the runs.
-        Return the hash list which should be queried
-        in the returned run id list.
+        Get the subquery of the report hashes for the comparison of the
+        runs. Return the hash subquery which should be queried in the
+        returned run id list.
         """
         base_run_ids = run_ids
         new_run_ids = cmp_data.runIds
         diff_type = cmp_data.diffType
 
-        base_line_hashes = self.__get_hashes_for_runs(session, base_run_ids)
-
         if not new_run_ids:
+            reports = Report.__table__.alias('diff_reports')
+            base_line_hashes = select([reports.c.bug_id]) \
+                .where(reports.c.run_id.in_(base_run_ids))
             return base_line_hashes, base_run_ids
 
-        new_check_hashes = self.__get_hashes_for_runs(session, new_run_ids)
-
-        report_hashes, run_ids = \
-            get_diff_hashes_for_query(base_run_ids,
-                                      base_line_hashes,
-                                      new_run_ids,
-                                      new_check_hashes,
-                                      diff_type)
-        return report_hashes, run_ids
+        return get_diff_hashes_for_query(base_run_ids,
+                                         new_run_ids,
+                                         diff_type)
 
     @timeit
+    @cached_response
     def getCheckerCounts(self, run_ids, report_filter, cmp_data):
         """
           If the run id list is empty the metrics will be counted
           for all of the runs and in compare mode all of the runs
           will be used as a baseline excluding the runs in compare data.
         """
-        self.__require_access()
         results = []
         session = self.__Session()
         try:
@@ -1278,29 +1674,34 @@ class ThriftRequestHandler(object):
                 diff_hashes, run_ids = self._cmp_helper(session,
                                                         run_ids,
                                                         cmp_data)
-                if not diff_hashes:
-                    # There is no difference.
-                    return results
 
-            filter_expression = process_report_filter_v2(
-                report_filter, CountFilter.CHECKER_NAME)
+            if is_statistics_filter(report_filter, cmp_data):
+                q = get_statistics_query(session, run_ids, report_filter,
+                                         CountFilter.CHECKER_NAME,
+                                         ReportStatistics.checker_id,
+                                         ReportStatistics.severity) \
+                    .group_by(ReportStatistics.checker_id,
+                              ReportStatistics.severity).all()
+            else:
+                filter_expression = process_report_filter_v2(
+                    report_filter, CountFilter.CHECKER_NAME)
 
-            count_expr = create_count_expression(report_filter)
+                count_expr = create_count_expression(report_filter)
 
-            q = session.query(Report.checker_id,
-                              Report.severity,
-                              count_expr) \
-                .filter(Report.run_id.in_(run_ids)) \
-                .outerjoin(File,
-                           Report.file_id == File.id) \
-                .outerjoin(ReviewStatus,
-                           ReviewStatus.bug_hash == Report.bug_id) \
-                .filter(filter_expression) \
+                q = session.query(Report.checker_id,
+                                  Report.severity,
+                                  count_expr) \
+                    .filter(Report.run_id.in_(run_ids)) \
+                    .outerjoin(File,
+                               Report.file_id == File.id) \
+                    .outerjoin(ReviewStatus,
+                               ReviewStatus.bug_hash == Report.bug_id) \
+                    .filter(filter_expression) \
 
-            if cmp_data:
-                q = q.filter(Report.bug_id.in_(diff_hashes))
+                if cmp_data:
+                    q = q.filter(Report.bug_id.in_(diff_hashes))
 
-            q = q.group_by(Report.checker_id, Report.severity).all()
+                q = q.group_by(Report.checker_id, Report.severity).all()
 
             for name, severity, count in q:
                 checker_count = CheckerCount(name=name,
@@ -1309,19 +1710,133 @@ class ThriftRequestHandler(object):
                 results.append(checker_count)
 
         except Exception as ex:
-            LOG.error(ex)
+            msg = str(ex)
+            LOG.error(msg)
+            raise shared.ttypes.RequestFailed(shared.ttypes.ErrorCode.DATABASE,
+                                              msg)
         finally:
             session.close()
-            return results
+
+        return results
+
+    @timeit
+    @cached_response
+    def getCheckerStatusCounts(self, run_ids, report_filter, cmp_data):
+        """
+          Count the reports by checker, severity, review status and detection
+          status in one query.
+          If the run id list is empty the metrics will be counted
+          for all of the runs and in compare mode all of the runs
+          will be used as a baseline excluding the runs in compare data.
+        """
+        results = []
+        session = self.__Session()
+        try:
+
+            if not run_ids:
+                run_ids = self.__get_run_ids_to_query(session, cmp_data)
+
+            if cmp_data:
+                diff_hashes, run_ids = self._cmp_helper(session,
+                                                        run_ids,
+                                                        cmp_data)
+
+            detection_statuses = Report.detection_status.type.enums
+
+            if is_statistics_filter(report_filter, cmp_data):
+                if report_filter is not None and report_filter.isUnique:
+                    status_counts = [
+                        func.count(case(
+                            [(ReportStatistics.detection_status == ds,
+                              ReportStatistics.bug_hash)]).distinct())
+                        for ds in detection_statuses]
+                else:
+                    status_counts = [
+                        func.sum(case(
+                            [(ReportStatistics.detection_status == ds,
+                              ReportStatistics.count)], else_=0))
+                        for ds in detection_statuses]
+
+                q = get_statistics_query(session, run_ids, report_filter,
+                                         None,
+                                         ReportStatistics.checker_id,
+                                         ReportStatistics.severity,
+                                         ReportStatistics.review_status,
+                                         *status_counts) \
+                    .group_by(ReportStatistics.checker_id,
+                              ReportStatistics.severity,
+                              ReportStatistics.review_status)
+            else:
+                filter_expression = process_report_filter_v2(report_filter)
+
+                review_status = func.coalesce(ReviewStatus.status,
+                                              'unreviewed')
+
+                if report_filter is not None and report_filter.isUnique:
+                    status_counts = [
+                        func.count(case([(Report.detection_status == ds,
+                                          Report.bug_id)]).distinct())
+                        for ds in detection_statuses]
+                else:
+                    status_counts = [
+                        func.sum(case([(Report.detection_status == ds, 1)],
+                                      else_=0))
+                        for ds in detection_statuses]
+
+                q = session.query(Report.checker_id,
+                                  Report.severity,
+                                  review_status,
+                                  *(status_counts +
+                                    [create_count_expression(
+                                        report_filter)])) \
+                    .filter(Report.run_id.in_(run_ids)) \
+                    .outerjoin(File,
+                               Report.file_id == File.id) \
+                    .outerjoin(ReviewStatus,
+                               ReviewStatus.bug_hash == Report.bug_id) \
+                    .filter(filter_expression)
+
+                if cmp_data:
+                    q = q.filter(Report.bug_id.in_(diff_hashes))
+
+                q = q.group_by(Report.checker_id,
+                               Report.severity,
+                               review_status)
+
+            # The last column is the total number of the reports. Unique
+            # reports of different detection statuses can not be summed.
+            for row in q:
+                checker_name, severity, rev_status = row[:3]
+                counts = row[3:-1]
+
+                results.append(CheckerStatusCount(
+                    checkerName=checker_name,
+                    severity=severity,
+                    reviewStatus=review_status_enum(rev_status),
+                    count=row[-1],
+                    detectionStatusCounts={
+                        detection_status_enum(ds): ds_count
+                        for ds, ds_count in zip(detection_statuses, counts)
+                        if ds_count}))
+
+        except Exception as ex:
+            msg = str(ex)
+            LOG.error(msg)
+            raise shared.ttypes.RequestFailed(shared.ttypes.ErrorCode.DATABASE,
+                                              msg)
+        finally:
+            session.close()
+
+        return results
 
     @timeit
+    @cached_response
     def getSeverityCounts(self, run_ids, report_filter, cmp_data):
         """
           If the run id list is empty the metrics will be counted
           for all of the runs and in compare mode all of the runs
           will be used as a baseline excluding the runs in compare data.
         """
-        self.__require_access()
         results = {}
         session = self.__Session()
         try:
@@ -1333,44 +1848,52 @@ class ThriftRequestHandler(object):
                 diff_hashes, run_ids = self._cmp_helper(session,
                                                         run_ids,
                                                         cmp_data)
-                if not diff_hashes:
-                    # There is no difference.
-                    return results
 
-            filter_expression = process_report_filter_v2(report_filter,
-                                                         CountFilter.SEVERITY)
+            if is_statistics_filter(report_filter, cmp_data):
+                checker_ids = get_statistics_query(
+                    session, run_ids, report_filter,
+                    CountFilter.SEVERITY,
+                    ReportStatistics.severity) \
+                    .group_by(ReportStatistics.severity).all()
+            else:
+                filter_expression = process_report_filter_v2(
+                    report_filter, CountFilter.SEVERITY)
 
-            count_expr = create_count_expression(report_filter)
+                count_expr = create_count_expression(report_filter)
 
-            q = session.query(Report.severity, count_expr) \
-                .filter(Report.run_id.in_(run_ids)) \
-                .outerjoin(File,
-                           Report.file_id == File.id) \
-                .outerjoin(ReviewStatus,
-                           ReviewStatus.bug_hash == Report.bug_id) \
-                .filter(filter_expression) \
+                q = session.query(Report.severity, count_expr) \
+                    .filter(Report.run_id.in_(run_ids)) \
+                    .outerjoin(File,
+                               Report.file_id == File.id) \
+                    .outerjoin(ReviewStatus,
+                               ReviewStatus.bug_hash == Report.bug_id) \
+                    .filter(filter_expression) \
 
-            if cmp_data:
-                q = q.filter(Report.bug_id.in_(diff_hashes))
+                if cmp_data:
+                    q = q.filter(Report.bug_id.in_(diff_hashes))
 
-            checker_ids = q.group_by(Report.severity).all()
+                checker_ids = q.group_by(Report.severity).all()
 
             results = dict(checker_ids)
 
         except Exception as ex:
-            LOG.error(ex)
+            msg = str(ex)
+            LOG.error(msg)
+            raise shared.ttypes.RequestFailed(shared.ttypes.ErrorCode.DATABASE,
+                                              msg)
         finally:
             session.close()
-            return results
+
+        return results
 
     @timeit
+    @cached_response
     def getCheckerMsgCounts(self, run_ids, report_filter, cmp_data):
         """
           If the run id list is empty the metrics will be counted
           for all of the runs and in compare mode all of the runs
           will be used as a baseline excluding the runs in compare data.
         """
-        self.__require_access()
         results = {}
         session = self.__Session()
         try:
@@ -1382,9 +1905,6 @@ class ThriftRequestHandler(object):
                 diff_hashes, run_ids = self._cmp_helper(session,
                                                         run_ids,
                                                         cmp_data)
-                if not diff_hashes:
-                    # There is no difference.
-                    return results
 
             filter_expression = process_report_filter_v2(
                 report_filter, CountFilter.CHECKER_MSG)
@@ -1407,19 +1927,23 @@ class ThriftRequestHandler(object):
             results = dict(checker_ids)
 
         except Exception as ex:
-            LOG.error(ex)
+            msg = str(ex)
+            LOG.error(msg)
+            raise shared.ttypes.RequestFailed(shared.ttypes.ErrorCode.DATABASE,
+                                              msg)
         finally:
             session.close()
-            return results
+
+        return results
 
     @timeit
+    @cached_response
     def getReviewStatusCounts(self, run_ids, report_filter, cmp_data):
         """
           If the run id list is empty the metrics will be counted
           for all of the runs and in compare mode all of the runs
           will be used as a baseline excluding the runs in compare data.
         """
-        self.__require_access()
         results = defaultdict(int)
         session = self.__Session()
         try:
@@ -1431,29 +1955,34 @@ class ThriftRequestHandler(object):
                 diff_hashes, run_ids = self._cmp_helper(session,
                                                         run_ids,
                                                         cmp_data)
-                if not diff_hashes:
-                    # There is no difference.
-                    return results
 
-            filter_expression = process_report_filter_v2(
-                report_filter, CountFilter.REVIEW_STATUS)
+            if is_statistics_filter(report_filter, cmp_data):
+                review_statuses = get_statistics_query(
+                    session, run_ids, report_filter,
+                    CountFilter.REVIEW_STATUS,
+                    func.max(ReportStatistics.id),
+                    ReportStatistics.review_status) \
+                    .group_by(ReportStatistics.review_status).all()
+            else:
+                filter_expression = process_report_filter_v2(
+                    report_filter, CountFilter.REVIEW_STATUS)
 
-            count_expr = create_count_expression(report_filter)
+                count_expr = create_count_expression(report_filter)
 
-            q = session.query(func.max(Report.id),
-                              ReviewStatus.status,
-                              count_expr) \
-                .filter(Report.run_id.in_(run_ids)) \
-                .outerjoin(File,
-                           Report.file_id == File.id) \
-                .outerjoin(ReviewStatus,
-                           ReviewStatus.bug_hash == Report.bug_id) \
-                .filter(filter_expression) \
+                q = session.query(func.max(Report.id),
+                                  ReviewStatus.status,
+                                  count_expr) \
+                    .filter(Report.run_id.in_(run_ids)) \
+                    .outerjoin(File,
+                               Report.file_id == File.id) \
+                    .outerjoin(ReviewStatus,
+                               ReviewStatus.bug_hash == Report.bug_id) \
+                    .filter(filter_expression) \
 
-            if cmp_data:
-                q = q.filter(Report.bug_id.in_(diff_hashes))
+                if cmp_data:
+                    q = q.filter(Report.bug_id.in_(diff_hashes))
 
-            review_statuses = q.group_by(ReviewStatus.status).all()
+                review_statuses = q.group_by(ReviewStatus.status).all()
 
             for _, rev_status, count in review_statuses:
                 if rev_status is None:
@@ -1465,19 +1994,23 @@ class ThriftRequestHandler(object):
                     results[rev_status] += count
 
         except Exception as ex:
-            LOG.error(ex)
+            msg = str(ex)
+            LOG.error(msg)
+            raise shared.ttypes.RequestFailed(shared.ttypes.ErrorCode.DATABASE,
+                                              msg)
         finally:
             session.close()
-            return results
+
+        return results
 
     @timeit
+    @cached_response
     def getFileCounts(self, run_ids, report_filter, cmp_data):
         """
           If the run id list is empty the metrics will be counted
           for all of the runs and in compare mode all of the runs
           will be used as a baseline excluding the runs in compare data.
         """
-        self.__require_access()
         results = {}
         session = self.__Session()
         try:
@@ -1489,47 +2022,56 @@ class ThriftRequestHandler(object):
                 diff_hashes, run_ids = self._cmp_helper(session,
                                                         run_ids,
                                                         cmp_data)
-                if not diff_hashes:
-                    # There is no difference.
-                    return results
 
-            filter_expression = process_report_filter_v2(report_filter,
-                                                         CountFilter.FILE)
+            if is_statistics_filter(report_filter, cmp_data):
+                file_paths = get_statistics_query(
+                    session, run_ids, report_filter,
+                    CountFilter.FILE,
+                    func.max(ReportStatistics.id),
+                    File.filepath) \
+                    .group_by(File.filepath).all()
+            else:
+                filter_expression = process_report_filter_v2(report_filter,
+                                                             CountFilter.FILE)
 
-            count_expr = create_count_expression(report_filter)
+                count_expr = create_count_expression(report_filter)
 
-            q = session.query(func.max(Report.id),
-                              File.filepath,
-                              count_expr) \
-                .filter(Report.run_id.in_(run_ids)) \
-                .outerjoin(File,
-                           Report.file_id == File.id) \
-                .outerjoin(ReviewStatus,
-                           ReviewStatus.bug_hash == Report.bug_id) \
-                .filter(filter_expression) \
+                q = session.query(func.max(Report.id),
+                                  File.filepath,
+                                  count_expr) \
+                    .filter(Report.run_id.in_(run_ids)) \
+                    .outerjoin(File,
+                               Report.file_id == File.id) \
+                    .outerjoin(ReviewStatus,
+                               ReviewStatus.bug_hash == Report.bug_id) \
+                    .filter(filter_expression) \
 
-            if cmp_data:
-                q = q.filter(Report.bug_id.in_(diff_hashes))
+                if cmp_data:
+                    q = q.filter(Report.bug_id.in_(diff_hashes))
 
-            file_paths = q.group_by(File.filepath).all()
+                file_paths = q.group_by(File.filepath).all()
 
             for _, fp, count in file_paths:
                 results[fp] = count
 
         except Exception as ex:
-            LOG.error(ex)
+            msg = str(ex)
+            LOG.error(msg)
+            raise shared.ttypes.RequestFailed(shared.ttypes.ErrorCode.DATABASE,
+                                              msg)
         finally:
             session.close()
-            return results
+
+        return results
 
     @timeit
+    @cached_response
     def getRunHistoryTagCounts(self, run_ids, report_filter, cmp_data):
         """
           If the run id list is empty the metrics will be counted
           for all of the runs and in compare mode all of the runs
           will be used as a baseline excluding the runs in compare data.
         """
-        self.__require_access()
         results = []
         session = self.__Session()
         try:
@@ -1541,9 +2083,6 @@ class ThriftRequestHandler(object):
                 diff_hashes, run_ids = self._cmp_helper(session,
                                                         run_ids,
                                                         cmp_data)
-                if not diff_hashes:
-                    # There is no difference.
-                    return results
 
             filter_expression = process_report_filter_v2(
                 report_filter, CountFilter.RUN_HISTORY_TAG)
@@ -1580,19 +2119,23 @@ class ThriftRequestHandler(object):
                                                count=count))
 
         except Exception as ex:
-            LOG.error(ex)
+            msg = str(ex)
+            LOG.error(msg)
+            raise shared.ttypes.RequestFailed(shared.ttypes.ErrorCode.DATABASE,
+                                              msg)
         finally:
             session.close()
-            return results
+
+        return results
 
     @timeit
+    @cached_response
     def getDetectionStatusCounts(self, run_ids, report_filter, cmp_data):
         """
           If the run id list is empty the metrics will be counted
           for all of the runs and in compare mode all of the runs
           will be used as a baseline excluding the runs in compare data.
         """
-        self.__require_access()
         results = {}
         session = self.__Session()
         try:
@@ -1604,48 +2147,51 @@ class ThriftRequestHandler(object):
                 diff_hashes, run_ids = self._cmp_helper(session,
                                                         run_ids,
                                                         cmp_data)
-                if not diff_hashes:
-                    # There is no difference.
-                    return results
 
-            filter_expression = process_report_filter_v2(
-                report_filter, CountFilter.DETECTION_STATUS)
+            if is_statistics_filter(report_filter, cmp_data):
+                # Every report is counted, as below, even if the unique
+                # reports are queried.
+                if report_filter is not None and report_filter.isUnique:
+                    report_filter = copy.copy(report_filter)
+                    report_filter.isUnique = False
+
+                detection_stats = get_statistics_query(
+                    session, run_ids, report_filter,
+                    CountFilter.DETECTION_STATUS,
+                    ReportStatistics.detection_status) \
+                    .group_by(ReportStatistics.detection_status).all()
+            else:
+                filter_expression = process_report_filter_v2(
+                    report_filter, CountFilter.DETECTION_STATUS)
 
-            count_expr = func.count(literal_column('*'))
+                count_expr = func.count(literal_column('*'))
 
-            q = session.query(Report.detection_status,
-                              count_expr) \
-                .filter(Report.run_id.in_(run_ids)) \
-                .outerjoin(File,
-                           Report.file_id == File.id) \
-                .outerjoin(ReviewStatus,
-                           ReviewStatus.bug_hash == Report.bug_id) \
-                .filter(filter_expression) \
+                q = session.query(Report.detection_status,
+                                  count_expr) \
+                    .filter(Report.run_id.in_(run_ids)) \
+                    .outerjoin(File,
+                               Report.file_id == File.id) \
+                    .outerjoin(ReviewStatus,
+                               ReviewStatus.bug_hash == Report.bug_id) \
+                    .filter(filter_expression) \
 
-            if cmp_data:
-                q = q.filter(Report.bug_id.in_(diff_hashes))
+                if cmp_data:
+                    q = q.filter(Report.bug_id.in_(diff_hashes))
 
-            detection_stats = q.group_by(Report.detection_status).all()
+                detection_stats = q.group_by(Report.detection_status).all()
 
             results = dict(detection_stats)
             results = {detection_status_enum(k): v for k, v in results.items()}
 
         except Exception as ex:
-            LOG.error(ex)
+            msg = str(ex)
+            LOG.error(msg)
+            raise shared.ttypes.RequestFailed(shared.ttypes.ErrorCode.DATABASE,
+                                              msg)
         finally:
             session.close()
-            return results
 
-    @timeit
-    def __get_hashes_for_runs(self, session, run_ids):
-
-        LOG.debug('query all hashes')
-        # Keyed tuple list is returned.
-        base_line_hashes = session.query(Report.bug_id) \
-            .filter(Report.run_id.in_(run_ids)) \
-            .all()
-
-        return set([t[0] for t in base_line_hashes])
+        return results
 
     # -----------------------------------------------------------------------
     @timeit
@@ -1674,6 +2220,9 @@ class ThriftRequestHandler(object):
         for run_to_delete in runs_to_delete:
             # FIXME: clean up bugpaths. Once run_id is a foreign key there,
             # it should be automatic.
+            session.query(ReportStatistics) \
+                .filter(ReportStatistics.run_id == run_to_delete.id) \
+                .delete(synchronize_session=False)
             session.delete(run_to_delete)
             session.commit()
 
@@ -1686,6 +2235,7 @@ class ThriftRequestHandler(object):
             select([File.content_hash])))).delete(synchronize_session=False)
         session.commit()
         session.close()
+        self.__invalidate_responses()
         return True
 
     # -----------------------------------------------------------------------
@@ -1705,12 +2255,8 @@ class ThriftRequestHandler(object):
         try:
             session = self.__Session()
 
-            q = session.query(FileContent) \
-                .options(sqlalchemy.orm.load_only('content_hash')) \
-                .filter(FileContent.content_hash.in_(file_hashes))
-
-            return list(set(file_hashes) -
-                        set(map(lambda fc: fc.content_hash, q)))
+            return store_handler.get_missing_content_hashes(session,
+                                                            file_hashes)
 
         finally:
             session.close()
@@ -1722,6 +2268,61 @@ class ThriftRequestHandler(object):
         # Unzip sent data.
         zip_dir = unzip(b64zip)
 
+        try:
+            return self.__store_run_from_dir(name, tag, version, zip_dir,
+                                             force)
+        finally:
+            shutil.rmtree(zip_dir, ignore_errors=True)
+            self.__invalidate_responses()
+
+    @timeit
+    def beginMassStoreRun(self, name, tag, version, force):
+        self.__require_store()
+
+        return self.__store_upload.begin_upload(self.__product.id,
+                                                name, tag, version, force)
+
+    @timeit
+    def appendMassStoreRunChunk(self, store_token, offset, chunk):
+        self.__require_store()
+
+        return self.__store_upload.append_chunk(self.__product.id,
+                                                store_token,
+                                                offset,
+                                                base64.b64decode(chunk))
+
+    @timeit
+    def getMassStoreRunOffset(self, store_token):
+        self.__require_store()
+
+        return self.__store_upload.get_size(self.__product.id, store_token)
+
+    @timeit
+    def commitMassStoreRun(self, store_token):
+        self.__require_store()
+
+        upload = self.__store_upload.finish_upload(self.__product.id,
+                                                   store_token)
+        try:
+            zip_dir = unzip_compressed(upload['file'])
+        finally:
+            shutil.rmtree(upload['dir'], ignore_errors=True)
+
+        try:
+            return self.__store_run_from_dir(upload['name'],
+                                             upload['tag'],
+                                             upload['version'],
+                                             zip_dir,
+                                             upload['force'])
+        finally:
+            shutil.rmtree(zip_dir, ignore_errors=True)
+            self.__invalidate_responses()
+
+    def __store_run_from_dir(self, name, tag, version, zip_dir, force):
+        """
+        Store the run from the given directory which contains the extracted
+        mass store ZIP file.
+        """
         LOG.debug("Using unzipped folder '{0}'".format(zip_dir))
 
         source_root = os.path.join(zip_dir, 'root')
@@ -1746,6 +2347,26 @@ class ThriftRequestHandler(object):
         # Storing file contents from plist.
         file_path_to_id = {}
 
+        # The contents which are not sent in the ZIP must already be in the
+        # database. This is checked before anything is stored for the run so
+        # the client can retry the storage with the missing contents.
+        not_sent_hashes = set(
+            file_hash for file_name, file_hash in filename2hash.items()
+            if not os.path.isfile(os.path.join(source_root,
+                                               file_name.strip('/'))))
+        session = self.__Session()
+        try:
+            missing_hashes = store_handler.get_missing_content_hashes(
+                session, not_sent_hashes)
+        finally:
+            session.close()
+
+        if missing_hashes:
+            raise shared.ttypes.RequestFailed(
+                shared.ttypes.ErrorCode.SOURCE_MISSING,
+                "The content of {0} source files is neither in the "
+                "database nor in the stored ZIP.".format(len(missing_hashes)))
+
         for file_name, file_hash in filename2hash.items():
             source_file_name = os.path.join(source_root,
                                             file_name.strip("/"))
@@ -1798,22 +2419,33 @@ class ThriftRequestHandler(object):
 
         session = self.__storage_session.get_transaction(run_id)
 
-        # Processing PList files.
+        report_storage = store_handler.BulkReportStorage(
+            self.__storage_session,
+            run_id,
+            {fid: file_name for file_name, fid in file_path_to_id.items()
+             if fid is not None})
+
+        # Processing the reports. The store command sends the already parsed
+        # reports of the plist files in the report interchange format.
+        # Plain plist files are parsed only if there are no parsed reports.
         _, _, report_files = next(os.walk(report_dir), ([], [], []))
         for f in report_files:
-            if not f.endswith('.plist'):
+            report_file = os.path.join(report_dir, f)
+            if f.endswith('.plist' + report_interchange.EXTENSION):
+                read_reports = report_interchange.read
+            elif f.endswith('.plist') and \
+                    f + report_interchange.EXTENSION not in report_files:
+                read_reports = plist_parser.parse_plist
+            else:
                 continue
 
-            LOG.debug("Parsing input file '" + f + "'")
+            LOG.debug("Reading input file '" + f + "'")
 
             try:
-                # FIXME: We are parsing the plists for the
-                # second time here. Use re-use the
-                # previous results.
-                files, reports = plist_parser.parse_plist(
-                    os.path.join(report_dir, f))
+                files, reports = read_reports(report_file)
             except Exception as ex:
-                LOG.error('Parsing the plist failed: ' + str(ex))
+                LOG.error('Reading the reports of ' + f + ' failed: ' +
+                          str(ex))
                 continue
 
             file_ids = {}
@@ -1836,9 +2468,7 @@ class ThriftRequestHandler(object):
                     store_handler.collect_paths_events(report, file_ids, files)
 
                 LOG.debug("Storing report")
-                report_id = store_handler.addReport(
-                    self.__storage_session,
-                    run_id,
+                report_id = report_storage.add_report(
                     file_ids[files[report.main['location']['file']]],
                     report.main,
                     bug_paths,
@@ -1862,6 +2492,8 @@ class ThriftRequestHandler(object):
 
                 LOG.debug("Storing done for report " + str(report_id))
 
+        report_storage.flush()
+
         if len(check_durations) > 0:
             store_handler.setRunDuration(self.__storage_session,
                                          run_id,
@@ -1871,8 +2503,4 @@ class ThriftRequestHandler(object):
         store_handler.finishCheckerRun(self.__storage_session, run_id,
                                        run_history_time)
 
-        # TODO: This directory should be removed even if an exception is thrown
-        # above.
-        shutil.rmtree(zip_dir)
-
         return run_id
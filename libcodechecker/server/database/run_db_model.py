@@ -263,6 +263,43 @@ class ReviewStatus(Base):
     date = Column(DateTime, nullable=False)
 
 
+class ReportStatistics(Base):
+    """
+    Number of the reports of a run grouped by their bug hash and by the
+    report properties which are used most often in the statistics filters.
+    The rows are maintained when a run is stored and when a review status is
+    changed, so the statistics, including the number of the unique reports,
+    can be counted without scanning the reports table.
+    """
+    __tablename__ = 'report_statistics'
+
+    id = Column(Integer, autoincrement=True, primary_key=True)
+    run_id = Column(Integer,
+                    ForeignKey('runs.id', deferrable=True,
+                               initially="DEFERRED", ondelete='CASCADE'),
+                    index=True)
+    bug_hash = Column(String, index=True)
+    checker_id = Column(String)
+    severity = Column(Integer)
+    detection_status = Column(String)
+    review_status = Column(String, nullable=False)
+    file_id = Column(Integer, ForeignKey('files.id', deferrable=True,
+                                         initially="DEFERRED",
+                                         ondelete='CASCADE'))
+    count = Column(Integer, nullable=False)
+
+    def __init__(self, run_id, bug_hash, checker_id, severity,
+                 detection_status, review_status, file_id, count):
+        self.run_id = run_id
+        self.bug_hash = bug_hash
+        self.checker_id = checker_id
+        self.severity = severity
+        self.detection_status = detection_status
+        self.review_status = review_status
+        self.file_id = file_id
+        self.count = count
+
+
 IDENTIFIER = {
     'identifier': "RunDatabase",
     'orm_meta': CC_META,
@@ -11,6 +11,8 @@ provides the handling of permission matching and databases.
 
 from abc import ABCMeta
 from abc import abstractmethod
+import threading
+import time
 
 from sqlalchemy import and_
 
@@ -21,6 +23,10 @@ from libcodechecker.logger import LoggerFactory
 LOG = LoggerFactory.get_new_logger('PERMISSIONS')
 config_db_model = None  # Module will be loaded later...
 
+# The number of seconds for which a permission decision is reused without
+# querying the configuration database again.
+PERMISSION_CACHE_TTL = 10
+
 
 class Permission(object):
     """
@@ -552,14 +558,110 @@ def initialise_defaults(scope, extra_params):
             handler._rem_perm_impl('*', False)
 
 
+class PermissionCache(object):
+    """
+    Short-lived cache of the permission decisions. The permissions of a user
+    are checked by every API call, but they change rarely.
+    """
+
+    def __init__(self, ttl):
+        self.__ttl = ttl
+        self.__lock = threading.Lock()
+        self.__entries = {}
+        self.__generation = 0
+
+    @property
+    def generation(self):
+        """
+        The number of the invalidations of the cache. A decision has to be
+        computed after reading the generation, so it is not cached if the
+        permissions were modified meanwhile.
+        """
+        return self.__generation
+
+    def get(self, key):
+        """
+        Return the cached decision for the key, or None if it is not cached
+        or has already expired.
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                return None
+
+            expires, decision = entry
+            if expires < time.time():
+                del self.__entries[key]
+                return None
+
+            return decision
+
+    def put(self, key, decision, generation):
+        """
+        Cache the decision computed in the given generation of the cache. A
+        decision of an earlier generation is stale, so it is not cached.
+        """
+        with self.__lock:
+            if generation != self.__generation:
+                return
+
+            now = time.time()
+            self.__entries = {k: v for k, v in self.__entries.items()
+                              if v[0] >= now}
+            self.__entries[key] = (now + self.__ttl, decision)
+
+    def invalidate(self):
+        """
+        Drop every cached decision after the permissions were modified.
+        """
+        with self.__lock:
+            self.__generation += 1
+            self.__entries = {}
+
+
+__PERMISSION_CACHE = PermissionCache(PERMISSION_CACHE_TTL)
+
+
+def invalidate_permission_cache():
+    """
+    Drop the cached permission decisions. This must be called after the
+    permission records in the configuration database change.
+    """
+    __PERMISSION_CACHE.invalidate()
+
+
 def require_permission(permission, extra_params, user):
     """
     Returns whether or not the given user has the given permission.
+    The decisions are cached for PERMISSION_CACHE_TTL seconds.
 
     :param extra_params: The scope-specific argument dict, which already
       contains a valid database session.
     """
 
+    # The scope-specific arguments (except the database session) identify
+    # the permission record.
+    scope_args = tuple(sorted((key, extra_params.get(key))
+                              for key in permission.CALL_ARGS
+                              if key != 'config_db_session'))
+    user_key = (user.user, tuple(sorted(user.groups)), user.is_root) \
+        if user else None
+    key = (permission.name, scope_args, user_key)
+
+    decision = __PERMISSION_CACHE.get(key)
+    if decision is None:
+        generation = __PERMISSION_CACHE.generation
+        decision = __check_permission(permission, extra_params, user)
+        __PERMISSION_CACHE.put(key, decision, generation)
+
+    return decision
+
+
+def __check_permission(permission, extra_params, user):
+    """
+    Queries the database whether the given user has the given permission.
+    """
+
     handler = handler_from_scope_params(permission,
                                         extra_params)
     if handler.has_permission(user):
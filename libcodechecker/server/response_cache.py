@@ -0,0 +1,114 @@
+# -------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -------------------------------------------------------------------------
+"""
+Cache of the responses of the read-only API calls of a product.
+
+The stored reports of a product only change through the API calls of the
+server, so every call which modifies them increases the data generation of
+the product. The cached responses are keyed by the generation too, thus a
+response computed from outdated data is never returned.
+"""
+
+from collections import OrderedDict
+import cPickle as pickle
+import threading
+
+# Default limit of the size of the cached responses of a product in bytes.
+DEFAULT_CACHE_SIZE = 64 * 1024 * 1024
+
+
+class ResponseCache(object):
+    """
+    Least recently used cache of API responses with a limit on the size of
+    the responses. The size of a response is estimated by the size of its
+    serialized form.
+    """
+
+    def __init__(self, name, max_size=DEFAULT_CACHE_SIZE):
+        self.__name = name
+        self.__max_size = max_size
+        self.__lock = threading.Lock()
+        self.__entries = OrderedDict()
+        self.__size = 0
+        self.__generation = 0
+        self.__hits = 0
+        self.__misses = 0
+
+    @property
+    def name(self):
+        return self.__name
+
+    @property
+    def generation(self):
+        return self.__generation
+
+    def invalidate(self):
+        """
+        Increase the data generation after the data of the product changed.
+        The responses of the previous generations are dropped.
+        """
+        with self.__lock:
+            self.__generation += 1
+            self.__entries.clear()
+            self.__size = 0
+
+    def statistics(self):
+        """
+        Return the number of the cache hits and misses, the rate of the hits
+        and the number and the size of the cached responses.
+        """
+        with self.__lock:
+            lookups = self.__hits + self.__misses
+            return {'hits': self.__hits,
+                    'misses': self.__misses,
+                    'hit_rate': float(self.__hits) / lookups
+                    if lookups else 0.0,
+                    'entries': len(self.__entries),
+                    'size': self.__size}
+
+    def __put(self, key, response, size):
+        if size > self.__max_size:
+            return
+
+        if key in self.__entries:
+            self.__size -= self.__entries.pop(key)[1]
+
+        self.__entries[key] = (response, size)
+        self.__size += size
+
+        while self.__size > self.__max_size:
+            _, (_, evicted_size) = self.__entries.popitem(last=False)
+            self.__size -= evicted_size
+
+    def get(self, method, args, compute):
+        """
+        Return the cached response of the API method called with the given
+        arguments. If it is not cached the compute function is called to
+        create the response. The lock is not held while the response is
+        computed, so concurrent misses may compute the same response.
+        """
+        with self.__lock:
+            generation = self.__generation
+            key = (generation, method, repr(args))
+
+            entry = self.__entries.pop(key, None)
+            if entry is not None:
+                # Move the entry to the end as the most recently used one.
+                self.__entries[key] = entry
+                self.__hits += 1
+                return entry[0]
+
+            self.__misses += 1
+
+        response = compute()
+        size = len(pickle.dumps(response, pickle.HIGHEST_PROTOCOL))
+
+        with self.__lock:
+            # The data may have changed while the response was computed.
+            if generation == self.__generation:
+                self.__put(key, response, size)
+
+        return response
@@ -122,3 +122,36 @@ def split_client_POST_request(path):
         remainder = split_path[2]
 
         return None, version_tag, remainder
+
+
+# The Thrift protocols understood by the API endpoints, by their content type.
+# The Python THttpClient always sends 'application/x-thrift', so the protocol
+# can be requested by the 'protocol' query parameter of the URL too. The web
+# viewer uses the default JSON protocol.
+PROTOCOL_CONTENT_TYPES = {
+    'application/vnd.apache.thrift.binary': 'binary',
+    'application/vnd.apache.thrift.compact': 'compact',
+    'application/vnd.apache.thrift.json': 'json'
+}
+
+DEFAULT_PROTOCOL = 'json'
+
+
+def get_request_protocol(path, content_type):
+    """
+    Returns the name of the Thrift protocol of a POST request based on its
+    content type or the 'protocol' query parameter of its path.
+    """
+
+    if content_type:
+        protocol = PROTOCOL_CONTENT_TYPES.get(
+            content_type.split(';')[0].strip().lower())
+        if protocol:
+            return protocol
+
+    query = urlparse.parse_qs(urlparse.urlparse(path).query)
+    protocol = query.get('protocol', [None])[0]
+    if protocol in PROTOCOL_CONTENT_TYPES.values():
+        return protocol
+
+    return DEFAULT_PROTOCOL
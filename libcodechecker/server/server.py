@@ -19,6 +19,7 @@ from random import sample
 import stat
 import socket
 import ssl
+import threading
 import urllib
 
 try:
@@ -28,7 +29,10 @@ except ImportError:
     from http.server import HTTPServer, BaseHTTPRequestHandler, \
         SimpleHTTPRequestHandler
 
+from sqlalchemy import event
 from sqlalchemy.orm import sessionmaker
+from thrift.protocol import TBinaryProtocol
+from thrift.protocol import TCompactProtocol
 from thrift.protocol import TJSONProtocol
 from thrift.transport import TTransport
 
@@ -43,6 +47,8 @@ from libcodechecker.util import get_tmp_dir_hash
 from . import instance_manager
 from . import permissions
 from . import routing
+from . import static_files
+from .response_cache import ResponseCache
 from api.authentication import ThriftAuthHandler as AuthHandler_v6
 from api.bad_api_version import ThriftAPIMismatchHandler as BadAPIHandler
 from api.product_server import ThriftProductHandler as ProductHandler_v6
@@ -53,6 +59,16 @@ from database.run_db_model import IDENTIFIER as RUN_META
 
 LOG = LoggerFactory.get_new_logger('SERVER')
 
+# The factories of the Thrift protocols accepted by the API endpoints.
+PROTOCOL_FACTORIES = {
+    'binary': TBinaryProtocol.TBinaryProtocolAcceleratedFactory,
+    'compact': TCompactProtocol.TCompactProtocolFactory,
+    'json': TJSONProtocol.TJSONProtocolFactory
+}
+
+# The statistics of the server are logged after this many API requests.
+STATISTICS_INTERVAL = 1000
+
 
 class RequestHandler(SimpleHTTPRequestHandler):
     """
@@ -97,10 +113,11 @@ class RequestHandler(SimpleHTTPRequestHandler):
                 values = cookie.split("=")
                 if len(values) == 2 and \
                         values[0] == session_manager.SESSION_COOKIE_NAME:
-                    if self.server.manager.is_valid(values[1], True):
+                    session = self.server.manager.get_session(values[1],
+                                                              True)
+                    if session:
                         # The session cookie contains valid data.
-                        success = self.server.manager.get_session(values[1],
-                                                                  True)
+                        success = session
 
         if success is None:
             # Session cookie was invalid (or not found...)
@@ -226,9 +243,54 @@ class RequestHandler(SimpleHTTPRequestHandler):
                     # likely a resource file.
                     LOG.debug("Serving resource '{0}'".format(self.path))
 
-                self.send_response(200)  # 200 OK
+            self.__send_static_file()
 
+    def __send_static_file(self):
+        """
+        Serve the requested static file from the index of the static files,
+        compressed if the browser accepts it. Conditional requests are
+        answered with 304 Not Modified if the file did not change.
+        """
+        path = os.path.relpath(self.translate_path(self.path),
+                               self.server.www_root)
+        static_file = self.server.static_files.get(path)
+        if static_file is None:
+            # Directories and missing files are handled as usual.
             SimpleHTTPRequestHandler.do_GET(self)
+            return
+
+        use_gzip = static_file.gzipped is not None and \
+            static_files.accepts_gzip(
+                self.headers.getheader('Accept-Encoding'))
+
+        etag = static_file.gzip_etag if use_gzip else static_file.etag
+
+        query = self.path.split('?', 1)[1] if '?' in self.path else ''
+        cache_control = self.server.static_files.get_cache_control(query)
+
+        not_modified = static_files.matches_etag(
+            self.headers.getheader('If-None-Match'), etag)
+
+        self.send_response(304 if not_modified else 200)
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', cache_control)
+        if static_file.gzipped is not None:
+            self.send_header('Vary', 'Accept-Encoding')
+
+        if not_modified:
+            self.end_headers()
+            return
+
+        content = static_file.gzipped if use_gzip else static_file.read()
+
+        self.send_header('Content-Type', static_file.content_type)
+        self.send_header('Content-Length', str(len(content)))
+        self.send_header('Last-Modified',
+                         self.date_time_string(static_file.mtime))
+        if use_gzip:
+            self.send_header('Content-Encoding', 'gzip')
+        self.end_headers()
+        self.wfile.write(content)
 
     def do_POST(self):
         """
@@ -236,6 +298,9 @@ class RequestHandler(SimpleHTTPRequestHandler):
         """
 
         client_host, client_port = self.client_address
+        if self.server.config_db_queries.reset() % STATISTICS_INTERVAL == 0:
+            self.server.log_statistics()
+
         auth_session = self.__check_auth_in_request()
         LOG.info("{0}:{1} -- [{2}] POST {3}"
                  .format(client_host,
@@ -249,7 +314,10 @@ class RequestHandler(SimpleHTTPRequestHandler):
         suppress_handler = self.server.suppress_handler
         version = self.server.version
 
-        protocol_factory = TJSONProtocol.TJSONProtocolFactory()
+        # The query string of the path may select the Thrift protocol.
+        protocol = routing.get_request_protocol(
+            self.path, self.headers.getheader('Content-Type'))
+        protocol_factory = PROTOCOL_FACTORIES[protocol]()
         input_protocol_factory = protocol_factory
         output_protocol_factory = protocol_factory
 
@@ -262,8 +330,10 @@ class RequestHandler(SimpleHTTPRequestHandler):
         iprot = input_protocol_factory.getProtocol(itrans)
         oprot = output_protocol_factory.getProtocol(otrans)
 
+        # The query string is stripped for checking the endpoint.
+        request_path = self.path.split('?', 1)[0]
         if self.server.manager.isEnabled() and \
-                not self.path.endswith('/Authentication') and \
+                not request_path.endswith('/Authentication') and \
                 not auth_session:
             # Bail out if the user is not authenticated...
             # This response has the possibility of melting down Thrift clients,
@@ -370,8 +440,15 @@ class RequestHandler(SimpleHTTPRequestHandler):
             processor.process(iprot, oprot)
             result = otrans.getvalue()
 
+            LOG.debug("{0} configuration database queries were executed "
+                      "for POST {1}."
+                      .format(self.server.config_db_queries.count,
+                              self.path))
+
             self.send_response(200)
-            self.send_header("content-type", "application/x-thrift")
+            self.send_header("content-type",
+                             "application/x-thrift" if protocol == 'json'
+                             else "application/vnd.apache.thrift." + protocol)
             self.send_header("Content-Length", len(result))
             self.end_headers()
             self.wfile.write(result)
@@ -433,6 +510,7 @@ class Product(object):
         self.__engine = None
         self.__session = None
         self.__connected = False
+        self.__response_cache = ResponseCache(self.__endpoint)
 
         self.__last_connect_attempt = None
 
@@ -462,6 +540,14 @@ class Product(object):
         """
         return self.__session
 
+    @property
+    def response_cache(self):
+        """
+        Returns the cache of the responses of the read-only API calls on
+        this product's database.
+        """
+        return self.__response_cache
+
     @property
     def connected(self):
         """
@@ -536,6 +622,57 @@ class Product(object):
         self.__engine = None
 
 
+class QueryCounter(object):
+    """
+    Counts the statements executed on a database engine, both in total and
+    by the request handled in the current thread.
+    """
+
+    def __init__(self, engine):
+        self.__local = threading.local()
+        self.__lock = threading.Lock()
+        self.__requests = 0
+        self.__total = 0
+
+        event.listen(engine, 'before_cursor_execute', self.__count)
+
+    def __count(self, conn, cursor, statement, parameters, context,
+                executemany):
+        self.__local.count = self.count + 1
+        with self.__lock:
+            self.__total += 1
+
+    @property
+    def count(self):
+        """
+        Returns the number of statements executed for the current request.
+        """
+        return getattr(self.__local, 'count', 0)
+
+    def reset(self):
+        """
+        Start counting the statements of a new request in this thread.
+        Returns the number of the requests counted so far, including the
+        new one.
+        """
+        self.__local.count = 0
+        with self.__lock:
+            self.__requests += 1
+            return self.__requests
+
+    def statistics(self):
+        """
+        Returns the number of the requests, the total number of the executed
+        statements and their average per request.
+        """
+        with self.__lock:
+            return {'requests': self.__requests,
+                    'queries': self.__total,
+                    'queries_per_request':
+                        float(self.__total) / self.__requests
+                        if self.__requests else 0.0}
+
+
 class CCSimpleHttpServer(HTTPServer):
     """
     Simple http server to handle requests from the clients.
@@ -568,10 +705,14 @@ class CCSimpleHttpServer(HTTPServer):
         self.manager = manager
         self.__products = {}
 
+        LOG.debug("Indexing the static files of the web viewer...")
+        self.static_files = static_files.StaticFiles(self.www_root)
+
         # Create a database engine for the configuration database.
         LOG.debug("Creating database engine for CONFIG DATABASE...")
         self.__engine = product_db_sql_server.create_engine()
         self.config_session = sessionmaker(bind=self.__engine)
+        self.config_db_queries = QueryCounter(self.__engine)
 
         # Load the initial list of products and set up the server.
         sess = self.config_session()
@@ -672,6 +813,23 @@ class CCSimpleHttpServer(HTTPServer):
 
         del self.__products[endpoint]
 
+    def log_statistics(self):
+        """
+        Log the statistics of the database queries of the API requests and
+        of the response caches of the products.
+        """
+        LOG.debug("{requests} API requests were served, executing {queries} "
+                  "configuration database queries ({queries_per_request:.2f} "
+                  "per request)."
+                  .format(**self.config_db_queries.statistics()))
+
+        for product in self.__products.values():
+            cache = product.response_cache
+            LOG.debug("Response cache of '{0}': {hits} hits, {misses} "
+                      "misses ({hit_rate:.1%} hit rate), {entries} responses "
+                      "of {size} bytes."
+                      .format(cache.name, **cache.statistics()))
+
 
 def __make_root_file(root_file):
     """
@@ -0,0 +1,213 @@
+# -------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -------------------------------------------------------------------------
+"""
+In-memory index of the static files of the web viewer. The entity tags and
+the gzip compressed variants of the files are computed when the server
+starts, so conditional and compressed requests are answered without reading
+and compressing the files again.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+from cStringIO import StringIO
+
+from libcodechecker.logger import LoggerFactory
+
+LOG = LoggerFactory.get_new_logger('STATIC FILES')
+
+# Files smaller than this are not worth compressing.
+MIN_COMPRESS_SIZE = 1024
+
+# Types which are already compressed or binary are not compressed again.
+COMPRESSIBLE_TYPES = ['application/javascript',
+                      'application/json',
+                      'application/x-javascript',
+                      'application/xml',
+                      'image/svg+xml']
+
+# Versioned resources are cached by the browsers for a year.
+VERSIONED_MAX_AGE = 365 * 24 * 3600
+
+# The version of the static resources is appended to this script, so the web
+# viewer can request its resources with the version as the query string.
+VERSION_SCRIPT = os.path.join('scripts', 'version.js')
+
+
+def accepts_gzip(accept_encoding):
+    """
+    Returns whether the value of an Accept-Encoding header accepts gzip
+    compressed content.
+    """
+    return any(encoding.strip().split(';')[0] == 'gzip' and
+               'q=0' not in encoding.replace(' ', '').split(';')
+               for encoding in (accept_encoding or '').split(','))
+
+
+def matches_etag(if_none_match, etag):
+    """
+    Returns whether the value of an If-None-Match header matches the entity
+    tag, so the response is 304 Not Modified.
+    """
+    return bool(if_none_match) and \
+        any(tag.strip() in ('*', etag, 'W/' + etag)
+            for tag in if_none_match.split(','))
+
+
+def is_compressible(content_type):
+    return content_type.startswith('text/') or \
+        content_type in COMPRESSIBLE_TYPES
+
+
+def compress(content):
+    buf = StringIO()
+    # The modification time is fixed so the compressed bytes and their
+    # entity tag do not depend on the time of the server start.
+    with gzip.GzipFile(fileobj=buf, mode='wb', mtime=0) as gzip_file:
+        gzip_file.write(content)
+    return buf.getvalue()
+
+
+class StaticFile(object):
+    """
+    A static file with its entity tag and its compressed variant. The
+    uncompressed content is not kept in memory, except for the version
+    script whose served content differs from the file.
+    """
+
+    def __init__(self, path, file_stat, content, content_type):
+        self.path = path
+        self.mtime = file_stat.st_mtime
+        self.file_size = file_stat.st_size
+        self.content_type = content_type
+        self.etag = '"' + hashlib.sha1(content).hexdigest() + '"'
+        self.content = None
+
+        self.gzipped = None
+        self.gzip_etag = None
+        if len(content) >= MIN_COMPRESS_SIZE and \
+                is_compressible(content_type):
+            gzipped = compress(content)
+            if len(gzipped) < len(content):
+                self.gzipped = gzipped
+                self.gzip_etag = self.etag[:-1] + '-gzip"'
+
+    def is_modified(self, file_stat):
+        return file_stat.st_mtime != self.mtime or \
+            file_stat.st_size != self.file_size
+
+    def read(self):
+        if self.content is not None:
+            return self.content
+
+        with open(self.path, 'rb') as static_file:
+            return static_file.read()
+
+
+class StaticFiles(object):
+    """
+    The static files under the given root directory, indexed by their path
+    relative to the root. The files modified or created after the server
+    start are indexed again when they are requested, and the version of the
+    static files is computed again with them.
+    """
+
+    def __init__(self, root):
+        self.__root = root
+        self.__files = {}
+        self.__lock = threading.Lock()
+        self.version = None
+
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.relpath(os.path.join(dirpath, filename), root)
+                if path != VERSION_SCRIPT:
+                    self.get(path)
+
+        self.__update_version()
+
+        compressed = [f for f in self.__files.values() if f.gzipped]
+        LOG.debug("Indexed {0} static files, {1} of them compressed from "
+                  "{2} to {3} bytes."
+                  .format(len(self.__files), len(compressed),
+                          sum(f.file_size for f in compressed),
+                          sum(len(f.gzipped) for f in compressed)))
+
+    def __load(self, path, full_path, file_stat):
+        with open(full_path, 'rb') as static_file:
+            content = static_file.read()
+
+        if path == VERSION_SCRIPT:
+            content += "\nCC_RESOURCE_VERSION = '{0}';\n".format(self.version)
+
+        content_type = mimetypes.guess_type(full_path)[0] or \
+            'application/octet-stream'
+
+        static_file = StaticFile(full_path, file_stat, content, content_type)
+        if path == VERSION_SCRIPT:
+            static_file.content = content
+
+        return static_file
+
+    def __update_version(self):
+        """
+        Compute the version of the static files, which changes if any of the
+        files change, and index the version script with it.
+        """
+        digest = hashlib.sha1()
+        for path in sorted(self.__files):
+            if path != VERSION_SCRIPT:
+                digest.update(path)
+                digest.update(self.__files[path].etag)
+        self.version = digest.hexdigest()[:16]
+
+        full_path = os.path.join(self.__root, VERSION_SCRIPT)
+        if os.path.isfile(full_path):
+            self.__files[VERSION_SCRIPT] = self.__load(
+                VERSION_SCRIPT, full_path, os.stat(full_path))
+
+    def get(self, path):
+        """
+        Return the static file of the path relative to the root, or None if
+        it is not a regular file.
+        """
+        full_path = os.path.join(self.__root, path)
+        if not os.path.isfile(full_path):
+            return None
+
+        file_stat = os.stat(full_path)
+        static_file = self.__files.get(path)
+        if static_file is None or static_file.is_modified(file_stat):
+            static_file = self.__load(path, full_path, file_stat)
+            with self.__lock:
+                self.__files[path] = static_file
+
+                # The changed file must not be served under the version of
+                # its old content, which the browsers may have cached.
+                if self.version is not None and path != VERSION_SCRIPT:
+                    self.__update_version()
+
+        return static_file
+
+    def is_versioned(self, query):
+        """
+        Returns whether the query string of a request is the current
+        version of the static files.
+        """
+        return query == self.version
+
+    def get_cache_control(self, query):
+        """
+        Returns the Cache-Control header of a static file requested with
+        the given query string.
+        """
+        if self.is_versioned(query):
+            return 'public, max-age={0}'.format(VERSIONED_MAX_AGE)
+
+        # The browser must revalidate the file with its entity tag.
+        return 'no-cache'
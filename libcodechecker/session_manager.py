@@ -8,12 +8,14 @@ Handles the allocation and destruction of privileged sessions associated
 with a particular CodeChecker server.
 """
 
-from datetime import datetime
+from datetime import datetime, timedelta
 import hashlib
+import heapq
 import json
 import os
 import shutil
 import stat
+import threading
 import time
 import uuid
 
@@ -156,8 +158,14 @@ def load_session_cfg(session_cfg_file):
 class SessionManager:
     CodeChecker_Workspace = None
 
-    __valid_sessions = []
-    __logins_since_prune = 0
+    # The sessions are indexed by their token and by their persistency hash.
+    # The expiry heap contains (hard expiry time, token) pairs. An entry is
+    # pushed again with the new expiry time if its session was revalidated
+    # since the entry was pushed.
+    __sessions_by_token = {}
+    __sessions_by_hash = {}
+    __expiry_heap = []
+    __lock = threading.Lock()
 
     def __init__(self, root_sha, force_auth=False):
         LOG.debug('Loading session config')
@@ -356,41 +364,40 @@ class SessionManager:
         if not self.__auth_config["enabled"]:
             return None
 
-        self.__logins_since_prune += 1
-        if self.__logins_since_prune >= \
-                self.__auth_config["logins_until_cleanup"]:
-            self.__cleanup_sessions()
+        self.__cleanup_sessions()
 
         validation = self.__try_auth_root(auth_string)
         if not validation:
             validation = self.__handle_validation(auth_string)
 
         if validation:
-            # If the session is still valid and credentials
-            # are resent return old token.
-            session_already = next(
-                (s for s
-                 in SessionManager.__valid_sessions if s.still_reusable() and
-                 s.persistent_hash ==
-                    _Session.calc_persistency_hash(auth_string)),
-                None)
-
-            if session_already:
-                session_already.revalidate()
-                session = session_already
-            else:
-                # TODO: Use a more secure way for token generation?
-                token = uuid.UUID(bytes=os.urandom(16)).__str__().replace("-",
-                                                                          "")
-
-                user_name = validation['username']
-                groups = validation.get("groups", [])
-                is_root = validation.get('root', False)
-
-                session = _Session(token,
-                                   _Session.calc_persistency_hash(auth_string),
-                                   user_name, groups, is_root)
-                SessionManager.__valid_sessions.append(session)
+            persistency_hash = _Session.calc_persistency_hash(auth_string)
+
+            with SessionManager.__lock:
+                # If the session is still valid and credentials
+                # are resent return old token.
+                session = SessionManager.__sessions_by_hash.get(
+                    persistency_hash)
+
+                if session and session.still_reusable():
+                    session.revalidate()
+                else:
+                    # TODO: Use a more secure way for token generation?
+                    token = uuid.UUID(bytes=os.urandom(16)).__str__() \
+                        .replace("-", "")
+
+                    user_name = validation['username']
+                    groups = validation.get("groups", [])
+                    is_root = validation.get('root', False)
+
+                    session = _Session(token, persistency_hash,
+                                       user_name, groups, is_root)
+                    SessionManager.__sessions_by_token[token] = session
+                    SessionManager.__sessions_by_hash[persistency_hash] = \
+                        session
+                    heapq.heappush(SessionManager.__expiry_heap,
+                                   (SessionManager.__expiry_time(session),
+                                    token))
 
             return session
 
@@ -402,8 +409,7 @@ class SessionManager:
         if not self.isEnabled():
             return True
         else:
-            return any(_sess.token == token and _sess.still_valid(access)
-                       for _sess in SessionManager.__valid_sessions)
+            return self.get_session(token, access) is not None
 
     def get_session(self, token, access=False):
         """Gets the privileged session object based
@@ -411,25 +417,57 @@ class SessionManager:
         """
         if not self.isEnabled():
             return None
-        for _sess in SessionManager.__valid_sessions:
-            if _sess.token == token and _sess.still_valid(access):
-                return _sess
+
+        session = SessionManager.__sessions_by_token.get(token)
+        if session and session.still_valid(access):
+            return session
         return None
 
     def invalidate(self, token):
         """Remove a user's previous session from the store."""
-        for session in SessionManager.__valid_sessions[:]:
-            if session.token == token:
-                SessionManager.__valid_sessions.remove(session)
-                return True
+        with SessionManager.__lock:
+            session = SessionManager.__sessions_by_token.get(token)
+            if session is None:
+                return False
 
-        return False
+            SessionManager.__remove_session(session)
+            return True
+
+    @staticmethod
+    def __expiry_time(session):
+        return session.last_access + \
+            timedelta(seconds=session_lifetimes["hard"])
+
+    @staticmethod
+    def __remove_session(session):
+        """Remove the session from the indexes. The entry of the session in
+        the expiry heap is dropped when it is popped."""
+        del SessionManager.__sessions_by_token[session.token]
+        if SessionManager.__sessions_by_hash.get(
+                session.persistent_hash) is session:
+            del SessionManager.__sessions_by_hash[session.persistent_hash]
 
     def __cleanup_sessions(self):
-        SessionManager.__valid_sessions = [s for s
-                                           in SessionManager.__valid_sessions
-                                           if s.still_reusable()]
-        self.__logins_since_prune = 0
+        """Remove the sessions which exceeded their hard lifetime. Only the
+        expired entries of the expiry heap are visited."""
+        now = datetime.now()
+        heap = SessionManager.__expiry_heap
+
+        with SessionManager.__lock:
+            while heap and heap[0][0] < now:
+                _, token = heapq.heappop(heap)
+                session = SessionManager.__sessions_by_token.get(token)
+                if session is None:
+                    # The session was invalidated meanwhile.
+                    continue
+
+                if session.still_reusable():
+                    # The session was used since its entry was pushed.
+                    heapq.heappush(heap,
+                                   (SessionManager.__expiry_time(session),
+                                    token))
+                else:
+                    SessionManager.__remove_session(session)
 
 
 class SessionManager_Client:
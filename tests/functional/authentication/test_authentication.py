@@ -13,6 +13,7 @@ import unittest
 
 from thrift.protocol.TProtocol import TProtocolException
 
+from shared.ttypes import Permission
 from shared.ttypes import RequestFailed
 
 from libtest import codechecker
@@ -130,3 +131,34 @@ class DictAuth(unittest.TestCase):
 
         with self.assertRaises(subprocess.CalledProcessError):
             subprocess.check_output(store_cmd)
+
+    def test_permission_change_is_visible(self):
+        """
+        The cached permission decisions are dropped when a permission is
+        added or removed, so the change takes effect immediately.
+        """
+
+        auth_client = env.setup_auth_client(self._test_workspace,
+                                            session_token='_PROHIBIT')
+        root_token = auth_client.performLogin("Username:Password",
+                                              "root:root")
+        user_token = auth_client.performLogin("Username:Password",
+                                              "john:doe")
+
+        root_client = env.setup_auth_client(self._test_workspace,
+                                            session_token=root_token)
+        user_client = env.setup_auth_client(self._test_workspace,
+                                            session_token=user_token)
+
+        self.assertFalse(user_client.hasPermission(Permission.SUPERUSER, ""))
+
+        self.assertTrue(root_client.addPermission(Permission.SUPERUSER,
+                                                  "john", False, ""))
+        self.assertTrue(user_client.hasPermission(Permission.SUPERUSER, ""))
+
+        self.assertTrue(root_client.removePermission(Permission.SUPERUSER,
+                                                     "john", False, ""))
+        self.assertFalse(user_client.hasPermission(Permission.SUPERUSER, ""))
+
+        root_client.destroySession()
+        user_client.destroySession()
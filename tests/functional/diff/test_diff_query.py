@@ -0,0 +1,174 @@
+#
+# -----------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -----------------------------------------------------------------------------
+"""
+Test the report hash subqueries of the run comparison against the hashes
+computed from the reports of the compared runs, with empty and identical
+runs on either side.
+"""
+
+import os
+import unittest
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.engine.url import URL
+from sqlalchemy.orm import sessionmaker
+
+from codeCheckerDBAccess_v6.ttypes import CompareData, DiffType
+
+from libcodechecker.server.api import report_server
+from libcodechecker.server.database.run_db_model import Report
+
+from libtest import env
+
+
+class DiffQuery(unittest.TestCase):
+
+    def setUp(self):
+        test_workspace = os.environ['TEST_WORKSPACE']
+
+        test_class = self.__class__.__name__
+        print('Running ' + test_class + ' tests in ' + test_workspace)
+
+        codechecker_cfg = env.import_codechecker_cfg(test_workspace)
+
+        pg_config = env.get_postgresql_cfg()
+        if pg_config:
+            url = URL('postgresql', pg_config.get('dbusername'), None,
+                      pg_config['dbaddress'], pg_config['dbport'],
+                      codechecker_cfg['viewer_product'])
+        else:
+            url = URL('sqlite', database=os.path.join(test_workspace,
+                                                      'data.sqlite'))
+
+        self._engine = create_engine(url)
+        self._session = sessionmaker(bind=self._engine)()
+
+        self._cc_client = env.setup_viewer_client(test_workspace)
+        self.assertIsNotNone(self._cc_client)
+
+        run_names = env.get_run_names(test_workspace)
+        runs = [run for run in self._cc_client.getRunData(None)
+                if run.name in run_names]
+        self.assertEqual(len(runs), 2)
+
+        # Name order matters from __init__ !
+        self._base_runid = runs[0].runId
+        self._new_runid = runs[1].runId
+
+        # A run id without any reports.
+        self._empty_runid = \
+            self._session.query(func.max(Report.run_id)).scalar() + 1
+
+    def tearDown(self):
+        self._session.close()
+        self._engine.dispose()
+
+    def __hashes(self, run_ids):
+        return set(bug_id for bug_id, in
+                   self._session.query(Report.bug_id)
+                   .filter(Report.run_id.in_(run_ids)))
+
+    def __expected(self, base_run_ids, new_run_ids, diff_type):
+        base_hashes = self.__hashes(base_run_ids)
+        new_hashes = self.__hashes(new_run_ids)
+
+        if diff_type == DiffType.NEW:
+            return new_hashes - base_hashes, new_run_ids
+        elif diff_type == DiffType.RESOLVED:
+            return base_hashes - new_hashes, base_run_ids
+        return new_hashes & base_hashes, new_run_ids
+
+    def __check_diff(self, base_run_ids, new_run_ids):
+        """
+        Every kind of difference of the runs is the same as the one computed
+        from their report hashes. The unresolved hashes are returned.
+        """
+        for diff_type in [DiffType.NEW,
+                          DiffType.RESOLVED,
+                          DiffType.UNRESOLVED]:
+            diff_hashes, run_ids = report_server.get_diff_hashes_for_query(
+                base_run_ids, new_run_ids, diff_type)
+
+            result = set(bug_id for bug_id, in
+                         self._session.execute(diff_hashes))
+
+            expected_hashes, expected_run_ids = \
+                self.__expected(base_run_ids, new_run_ids, diff_type)
+
+            self.assertEqual(result, expected_hashes,
+                             DiffType._VALUES_TO_NAMES[diff_type])
+            self.assertEqual(run_ids, expected_run_ids)
+
+        return result
+
+    def test_different_runs(self):
+        """
+        The differences of the two runs of the test project.
+        """
+        self.__check_diff([self._base_runid], [self._new_runid])
+
+    def test_empty_baseline(self):
+        """
+        Every report is new and nothing is resolved compared to an empty
+        baseline.
+        """
+        for base_run_ids in [[], [self._empty_runid]]:
+            self.assertEqual(self.__check_diff(base_run_ids,
+                                               [self._new_runid]), set())
+
+            diff_hashes, _ = report_server.get_diff_hashes_for_query(
+                base_run_ids, [self._new_runid], DiffType.NEW)
+            self.assertEqual(
+                set(bug_id for bug_id, in
+                    self._session.execute(diff_hashes)),
+                self.__hashes([self._new_runid]))
+
+    def test_empty_new_runs(self):
+        """
+        Every report of the baseline is resolved in empty new runs.
+        """
+        for new_run_ids in [[], [self._empty_runid]]:
+            self.assertEqual(self.__check_diff([self._base_runid],
+                                               new_run_ids), set())
+
+            diff_hashes, _ = report_server.get_diff_hashes_for_query(
+                [self._base_runid], new_run_ids, DiffType.RESOLVED)
+            self.assertEqual(
+                set(bug_id for bug_id, in
+                    self._session.execute(diff_hashes)),
+                self.__hashes([self._base_runid]))
+
+    def test_identical_runs(self):
+        """
+        Nothing is new or resolved and every report is unresolved when a run
+        is compared to itself.
+        """
+        for run_id in [self._base_runid, self._new_runid]:
+            self.assertEqual(self.__check_diff([run_id], [run_id]),
+                             self.__hashes([run_id]))
+
+            run_count = self._cc_client.getRunResultCount([run_id],
+                                                          None,
+                                                          None)
+            self.assertNotEqual(run_count, 0)
+
+            for diff_type, count in [(DiffType.NEW, 0),
+                                     (DiffType.RESOLVED, 0),
+                                     (DiffType.UNRESOLVED, run_count)]:
+                cmp_data = CompareData(runIds=[run_id], diffType=diff_type)
+                self.assertEqual(
+                    self._cc_client.getRunResultCount([run_id],
+                                                      None,
+                                                      cmp_data),
+                    count)
+
+    def test_empty_runs(self):
+        """
+        Empty runs have no differences.
+        """
+        self.assertEqual(self.__check_diff([self._empty_runid],
+                                           [self._empty_runid]), set())
@@ -219,3 +219,41 @@ class RunResults(unittest.TestCase):
                             (bug1.line <=
                              bug2.line) or
                             (bug1.checkerId <= bug2.checkerId))
+
+    def test_get_run_results_page(self):
+        """ Get the run results page by page with continuation cursors. """
+        runid = self._runid
+        sort_types = [SortMode(SortType.FILENAME, Order.ASC),
+                      SortMode(SortType.SEVERITY, Order.DESC)]
+
+        run_result_count = self._cc_client.getRunResultCount([runid],
+                                                             None,
+                                                             None)
+        self.assertTrue(run_result_count)
+
+        run_results = []
+        cursor = ''
+        while True:
+            page = self._cc_client.getRunResultsPage([runid],
+                                                     3,
+                                                     cursor,
+                                                     sort_types,
+                                                     None,
+                                                     None)
+            self.assertLessEqual(len(page.reports), 3)
+            run_results.extend(page.reports)
+
+            cursor = page.nextCursor
+            if not cursor:
+                break
+
+        self.assertEqual(run_result_count, len(run_results))
+        self.assertEqual(len(run_results),
+                         len(set(res.reportId for res in run_results)))
+
+        for i in range(run_result_count - 1):
+            bug1 = run_results[i]
+            bug2 = run_results[i + 1]
+            self.assertTrue(bug1.checkedFile <= bug2.checkedFile)
+            self.assertTrue((bug1.checkedFile != bug2.checkedFile) or
+                            (bug1.severity >= bug2.severity))
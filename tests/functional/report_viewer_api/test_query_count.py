@@ -0,0 +1,110 @@
+#
+# -----------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -----------------------------------------------------------------------------
+
+"""
+Test the number of the database queries issued by the report details and the
+bug path comparison. The number of the queries must not grow with the length
+of the bug paths.
+"""
+
+import os
+import unittest
+
+from sqlalchemy import create_engine, event, func
+from sqlalchemy.engine.url import URL
+from sqlalchemy.orm import sessionmaker
+
+from libcodechecker.analyze import store_handler
+from libcodechecker.server.api import report_server
+from libcodechecker.server.database.run_db_model import BugPathEvent
+
+from libtest import env
+
+
+class QueryCount(unittest.TestCase):
+
+    def setUp(self):
+        test_workspace = os.environ['TEST_WORKSPACE']
+
+        test_class = self.__class__.__name__
+        print('Running ' + test_class + ' tests in ' + test_workspace)
+
+        codechecker_cfg = env.import_codechecker_cfg(test_workspace)
+
+        pg_config = env.get_postgresql_cfg()
+        if pg_config:
+            url = URL('postgresql', pg_config.get('dbusername'), None,
+                      pg_config['dbaddress'], pg_config['dbport'],
+                      codechecker_cfg['viewer_product'])
+        else:
+            url = URL('sqlite', database=os.path.join(test_workspace,
+                                                      'data.sqlite'))
+
+        self._engine = create_engine(url)
+        self._session = sessionmaker(bind=self._engine)()
+
+        self._statements = []
+        event.listen(self._engine, 'before_cursor_execute',
+                     self.__count_statement)
+
+    def tearDown(self):
+        event.remove(self._engine, 'before_cursor_execute',
+                     self.__count_statement)
+        self._session.close()
+        self._engine.dispose()
+
+    def __count_statement(self, conn, cursor, statement, parameters,
+                          context, executemany):
+        self._statements.append(statement)
+
+    def __get_longest_path_report(self):
+        """
+        Return the id and the path length of the report with the most bug
+        path events.
+        """
+        path_length = func.count(BugPathEvent.order)
+        report_id, length = self._session.query(BugPathEvent.report_id,
+                                                path_length) \
+            .group_by(BugPathEvent.report_id) \
+            .order_by(path_length.desc()) \
+            .first()
+
+        self._statements = []
+        return report_id, length
+
+    def test_report_details_query_count(self):
+        """
+        The file paths of the bug path are loaded by the same queries as
+        the events and the points.
+        """
+        report_id, length = self.__get_longest_path_report()
+        self.assertGreater(length, 1)
+
+        details = report_server.get_report_details(self._session, report_id)
+
+        self.assertEqual(len(details.pathEvents), length)
+        for path_event in details.pathEvents:
+            self.assertTrue(path_event.filePath)
+
+        self.assertLessEqual(len(self._statements), 2)
+
+    def test_same_event_path_query_count(self):
+        """
+        Comparing a bug path with the stored one does not query the files
+        one by one.
+        """
+        report_id, length = self.__get_longest_path_report()
+        self.assertGreater(length, 1)
+
+        details = report_server.get_report_details(self._session, report_id)
+        self._statements = []
+
+        self.assertTrue(store_handler.is_same_event_path(report_id,
+                                                         details.pathEvents,
+                                                         self._session))
+
+        self.assertLessEqual(len(self._statements), 2)
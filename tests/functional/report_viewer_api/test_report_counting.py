@@ -9,9 +9,17 @@ from collections import Counter
 from collections import defaultdict
 import os
 import unittest
+import uuid
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine.url import URL
+from sqlalchemy.orm import sessionmaker
 
 from codeCheckerDBAccess_v6.ttypes import *
 
+from libcodechecker.server.database.run_db_model import ReportStatistics
+
+from libtest import codechecker
 from libtest import env
 
 
@@ -45,6 +53,8 @@ class TestReportFilter(unittest.TestCase):
         self._cc_client = env.setup_viewer_client(test_workspace)
         self.assertIsNotNone(self._cc_client)
 
+        self._test_workspace = test_workspace
+
         # Get the run names which belong to this test.
         run_names = env.get_run_names(test_workspace)
 
@@ -195,6 +205,33 @@ class TestReportFilter(unittest.TestCase):
         self.assertGreaterEqual(len(checker_counts), len(all_core))
         self.assertDictContainsSubset(all_core, checkers_dict)
 
+    def test_run1_run2_checker_status_counts(self):
+        """
+        Get the checker counts split by review and detection statuses for
+        run1 and run2.
+        """
+        status_counts = self._cc_client.getCheckerStatusCounts(self._runids,
+                                                               None,
+                                                               None)
+        checkers_dict = defaultdict(int)
+        detection_counts = defaultdict(int)
+        for res in status_counts:
+            checkers_dict[res.checkerName] += res.count
+            self.assertEqual(sum(res.detectionStatusCounts.values()),
+                             res.count)
+            for status, count in res.detectionStatusCounts.items():
+                detection_counts[status] += count
+
+        r1_checkers = Counter(self.run1_checkers)
+        r2_checkers = Counter(self.run2_checkers)
+        all_checkers = dict(r1_checkers + r2_checkers)
+
+        self.assertDictEqual(dict(checkers_dict), all_checkers)
+
+        all_detection_counts = dict(Counter(self.run1_detection_counts) +
+                                    Counter(self.run2_detection_counts))
+        self.assertDictEqual(dict(detection_counts), all_detection_counts)
+
     def test_run1_all_severity(self):
         """
         Get all the severity counts for run1.
@@ -577,3 +614,175 @@ class TestReportFilter(unittest.TestCase):
                                                              None)
         self.assertEqual(len(tag_reports), 1)
         self.assertEqual(tag_reports[0].name, run.name + ':v1.0')
+
+    def __base_counts(self, run_ids):
+        """
+        Count the review statuses and the checkers of the reports returned
+        by the server one by one.
+        """
+        report_count = self._cc_client.getRunResultCount(run_ids, None, None)
+        reports = self._cc_client.getRunResults(run_ids, report_count, 0, [],
+                                                None, None)
+
+        review_status = Counter(r.reviewData.status for r in reports)
+        checkers = Counter(r.checkerId for r in reports)
+        return dict(review_status), dict(checkers)
+
+    def __statistics_counts(self, run_ids):
+        """
+        Count the review statuses and the checkers of the reports from the
+        pre-aggregated report statistics.
+        """
+        review_status = self._cc_client.getReviewStatusCounts(run_ids, None,
+                                                              None)
+        checker_counts = self._cc_client.getCheckerCounts(run_ids, None, None)
+        checkers = defaultdict(int)
+        for res in checker_counts:
+            checkers[res.name] += res.count
+        return review_status, dict(checkers)
+
+    def test_statistics_after_changes(self):
+        """
+        The report counts read from the report statistics follow the review
+        status changes and the removal of a run.
+        """
+        codechecker_cfg = env.import_codechecker_cfg(self._test_workspace)
+        run_name = 'test_report_statistics_' + uuid.uuid4().hex
+        codechecker.store(codechecker_cfg, run_name,
+                          os.path.join(self._test_workspace, 'reports'))
+
+        runs = self._cc_client.getRunData(None)
+        new_run_id = [run.runId for run in runs if run.name == run_name][0]
+        run_ids = self._runids + [new_run_id]
+
+        self.assertEqual(self.__statistics_counts(run_ids),
+                         self.__base_counts(run_ids))
+
+        # The review status of a bug hash is changed in every run.
+        report_count = self._cc_client.getRunResultCount([new_run_id],
+                                                         None,
+                                                         None)
+        reports = self._cc_client.getRunResults([new_run_id], report_count,
+                                                0, [], None, None)
+        for report in reports[:5]:
+            self._cc_client.changeReviewStatus(report.reportId,
+                                               ReviewStatus.FALSE_POSITIVE,
+                                               'statistics')
+        for report in reports[5:10]:
+            self._cc_client.changeReviewStatus(report.reportId,
+                                               ReviewStatus.CONFIRMED,
+                                               'statistics')
+
+        for ids in [[self._runids[0]], [new_run_id], run_ids]:
+            self.assertEqual(self.__statistics_counts(ids),
+                             self.__base_counts(ids))
+
+        # The unique counts are always counted from the reports.
+        unique_filter = ReportFilter(isUnique=True)
+        unique_review_status = self._cc_client.getReviewStatusCounts(
+            [new_run_id], unique_filter, None)
+        self.assertEqual(sum(unique_review_status.values()),
+                         len(set(r.bugHash for r in reports)))
+
+        for report in reports[:10]:
+            self._cc_client.changeReviewStatus(report.reportId,
+                                               ReviewStatus.UNREVIEWED,
+                                               '')
+
+        self.assertTrue(self._cc_client.removeRunResults([new_run_id]))
+
+        self.assertEqual(self._cc_client.getReviewStatusCounts([new_run_id],
+                                                               None,
+                                                               None), {})
+        self.assertEqual(self._cc_client.getCheckerCounts([new_run_id],
+                                                          None,
+                                                          None), [])
+        self.assertEqual(self.__statistics_counts(self._runids),
+                         self.__base_counts(self._runids))
+
+    def __statistics_session(self):
+        """
+        Open a session of the database of the tested product.
+        """
+        codechecker_cfg = env.import_codechecker_cfg(self._test_workspace)
+
+        pg_config = env.get_postgresql_cfg()
+        if pg_config:
+            url = URL('postgresql', pg_config.get('dbusername'), None,
+                      pg_config['dbaddress'], pg_config['dbport'],
+                      codechecker_cfg['viewer_product'])
+        else:
+            url = URL('sqlite', database=os.path.join(self._test_workspace,
+                                                      'data.sqlite'))
+
+        return sessionmaker(bind=create_engine(url))()
+
+    def __invalidate_responses(self):
+        """
+        Drop the cached responses of the server by changing a review status
+        to the same value.
+        """
+        report = self._cc_client.getRunResults(self._runids[:1], 1, 0, [],
+                                               None, None)[0]
+        self._cc_client.changeReviewStatus(report.reportId,
+                                           report.reviewData.status,
+                                           report.reviewData.comment or '')
+
+    def test_statistics_page_filter(self):
+        """
+        The unique counts queried by the statistics page of the web UI are
+        counted from the report statistics.
+        """
+        # A row which is only in the report statistics, so it is counted
+        # only if the statistics are read from there.
+        session = self.__statistics_session()
+        marker = ReportStatistics(self._runids[0], 'statistics_marker',
+                                  'statistics.Marker', Severity.HIGH, 'new',
+                                  'unreviewed', None, 1)
+        session.add(marker)
+        session.commit()
+
+        try:
+            self.__invalidate_responses()
+
+            # The same filter as the one of the statistics page.
+            report_filter = ReportFilter(isUnique=True)
+            status_counts = self._cc_client.getCheckerStatusCounts(
+                self._runids, report_filter, None)
+
+            marker_counts = [c for c in status_counts
+                             if c.checkerName == 'statistics.Marker']
+            self.assertEqual(len(marker_counts), 1)
+            self.assertEqual(marker_counts[0].count, 1)
+            self.assertEqual(marker_counts[0].reviewStatus,
+                             ReviewStatus.UNREVIEWED)
+            self.assertEqual(marker_counts[0].detectionStatusCounts,
+                             {DetectionStatus.NEW: 1})
+        finally:
+            session.delete(marker)
+            session.commit()
+            session.close()
+            self.__invalidate_responses()
+
+    def test_unique_statistics(self):
+        """
+        The unique counts of the report statistics match the number of the
+        different bug hashes of the reports.
+        """
+        report_count = self._cc_client.getRunResultCount(self._runids, None,
+                                                         None)
+        reports = self._cc_client.getRunResults(self._runids, report_count,
+                                                0, [], None, None)
+
+        checker_hashes = defaultdict(set)
+        for report in reports:
+            checker_hashes[report.checkerId].add(report.bugHash)
+
+        unique_filter = ReportFilter(isUnique=True)
+        checker_counts = self._cc_client.getCheckerCounts(self._runids,
+                                                          unique_filter,
+                                                          None)
+        self.assertDictEqual(
+            dict((res.name, res.count) for res in checker_counts),
+            dict((checker, len(hashes))
+                 for checker, hashes in checker_hashes.items()))
@@ -0,0 +1,150 @@
+# -------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -------------------------------------------------------------------------
+"""
+Measure the report storage throughput of the server (reports per second) by
+storing generated reports into a fresh SQLite database, once with the report
+by report store_handler.addReport() and once with the batched
+store_handler.BulkReportStorage.
+
+Every run is stored twice: the first store inserts every report, the second
+one finds every report as an existing one.
+"""
+
+from __future__ import print_function
+
+import argparse
+from datetime import datetime
+import os
+import shutil
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from codeCheckerDBAccess_v6 import ttypes
+
+from libcodechecker.analyze import store_handler
+from libcodechecker.server.database.run_db_model import *
+
+
+class StorageSession(object):
+    """
+    Minimal, single-threaded stand-in of the server's storage session.
+    """
+
+    def __init__(self):
+        self.__sessions = {}
+
+    def start_run_session(self, run_id, transaction):
+        self.__sessions[run_id] = {'touched_reports': set(),
+                                   'transaction': transaction}
+
+    def end_run_session(self, run_id, run_history_time):
+        self.__sessions[run_id]['transaction'].commit()
+        self.__sessions[run_id]['transaction'].close()
+        del self.__sessions[run_id]
+
+    def touch_report(self, run_id, report_id):
+        self.__sessions[run_id]['touched_reports'].add(report_id)
+
+    def is_touched(self, run_id, report_id):
+        return report_id in self.__sessions[run_id]['touched_reports']
+
+    def has_ongoing_run(self, run_id):
+        return run_id in self.__sessions
+
+    def get_transaction(self, run_id):
+        return self.__sessions[run_id]['transaction']
+
+
+def generate_reports(file_ids, report_num, path_length):
+    """
+    Generate (file id, main section, bug path, events) tuples.
+    """
+    for i in range(report_num):
+        file_id = file_ids[i % len(file_ids)]
+        main = {'issue_hash_content_of_line_in_context': 'hash%d' % i,
+                'description': 'Message %d' % i,
+                'category': 'Logic error',
+                'type': 'Bug',
+                'location': {'line': i, 'col': 1}}
+        bugpath = [ttypes.BugPathPos(j, 1, j, 10, file_id)
+                   for j in range(path_length)]
+        events = [ttypes.BugPathEvent(j, 1, j, 10, 'Event %d' % j, file_id)
+                  for j in range(path_length)]
+        yield file_id, main, bugpath, events
+
+
+def store(session_maker, storage_session, file_ids, report_num,
+          path_length, bulk):
+    """
+    Store the generated reports and return the elapsed time.
+    """
+    now = datetime.now()
+    run_id = store_handler.addCheckerRun(session_maker(), storage_session,
+                                         'bench', 'bench', None, 'bench',
+                                         now, 'bench', False)
+
+    begin = time.time()
+    if bulk:
+        report_storage = store_handler.BulkReportStorage(
+            storage_session, run_id, {fid: 'file%d.cpp' % fid
+                                      for fid in file_ids})
+
+    for file_id, main, bugpath, events in \
+            generate_reports(file_ids, report_num, path_length):
+        if bulk:
+            report_storage.add_report(file_id, main, bugpath, events,
+                                      'core.Bench', 30, now)
+        else:
+            store_handler.addReport(storage_session, run_id, file_id, main,
+                                    bugpath, events, 'core.Bench', 30, now)
+
+    if bulk:
+        report_storage.flush()
+
+    storage_session.end_run_session(run_id, now)
+    return time.time() - begin
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--reports', type=int, default=5000,
+                        help="Number of reports in the run.")
+    parser.add_argument('--path-length', type=int, default=10,
+                        help="Number of events and points per report.")
+    parser.add_argument('--files', type=int, default=100,
+                        help="Number of source files.")
+    args = parser.parse_args()
+
+    for bulk in [False, True]:
+        work_dir = tempfile.mkdtemp()
+        try:
+            engine = create_engine('sqlite:///' +
+                                   os.path.join(work_dir, 'bench.sqlite'))
+            CC_META.create_all(engine)
+            session_maker = sessionmaker(bind=engine)
+
+            file_ids = []
+            for i in range(args.files):
+                file_ids.append(store_handler.addFileContent(
+                    session_maker(), 'file%d.cpp' % i, 'content%d' % i,
+                    None, None))
+
+            storage_session = StorageSession()
+            for store_type in ['initial', 'update']:
+                elapsed = store(session_maker, storage_session, file_ids,
+                                args.reports, args.path_length, bulk)
+                print("{0:<12} {1:<8} {2:>10.1f} reports/s"
+                      .format('bulk' if bulk else 'per-report', store_type,
+                              args.reports / elapsed))
+        finally:
+            shutil.rmtree(work_dir)
+
+
+if __name__ == '__main__':
+    main()
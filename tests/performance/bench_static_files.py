@@ -0,0 +1,154 @@
+# -------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -------------------------------------------------------------------------
+"""
+Measure the number of requests and the transferred bytes of loading the web
+viewer page of a running CodeChecker server, the way a browser would:
+
+  * first load: every resource of the page is downloaded,
+  * repeated load: the resources are revalidated with their entity tags and
+    the versioned resources are served from the browser cache.
+
+The page is loaded both with and without accepting gzip compression.
+"""
+
+from __future__ import print_function
+
+import argparse
+import gzip
+from HTMLParser import HTMLParser
+from cStringIO import StringIO
+import time
+import urllib2
+import urlparse
+
+
+class ResourceParser(HTMLParser):
+    """
+    Collect the scripts, style sheets and icons referred by a page.
+    """
+
+    def __init__(self):
+        HTMLParser.__init__(self)
+        self.resources = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'script' and attrs.get('src'):
+            self.resources.append(attrs['src'])
+        elif tag == 'link' and attrs.get('href'):
+            self.resources.append(attrs['href'])
+
+
+class NotModifiedProcessor(urllib2.HTTPErrorProcessor):
+    """
+    Return the 304 Not Modified responses instead of raising an error.
+    """
+
+    def http_response(self, request, response):
+        return response
+
+    https_response = http_response
+
+
+class Browser(object):
+    """
+    Minimal browser cache: keeps the entity tags of the downloaded resources
+    and the versioned resources until their max-age expires.
+    """
+
+    def __init__(self, accept_gzip):
+        self.__accept_gzip = accept_gzip
+        self.__opener = urllib2.build_opener(NotModifiedProcessor)
+        self.__etags = {}
+        self.__expires = {}
+        self.__contents = {}
+
+        self.requests = 0
+        self.not_modified = 0
+        self.bytes = 0
+
+    def reset_counters(self):
+        self.requests = 0
+        self.not_modified = 0
+        self.bytes = 0
+
+    def get(self, url):
+        """
+        Return the content of the resource, from the cache if it is still
+        fresh or it was not modified.
+        """
+        if self.__expires.get(url, 0) > time.time():
+            return self.__contents[url]
+
+        request = urllib2.Request(url)
+        if self.__accept_gzip:
+            request.add_header('Accept-Encoding', 'gzip')
+        if url in self.__etags:
+            request.add_header('If-None-Match', self.__etags[url])
+
+        response = self.__opener.open(request)
+        body = response.read()
+
+        self.requests += 1
+        self.bytes += len(body)
+
+        headers = response.info()
+        cache_control = headers.getheader('Cache-Control') or ''
+        for directive in cache_control.split(','):
+            directive = directive.strip()
+            if directive.startswith('max-age='):
+                self.__expires[url] = time.time() + int(directive[8:])
+
+        if response.getcode() == 304:
+            self.not_modified += 1
+            return self.__contents[url]
+
+        if headers.getheader('Content-Encoding') == 'gzip':
+            body = gzip.GzipFile(fileobj=StringIO(body)).read()
+
+        if headers.getheader('ETag'):
+            self.__etags[url] = headers.getheader('ETag')
+        self.__contents[url] = body
+
+        return body
+
+    def load_page(self, url):
+        parser = ResourceParser()
+        parser.feed(self.get(url))
+        for resource in parser.resources:
+            self.get(urlparse.urljoin(url, resource))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure the page load of the web viewer.")
+    parser.add_argument('--url', default='http://localhost:8001/Default/',
+                        help="URL of the viewer page of a product.")
+    parser.add_argument('--modules', nargs='*', default=[],
+                        help="Additional resources to load, relative to the "
+                             "page, for example the Dojo modules of the "
+                             "viewer with their version query string.")
+    args = parser.parse_args()
+
+    print("{0:<10} {1:<8} {2:>9} {3:>13} {4:>12}"
+          .format('encoding', 'load', 'requests', 'not modified', 'bytes'))
+
+    for accept_gzip in [False, True]:
+        browser = Browser(accept_gzip)
+        for load in ['first', 'repeated']:
+            browser.reset_counters()
+            browser.load_page(args.url)
+            for module in args.modules:
+                browser.get(urlparse.urljoin(args.url, module))
+
+            print("{0:<10} {1:<8} {2:>9} {3:>13} {4:>12}"
+                  .format('gzip' if accept_gzip else 'identity', load,
+                          browser.requests, browser.not_modified,
+                          browser.bytes))
+
+
+if __name__ == '__main__':
+    main()
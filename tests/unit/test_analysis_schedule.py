@@ -0,0 +1,68 @@
+# -----------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -----------------------------------------------------------------------------
+
+""" Unit tests for the scheduling of the analysis actions. """
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from libcodechecker.analyze import analysis_manager
+from libcodechecker.log.build_action import BuildAction
+
+
+class AnalysisScheduleTest(unittest.TestCase):
+    """
+    Test that the longest analysis actions are started first.
+    """
+
+    def setUp(self):
+        self.__tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.__tmp_dir)
+
+    def __action(self, name, size):
+        source = os.path.join(self.__tmp_dir, name)
+        with open(source, 'w') as source_file:
+            source_file.write('x' * size)
+
+        action = BuildAction()
+        action.analyzer_type = 'clangsa'
+        action.original_command = 'g++ -c ' + source
+        action.sources = source
+        return action
+
+    def test_source_size(self):
+        """
+        Without previous durations the biggest sources are analyzed first.
+        """
+        small = self.__action('small.cpp', 10)
+        big = self.__action('big.cpp', 1000)
+        medium = self.__action('medium.cpp', 100)
+
+        scheduled = analysis_manager.schedule_actions([small, big, medium],
+                                                      {})
+        self.assertEqual(scheduled, [big, medium, small])
+
+    def test_previous_durations(self):
+        """
+        The previous durations take precedence over the source sizes, and
+        the unknown actions are estimated by the speed of the known ones.
+        """
+        small = self.__action('small.cpp', 10)
+        big = self.__action('big.cpp', 1000)
+        new = self.__action('new.cpp', 100)
+
+        durations = {analysis_manager.get_action_key(small): 50.0,
+                     analysis_manager.get_action_key(big): 10.0}
+
+        # 60 seconds for 1010 bytes: the new action is estimated to take
+        # about 6 seconds.
+        scheduled = analysis_manager.schedule_actions([new, big, small],
+                                                      durations)
+        self.assertEqual(scheduled, [small, big, new])
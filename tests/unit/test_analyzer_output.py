@@ -0,0 +1,88 @@
+# -----------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -----------------------------------------------------------------------------
+
+""" Unit tests for the streamed standard output of the analyzers. """
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from libcodechecker.analyze.analyzers import analyzer_base
+from libcodechecker.analyze.analyzers.analyzer_base import SourceAnalyzer
+
+
+class StreamedOutputTest(unittest.TestCase):
+    """
+    Testing the output kept and captured from the streamed analyzer runs.
+    """
+
+    def setUp(self):
+        self.__tmp_dir = tempfile.mkdtemp()
+        self.__capture_file = os.path.join(self.__tmp_dir, 'stdout.txt')
+        self.__lines = []
+
+        self.__kept_size = analyzer_base.STREAMED_STDOUT_KEPT_SIZE
+        analyzer_base.STREAMED_STDOUT_KEPT_SIZE = 100
+
+    def tearDown(self):
+        analyzer_base.STREAMED_STDOUT_KEPT_SIZE = self.__kept_size
+        shutil.rmtree(self.__tmp_dir)
+
+    def __handle_stdout(self, lines):
+        self.__lines.extend(lines)
+
+    def __run(self, exit_code, line_count=50):
+        script = os.path.join(self.__tmp_dir, 'analyzer.py')
+        with open(script, 'w') as analyzer:
+            analyzer.write("import sys\n"
+                           "for i in range({0}):\n"
+                           "    print('line %d' % i)\n"
+                           "sys.exit({1})\n".format(line_count, exit_code))
+
+        return SourceAnalyzer.run_proc_streaming(
+            sys.executable + ' ' + script,
+            self.__handle_stdout,
+            stdout_capture_file=self.__capture_file)
+
+    def test_success(self):
+        """
+        Only the beginning of the output of a successful run is kept, but
+        every line is handled and the whole output is captured.
+        """
+        return_code, stdout, _ = self.__run(0)
+        expected = ''.join('line %d\n' % i for i in range(50))
+
+        self.assertEqual(return_code, 0)
+        self.assertEqual(self.__lines,
+                         ['line %d' % i for i in range(50)])
+        self.assertTrue(stdout.startswith(expected[:100]))
+        self.assertIn('[Truncated {0} bytes of the output.]'
+                      .format(len(expected) - 100), stdout)
+
+        with open(self.__capture_file) as capture:
+            self.assertEqual(capture.read(), expected)
+
+    def test_failure(self):
+        """
+        The whole output of a failed run is kept and it is not captured.
+        """
+        return_code, stdout, _ = self.__run(1)
+
+        self.assertEqual(return_code, 1)
+        self.assertEqual(stdout, ''.join('line %d\n' % i for i in range(50)))
+        self.assertFalse(os.path.exists(self.__capture_file))
+
+    def test_no_output(self):
+        """
+        The capture file is not created without any output.
+        """
+        return_code, stdout, _ = self.__run(0, 0)
+
+        self.assertEqual(return_code, 0)
+        self.assertEqual(stdout, '')
+        self.assertFalse(os.path.exists(self.__capture_file))
@@ -0,0 +1,108 @@
+# -----------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -----------------------------------------------------------------------------
+
+""" Unit tests for the compiler info cache module. """
+
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from libcodechecker.analyze.compiler_info_cache import CompilerInfoCache
+
+
+def fill_cache(args):
+    """
+    Add entries to the cache file from a new cache object in a worker
+    process.
+    """
+    cache_file, compiler, worker = args
+    cache = CompilerInfoCache(cache_file)
+    for i in range(20):
+        cache.get('target', compiler, [str(worker), str(i)],
+                  lambda: 'result')
+
+
+class CompilerInfoCacheTest(unittest.TestCase):
+    """
+    Testing the persistent cache of the compiler information.
+    """
+
+    def setUp(self):
+        self.__tmp_dir = tempfile.mkdtemp()
+        self.__cache_file = os.path.join(self.__tmp_dir, 'cache.json')
+
+        # A fake compiler binary, only its modification time matters.
+        self.__compiler = os.path.join(self.__tmp_dir, 'cc')
+        open(self.__compiler, 'w').close()
+
+        self.__calls = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.__tmp_dir)
+
+    def __compute(self):
+        self.__calls += 1
+        return 'result ' + str(self.__calls)
+
+    def test_cached_in_process(self):
+        """
+        The compiler is queried only once for the same flags.
+        """
+        cache = CompilerInfoCache(self.__cache_file)
+        self.assertEqual(cache.get('target', self.__compiler, ['-m32'],
+                                   self.__compute), 'result 1')
+        self.assertEqual(cache.get('target', self.__compiler, ['-m32'],
+                                   self.__compute), 'result 1')
+        self.assertEqual(cache.get('target', self.__compiler, ['-m64'],
+                                   self.__compute), 'result 2')
+        self.assertEqual(self.__calls, 2)
+
+    def test_persistent(self):
+        """
+        The results are reused by a new cache object.
+        """
+        CompilerInfoCache(self.__cache_file).get(
+            'includes', self.__compiler, [], self.__compute)
+
+        cache = CompilerInfoCache(self.__cache_file)
+        self.assertEqual(cache.get('includes', self.__compiler, [],
+                                   self.__compute), 'result 1')
+        self.assertEqual(self.__calls, 1)
+
+    def test_compiler_changed(self):
+        """
+        The results are invalidated when the compiler binary changes.
+        """
+        CompilerInfoCache(self.__cache_file).get(
+            'includes', self.__compiler, [], self.__compute)
+
+        mtime = time.time() + 10
+        os.utime(self.__compiler, (mtime, mtime))
+
+        cache = CompilerInfoCache(self.__cache_file)
+        self.assertEqual(cache.get('includes', self.__compiler, [],
+                                   self.__compute), 'result 2')
+
+    def test_parallel_processes(self):
+        """
+        The entries added by concurrent processes are all kept in the cache
+        file.
+        """
+        pool = multiprocessing.Pool(4)
+        try:
+            pool.map(fill_cache,
+                     [(self.__cache_file, self.__compiler, worker)
+                      for worker in range(4)])
+        finally:
+            pool.close()
+            pool.join()
+
+        with open(self.__cache_file) as cache:
+            self.assertEqual(len(json.load(cache)), 4 * 20)
@@ -0,0 +1,139 @@
+# -----------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -----------------------------------------------------------------------------
+
+""" Unit tests for the store of the AST dumps of the CTU analysis. """
+
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+
+from libcodechecker.analyze import ctu_manager
+
+
+class CtuAstStoreTest(unittest.TestCase):
+    """
+    Test the linking, the decompression and the removal of the stored AST
+    dumps.
+    """
+
+    def setUp(self):
+        self.__output_dir = tempfile.mkdtemp()
+        self.__ctu_dir = os.path.join(self.__output_dir, 'ctu-dir')
+        os.makedirs(self.__ctu_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.__output_dir)
+
+    def __store_ast(self, ast_key, content, compress=False):
+        ast_path = ctu_manager.get_ast_store_path(self.__ctu_dir, 'x86_64',
+                                                  ast_key)
+        if not os.path.isdir(os.path.dirname(ast_path)):
+            os.makedirs(os.path.dirname(ast_path))
+
+        if compress:
+            with gzip.open(ast_path + ctu_manager.AST_COMPRESSED_SUFFIX,
+                           'wb') as ast:
+                ast.write(content)
+        else:
+            with open(ast_path, 'wb') as ast:
+                ast.write(content)
+
+    def __write_global_map(self, lines):
+        with open(os.path.join(self.__ctu_dir, 'x86_64',
+                               ctu_manager.CTU_FUNC_MAP_FILE), 'w') as fn_map:
+            fn_map.writelines(line + '\n' for line in lines)
+
+    def test_link(self):
+        """
+        The AST dumps of the sources are links to the stored AST dumps.
+        """
+        self.assertIsNone(ctu_manager.find_ast(self.__ctu_dir, 'x86_64',
+                                               'key1'))
+        self.__store_ast('key1', 'AST 1')
+        self.__store_ast('key2', 'AST 2', True)
+
+        ctu_manager.link_ast(self.__ctu_dir, 'x86_64', '/src/a.cpp', 'key1')
+        ast_path = ctu_manager.get_ast_path(self.__ctu_dir, 'x86_64',
+                                            '/src/a.cpp')
+        with open(ast_path) as ast:
+            self.assertEqual(ast.read(), 'AST 1')
+
+        # The link is replaced by the AST dump of another configuration.
+        ctu_manager.link_ast(self.__ctu_dir, 'x86_64', '/src/a.cpp', 'key2')
+        self.assertEqual(os.path.realpath(ast_path),
+                         ctu_manager.find_ast(self.__ctu_dir, 'x86_64',
+                                              'key2'))
+
+    def test_analysis_dir(self):
+        """
+        The compressed AST dumps are decompressed into a scratch directory
+        for the analysis.
+        """
+        self.__store_ast('key1', 'AST 1')
+        ctu_manager.link_ast(self.__ctu_dir, 'x86_64', '/src/a.cpp', 'key1')
+        self.__write_global_map(['_Z1av ast/src/a.cpp.ast'])
+
+        self.assertIsNone(ctu_manager.prepare_analysis_dir(self.__ctu_dir))
+
+        self.__store_ast('key2', 'AST 2', True)
+        ctu_manager.link_ast(self.__ctu_dir, 'x86_64', '/src/b.cpp', 'key2')
+        self.__write_global_map(['_Z1av ast/src/a.cpp.ast',
+                                 '_Z1bv ast/src/b.cpp.ast'])
+
+        scratch_dir = ctu_manager.prepare_analysis_dir(self.__ctu_dir)
+        self.assertEqual(os.path.dirname(scratch_dir), self.__output_dir)
+        try:
+            for ast_file, content in [('ast/src/a.cpp.ast', 'AST 1'),
+                                      ('ast/src/b.cpp.ast', 'AST 2')]:
+                with open(os.path.join(scratch_dir, 'x86_64',
+                                       ast_file)) as ast:
+                    self.assertEqual(ast.read(), content)
+            self.assertTrue(os.path.isfile(os.path.join(
+                scratch_dir, 'x86_64', ctu_manager.CTU_FUNC_MAP_FILE)))
+        finally:
+            shutil.rmtree(scratch_dir)
+
+    def test_analysis_dir_uncompressed(self):
+        """
+        The global function maps are not read if no AST dump is compressed.
+        """
+        self.__store_ast('key1', 'AST 1')
+        ctu_manager.link_ast(self.__ctu_dir, 'x86_64', '/src/a.cpp', 'key1')
+        # A map which could not be parsed.
+        self.__write_global_map(['_Z1av'])
+
+        self.assertIsNone(ctu_manager.prepare_analysis_dir(self.__ctu_dir))
+
+    def test_remove_unused(self):
+        """
+        The stored AST dumps of the removed and of the changed translation
+        units are removed after an incremental collection.
+        """
+        def entry(source):
+            return {'fingerprint': source, 'triple_arch': 'x86_64',
+                    'source': source}
+
+        for ast_key in ['key1', 'key2', 'key3']:
+            self.__store_ast(ast_key, ast_key)
+        ctu_manager.link_ast(self.__ctu_dir, 'x86_64', '/src/a.cpp', 'key1')
+        ctu_manager.link_ast(self.__ctu_dir, 'x86_64', '/src/b.cpp', 'key2')
+        ctu_manager.link_ast(self.__ctu_dir, 'x86_64', '/src/a.cpp', 'key3')
+
+        ctu_manager.update_ctu_func_maps(
+            self.__ctu_dir, ctu_manager.CTU_FUNC_MAP_FILE,
+            {'tu1': entry('/src/a.cpp'), 'tu2': entry('/src/b.cpp')},
+            [('tu1', entry('/src/a.cpp'), True)])
+
+        self.assertIsNone(ctu_manager.find_ast(self.__ctu_dir, 'x86_64',
+                                               'key1'))
+        self.assertIsNone(ctu_manager.find_ast(self.__ctu_dir, 'x86_64',
+                                               'key2'))
+        self.assertIsNotNone(ctu_manager.find_ast(self.__ctu_dir, 'x86_64',
+                                                  'key3'))
+        self.assertFalse(os.path.lexists(ctu_manager.get_ast_path(
+            self.__ctu_dir, 'x86_64', '/src/b.cpp')))
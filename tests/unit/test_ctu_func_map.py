@@ -0,0 +1,140 @@
+# -----------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -----------------------------------------------------------------------------
+
+""" Unit tests for building the global CTU function map. """
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from libcodechecker.analyze import ctu_manager
+
+
+class CtuFuncMapTest(unittest.TestCase):
+    """
+    Test the merging of the function maps of the translation units.
+    """
+
+    def setUp(self):
+        self.__ctu_dir = tempfile.mkdtemp()
+        self.__fnmap_dir = os.path.join(self.__ctu_dir, 'x86_64', 'tmp')
+        os.makedirs(self.__fnmap_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.__ctu_dir)
+
+    def __write_func_map(self, name, lines):
+        with open(os.path.join(self.__fnmap_dir, name), 'w') as fnmap:
+            fnmap.write('\n'.join(lines) + '\n')
+
+    def test_external_sort(self):
+        """
+        The lines are sorted even if they do not fit into one chunk.
+        """
+        lines = ['c:@F@f%d ast/f%d.ast\n' % (i, i) for i in range(100)]
+        sort_dir = tempfile.mkdtemp(dir=self.__ctu_dir)
+
+        sorted_lines = ctu_manager.sort_func_map_lines(reversed(lines),
+                                                       sort_dir, 7)
+        self.assertEqual(list(sorted_lines), sorted(lines))
+
+    def test_merge(self):
+        """
+        The conflicting names are left out of the global map, the others
+        can be looked up in it.
+        """
+        self.__write_func_map('tu1', ['_Z3foov ast/a.cpp.ast',
+                                      '_Z3barv ast/a.cpp.ast',
+                                      '_Z6commonv ast/a.cpp.ast'])
+        self.__write_func_map('tu2', ['_Z3bazv ast/b.cpp.ast',
+                                      '_Z3barv ast/b.cpp.ast',
+                                      '_Z6commonv ast/a.cpp.ast',
+                                      '_Z3foo1v ast/b.cpp.ast'])
+
+        ctu_manager.merge_ctu_func_maps(self.__ctu_dir, 'externalFnMap.txt',
+                                        'tmp')
+
+        self.assertFalse(os.path.exists(self.__fnmap_dir))
+
+        fn_map_file = os.path.join(self.__ctu_dir, 'x86_64',
+                                   'externalFnMap.txt')
+        with open(fn_map_file) as fn_map:
+            self.assertEqual(fn_map.read().splitlines(),
+                             ['_Z3bazv ast/b.cpp.ast',
+                              '_Z3foo1v ast/b.cpp.ast',
+                              '_Z3foov ast/a.cpp.ast',
+                              '_Z6commonv ast/a.cpp.ast'])
+
+        lookup = ctu_manager.lookup_global_map
+        self.assertEqual(lookup(fn_map_file, '_Z3bazv'), 'ast/b.cpp.ast')
+        self.assertEqual(lookup(fn_map_file, '_Z3foov'), 'ast/a.cpp.ast')
+        self.assertEqual(lookup(fn_map_file, '_Z3foo1v'), 'ast/b.cpp.ast')
+        self.assertEqual(lookup(fn_map_file, '_Z6commonv'), 'ast/a.cpp.ast')
+        self.assertIsNone(lookup(fn_map_file, '_Z3barv'))
+        self.assertIsNone(lookup(fn_map_file, '_Z1av'))
+        self.assertIsNone(lookup(fn_map_file, '_Z9zzzv'))
+
+    def __write_tu_func_map(self, tu_key, lines):
+        fnmap_dir = os.path.join(self.__ctu_dir, 'x86_64',
+                                 ctu_manager.FUNC_MAP_FOLDER)
+        if not os.path.isdir(fnmap_dir):
+            os.makedirs(fnmap_dir)
+        with open(os.path.join(fnmap_dir, tu_key), 'w') as fnmap:
+            fnmap.writelines(line + '\n' for line in lines)
+
+    def __read_global_map(self):
+        fn_map_file = os.path.join(self.__ctu_dir, 'x86_64',
+                                   'externalFnMap.txt')
+        with open(fn_map_file) as fn_map:
+            return fn_map.read().splitlines()
+
+    def test_incremental_update(self):
+        """
+        The global map is updated with the function maps of the changed
+        translation units, and the removed ones are left out of it.
+        """
+        def entry(source):
+            return {'fingerprint': source, 'triple_arch': 'x86_64',
+                    'source': '/src/' + source}
+
+        self.__write_tu_func_map('tu1', ['_Z3foov ast/src/a.cpp.ast',
+                                         '_Z6commonv ast/src/a.cpp.ast'])
+        self.__write_tu_func_map('tu2', ['_Z3barv ast/src/b.cpp.ast'])
+        self.__write_tu_func_map('tu3', ['_Z6commonv ast/src/c.cpp.ast'])
+
+        fingerprints = ctu_manager.update_ctu_func_maps(
+            self.__ctu_dir, 'externalFnMap.txt', {},
+            [('tu1', entry('a.cpp'), True),
+             ('tu2', entry('b.cpp'), True),
+             ('tu3', entry('c.cpp'), True)])
+        self.assertEqual(self.__read_global_map(),
+                         ['_Z3barv ast/src/b.cpp.ast',
+                          '_Z3foov ast/src/a.cpp.ast'])
+
+        # The function map of the unchanged translation unit is not read
+        # again, its lines are kept from the previous collection.
+        self.__write_tu_func_map('tu2', ['_Z3bazv ast/src/b.cpp.ast'])
+        self.__write_tu_func_map('tu1', ['_Z3foov ast/src/a.cpp.ast',
+                                         '_Z4foo2v ast/src/a.cpp.ast'])
+
+        fingerprints = ctu_manager.update_ctu_func_maps(
+            self.__ctu_dir, 'externalFnMap.txt', fingerprints,
+            [('tu1', entry('a.cpp'), True),
+             ('tu2', entry('b.cpp'), False)])
+        self.assertEqual(self.__read_global_map(),
+                         ['_Z3barv ast/src/b.cpp.ast',
+                          '_Z3foov ast/src/a.cpp.ast',
+                          '_Z4foo2v ast/src/a.cpp.ast'])
+        self.assertEqual(sorted(fingerprints), ['tu1', 'tu2'])
+        self.assertFalse(os.path.exists(os.path.join(
+            self.__ctu_dir, 'x86_64', ctu_manager.FUNC_MAP_FOLDER, 'tu3')))
+
+        fn_map_file = os.path.join(self.__ctu_dir, 'x86_64',
+                                   'externalFnMap.txt')
+        self.assertEqual(ctu_manager.lookup_global_map(fn_map_file,
+                                                       '_Z4foo2v'),
+                         'ast/src/a.cpp.ast')
@@ -0,0 +1,166 @@
+# -----------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -----------------------------------------------------------------------------
+
+""" Unit tests for the failure archives of the analysis. """
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import zipfile
+
+from libcodechecker.analyze import analysis_manager
+from libcodechecker.analyze import blob_store
+from libcodechecker.analyze.blob_store import BlobStore
+
+
+class Action(object):
+    def __init__(self, original_command):
+        self.original_command = original_command
+
+
+class FailureArchiveTest(unittest.TestCase):
+    """
+    Test the failure archives written from the blob store.
+    """
+
+    def setUp(self):
+        self.__tmp_dir = tempfile.mkdtemp()
+        self.__blobs = BlobStore(os.path.join(self.__tmp_dir, 'blobs'))
+
+        self.__header = os.path.join(self.__tmp_dir, 'header.h')
+        with open(self.__header, 'w') as header:
+            header.write('int f(void);\n' * 1000)
+
+    def tearDown(self):
+        shutil.rmtree(self.__tmp_dir)
+
+    def __write_archive(self, name, source, dependencies=None):
+        zip_file = os.path.join(self.__tmp_dir, 'failed', name + '.zip')
+        # The dependencies can not be generated with this command, so only
+        # the files mentioned by the analyzer and the given dependencies are
+        # archived.
+        analysis_manager.write_failure_archive(
+            {'zip_file': zip_file,
+             'action': Action('unknown_compiler -c ' + source),
+             'stdout': '',
+             'stderr': source + ':1:1: error',
+             'other_files': set([source, self.__header]),
+             'analyzer_command': 'clang --analyze ' + source,
+             'return_code': 1,
+             'dependencies': dependencies},
+            self.__blobs)
+        return zip_file
+
+    def test_archive(self):
+        """
+        The archives contain the sources, which are stored only once in the
+        blob store.
+        """
+        sources = []
+        for name in ['a.c', 'b.c']:
+            source = os.path.join(self.__tmp_dir, name)
+            with open(source, 'w') as source_file:
+                source_file.write('#include "header.h"\n// ' + name + '\n')
+            sources.append(source)
+
+        zip_files = [self.__write_archive(os.path.basename(source), source)
+                     for source in sources]
+
+        for zip_file, source in zip(zip_files, sources):
+            with zipfile.ZipFile(zip_file, 'r') as archive:
+                self.assertIsNone(archive.testzip())
+                self.assertEqual(archive.read('stderr'),
+                                 source + ':1:1: error')
+                self.assertEqual(archive.read('return-code'), '1')
+                self.assertIn('no-sources', archive.namelist())
+
+                for dependency in [source, self.__header]:
+                    with open(dependency) as content:
+                        self.assertEqual(
+                            archive.read(os.path.join(
+                                'sources-root', dependency.lstrip('/'))),
+                            content.read())
+
+        # Two sources and the common header.
+        blob_count = sum(len(files) for _, _, files in
+                         os.walk(os.path.join(self.__tmp_dir, 'blobs')))
+        self.assertEqual(blob_count, 3)
+
+    def test_zipfile_interface(self):
+        """
+        The blobs are written by the public interface of the zipfile module
+        if the compressed data can not be copied into the archive as it is.
+        """
+        source = os.path.join(self.__tmp_dir, 'a.c')
+        with open(source, 'w') as source_file:
+            source_file.write('#include "header.h"\n')
+
+        raw_entries = blob_store.RAW_ENTRIES
+        blob_store.RAW_ENTRIES = False
+        try:
+            zip_file = self.__write_archive('a.c', source)
+        finally:
+            blob_store.RAW_ENTRIES = raw_entries
+
+        with zipfile.ZipFile(zip_file, 'r') as archive:
+            self.assertIsNone(archive.testzip())
+            for dependency in [source, self.__header]:
+                arcname = os.path.join('sources-root', dependency.lstrip('/'))
+                self.assertEqual(archive.getinfo(arcname).compress_type,
+                                 zipfile.ZIP_DEFLATED)
+                with open(dependency) as content:
+                    self.assertEqual(archive.read(arcname), content.read())
+
+    def test_missing_file(self):
+        """
+        The files which can not be archived are noted in the archive.
+        """
+        missing = os.path.join(self.__tmp_dir, 'missing.c')
+        zip_file = self.__write_archive('missing.c', missing)
+
+        with zipfile.ZipFile(zip_file, 'r') as archive:
+            self.assertIn(os.path.join('failed-sources-root',
+                                       missing.lstrip('/')),
+                          archive.namelist())
+
+    def test_known_dependencies(self):
+        """
+        The dependencies computed by the analysis are archived without
+        generating them again.
+        """
+        source = os.path.join(self.__tmp_dir, 'a.c')
+        with open(source, 'w') as source_file:
+            source_file.write('#include "header.h"\n')
+
+        zip_file = self.__write_archive('a.c', source, [self.__header])
+        with zipfile.ZipFile(zip_file, 'r') as archive:
+            self.assertNotIn('no-sources', archive.namelist())
+            self.assertIn(os.path.join('sources-root',
+                                       self.__header.lstrip('/')),
+                          archive.namelist())
+
+    def test_remove_unused(self):
+        """
+        The blobs which were not used since the given time are removed.
+        """
+        source = os.path.join(self.__tmp_dir, 'a.c')
+        with open(source, 'w') as source_file:
+            source_file.write('int main() {}\n')
+
+        old_blob = self.__blobs.put(source)
+        header_blob = self.__blobs.put(self.__header)
+        os.utime(old_blob, (0, 0))
+        os.utime(header_blob, (0, 0))
+
+        # The header is used again, so its blob is kept.
+        since = time.time() - 1
+        self.__blobs.put(self.__header)
+        self.__blobs.remove_unused(since)
+
+        self.assertFalse(os.path.exists(old_blob))
+        self.assertTrue(os.path.exists(header_blob))
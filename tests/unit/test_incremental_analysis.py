@@ -0,0 +1,248 @@
+# -----------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -----------------------------------------------------------------------------
+
+""" Unit tests for the incremental analysis. """
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+import unittest
+
+from libcodechecker.analyze import analysis_manager
+from libcodechecker.analyze.analyzers import analyzer_types
+from libcodechecker.log.build_action import BuildAction
+
+
+class Context(object):
+    path_env_extra = []
+    ld_lib_path_extra = []
+    severity_map = {}
+
+
+class ResultHandler(object):
+    """
+    Result handler writing the results next to the source file.
+    """
+
+    streams_stdout = False
+
+    def __init__(self, action, output_dir):
+        self.buildaction = action
+        self.output_dir = output_dir
+        self.analyzed_source_file = None
+        self.analyzer_cmd = []
+        self.analyzer_returncode = 1
+        self.analyzer_stdout = ''
+        self.analyzer_stderr = ''
+
+    @property
+    def analyzer_result_file(self):
+        return os.path.join(self.output_dir, os.path.basename(
+            self.analyzed_source_file) + '.plist')
+
+    def postprocess_result(self):
+        pass
+
+
+class Analyzer(object):
+    """
+    Analyzer writing the test plist file as the result.
+    """
+
+    runs = 0
+
+    def __init__(self, action, plist_file):
+        self.action = action
+        self.plist_file = plist_file
+        self.source_file = None
+
+    def construct_analyzer_cmd(self, result_handler):
+        return ['clang', '--analyze', self.source_file,
+                '-o', result_handler.analyzer_result_file]
+
+    def analyze(self, result_handler, env=None):
+        Analyzer.runs += 1
+        shutil.copy(self.plist_file, result_handler.analyzer_result_file)
+        result_handler.analyzer_cmd = \
+            self.construct_analyzer_cmd(result_handler)
+        result_handler.analyzer_returncode = 0
+        return result_handler
+
+
+class IncrementalAnalysisTest(unittest.TestCase):
+    """
+    Test the fingerprints of the analyses and the reuse of the results of
+    the unchanged translation units.
+    """
+
+    def setUp(self):
+        self.__tmp_dir = tempfile.mkdtemp()
+        self.__output_dir = os.path.join(self.__tmp_dir, 'reports')
+        os.makedirs(self.__output_dir)
+
+        self.__source = os.path.join(self.__tmp_dir, 'main.cpp')
+        with open(self.__source, 'w') as source:
+            source.write('#include "main.h"\nint main() { return f(); }\n')
+
+        self.__header = os.path.join(self.__tmp_dir, 'main.h')
+        with open(self.__header, 'w') as header:
+            header.write('int f();\n')
+
+        self.__action = BuildAction()
+        self.__action.analyzer_type = 'clangsa'
+        self.__action.original_command = 'g++ -c ' + self.__source
+        self.__action.sources = self.__source
+
+        plist_file = os.path.join(os.path.dirname(__file__),
+                                  'plist_test_files', 'clang-4.0.plist')
+
+        self.__patched = [
+            (analysis_manager, 'create_dependencies',
+             analysis_manager.create_dependencies),
+            (analyzer_types, 'construct_analyzer',
+             analyzer_types.construct_analyzer),
+            (analyzer_types, 'construct_analyze_handler',
+             analyzer_types.construct_analyze_handler)]
+
+        analysis_manager.create_dependencies = \
+            lambda action: [self.__source, self.__header]
+        analyzer_types.construct_analyzer = \
+            lambda action, config_map: Analyzer(action, plist_file)
+        analyzer_types.construct_analyze_handler = \
+            lambda action, output_dir, severity_map, skip_handler: \
+            ResultHandler(action, output_dir)
+
+        analysis_manager.file_hash_cache.clear()
+        Analyzer.runs = 0
+
+    def tearDown(self):
+        for module, name, value in self.__patched:
+            setattr(module, name, value)
+        analysis_manager.init_worker(None, None)
+        shutil.rmtree(self.__tmp_dir)
+
+    def __analyze(self, metadata, config_hash='config'):
+        """
+        Analyze the build action with the fingerprints of the metadata, and
+        collect the result into the metadata. Returns whether the action
+        was analyzed again and whether its previous result was reused.
+        """
+        analysis_manager.init_worker(multiprocessing.Value('i', 1),
+                                     multiprocessing.Value('i', 1),
+                                     metadata['fingerprints'],
+                                     config_hash)
+
+        result = analysis_manager.check((self.__action, Context(), {},
+                                         self.__output_dir, None, True,
+                                         False))
+        analysis_manager.WorkerResultHandler(metadata, 1).handle(result)
+
+        _, _, reanalyzed, _, _, reused, _, _, _ = result
+        return reanalyzed, reused
+
+    def __modify(self, path, content):
+        # The cached hashes are used while the size and the modification
+        # time are unchanged, so the size is changed too.
+        with open(path, 'a') as modified:
+            modified.write(content)
+
+    def test_fingerprint(self):
+        """
+        The fingerprint changes with the analyzer command, the configuration
+        and the content of the dependencies.
+        """
+        analysis_manager.init_worker(None, None, {}, 'config')
+        command = ['clang', '--analyze', self.__source]
+        dependencies = [self.__source, self.__header]
+
+        fingerprint = analysis_manager.get_analysis_fingerprint(
+            command, dependencies)
+        self.assertEqual(analysis_manager.get_analysis_fingerprint(
+            command, list(reversed(dependencies))), fingerprint)
+
+        self.assertNotEqual(analysis_manager.get_analysis_fingerprint(
+            command + ['-DNDEBUG'], dependencies), fingerprint)
+
+        analysis_manager.init_worker(None, None, {}, 'other config')
+        self.assertNotEqual(analysis_manager.get_analysis_fingerprint(
+            command, dependencies), fingerprint)
+
+        analysis_manager.init_worker(None, None, {}, 'config')
+        self.__modify(self.__header, 'int g();\n')
+        self.assertNotEqual(analysis_manager.get_analysis_fingerprint(
+            command, dependencies), fingerprint)
+
+    def test_unchanged_reused(self):
+        """
+        The result of an unchanged translation unit is reused, and its
+        source file is kept in the metadata.
+        """
+        metadata = {'result_source_files': {}, 'fingerprints': {}}
+        result_file = os.path.join(self.__output_dir, 'main.cpp.plist')
+
+        _, reused = self.__analyze(metadata)
+        self.assertEqual(Analyzer.runs, 1)
+        self.assertFalse(reused)
+        self.assertIn(result_file, metadata['fingerprints'])
+        self.assertEqual(metadata['result_source_files'],
+                         {result_file: self.__source})
+
+        fingerprint = metadata['fingerprints'][result_file]
+        metadata['result_source_files'] = {}
+
+        _, reused = self.__analyze(metadata)
+        self.assertEqual(Analyzer.runs, 1)
+        self.assertTrue(reused)
+        self.assertEqual(metadata['fingerprints'],
+                         {result_file: fingerprint})
+        self.assertEqual(metadata['result_source_files'],
+                         {result_file: self.__source})
+
+    def test_changed_analyzed(self):
+        """
+        The translation unit is analyzed again if its header, the
+        configuration or its previous result changes.
+        """
+        metadata = {'result_source_files': {}, 'fingerprints': {}}
+        result_file = os.path.join(self.__output_dir, 'main.cpp.plist')
+
+        self.__analyze(metadata)
+        fingerprint = metadata['fingerprints'][result_file]
+
+        self.__modify(self.__header, 'int g();\n')
+        reanalyzed, reused = self.__analyze(metadata)
+        self.assertEqual(Analyzer.runs, 2)
+        self.assertFalse(reused)
+        self.assertTrue(reanalyzed)
+        self.assertNotEqual(metadata['fingerprints'][result_file],
+                            fingerprint)
+
+        self.__analyze(metadata, 'other config')
+        self.assertEqual(Analyzer.runs, 3)
+
+        os.remove(result_file)
+        self.__analyze(metadata, 'other config')
+        self.assertEqual(Analyzer.runs, 4)
+
+        self.__analyze(metadata, 'other config')
+        self.assertEqual(Analyzer.runs, 4)
+
+    def test_no_dependencies(self):
+        """
+        The translation unit is analyzed if its dependencies can not be
+        computed, and no fingerprint is stored for it.
+        """
+        def create_dependencies(action):
+            raise IOError("Failed to generate dependency list.")
+        analysis_manager.create_dependencies = create_dependencies
+
+        metadata = {'result_source_files': {}, 'fingerprints': {}}
+        self.__analyze(metadata)
+        self.__analyze(metadata)
+
+        self.assertEqual(Analyzer.runs, 2)
+        self.assertEqual(metadata['fingerprints'], {})
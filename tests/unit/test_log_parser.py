@@ -6,6 +6,8 @@
 
 """ Test the log parser which builds build actions from JSON CCDBs. """
 
+from StringIO import StringIO
+import json
 import os
 import unittest
 
@@ -137,3 +139,45 @@ class LogParserTest(unittest.TestCase):
 
         self.assertEqual(list(build_action.sources)[0], r'/tmp/a b.cpp')
         self.assertEqual(build_action.lang, 'c++')
+
+    def test_streaming_json_array(self):
+        """
+        Test that the elements of a JSON array are decoded one by one even if
+        they are split between the chunks read from the file.
+        """
+        data = [{'directory': '/tmp', 'file': u'/tmp/\xe1.cpp',
+                 'command': 'g++ -c "a, b" /tmp/a.cpp'},
+                {'directory': '/tmp', 'file': '/tmp/b.cpp',
+                 'arguments': ['g++', '-c', '/tmp/b.cpp']},
+                []]
+
+        for chunk_size in [1, 7, 1024]:
+            stream = StringIO(' [\n' + ',\n'.join(json.dumps(element)
+                                                  for element in data) +
+                              '\n] ')
+            self.assertEqual(
+                list(log_parser.iter_json_array(stream, chunk_size)), data)
+
+        self.assertEqual(
+            list(log_parser.iter_json_array(StringIO('[]'))), [])
+
+        with self.assertRaises(ValueError):
+            list(log_parser.iter_json_array(StringIO('[{"a": 1}, {"b"')))
+
+        with self.assertRaises(ValueError):
+            list(log_parser.iter_json_array(StringIO('{"a": 1}')))
+
+    def test_duplicate_actions(self):
+        """
+        Test that the same compilation command is analyzed only once.
+        """
+        command = {'directory': '/tmp', 'file': '/tmp/a.cpp',
+                   'command': 'g++ -DX -c /tmp/a.cpp'}
+        other = {'directory': '/tmp', 'file': '/tmp/a.cpp',
+                 'command': 'g++ -DY -c /tmp/a.cpp'}
+
+        stream = StringIO(json.dumps([command, other, command]))
+        actions = log_parser.parse_compile_commands_json(stream)
+
+        self.assertEqual([action.original_command for action in actions],
+                         [command['command'], other['command']])
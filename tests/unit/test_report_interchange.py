@@ -0,0 +1,97 @@
+# -----------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -----------------------------------------------------------------------------
+
+"""
+Test the pre-parsed report interchange format.
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from libcodechecker.analyze import plist_parser
+from libcodechecker.analyze import report_interchange
+
+
+class ReportInterchangeTestCaseNose(unittest.TestCase):
+    """Test writing and reading back the parsed reports of plist files."""
+
+    @classmethod
+    def setup_class(cls):
+        """Initialize the test plist files."""
+        cls.__this_dir = os.path.dirname(__file__)
+        cls.__plist_test_files = os.path.join(
+            cls.__this_dir, 'plist_test_files')
+
+    def setUp(self):
+        self.__tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.__tmp_dir)
+
+    def __copy_plist(self, name):
+        plist_file = os.path.join(self.__tmp_dir, name)
+        shutil.copy(os.path.join(self.__plist_test_files, name), plist_file)
+        return plist_file
+
+    def test_round_trip(self):
+        """The reports read back are the same as the parsed ones."""
+        plist_file = self.__copy_plist('clang-5.0-trunk.plist')
+        files, reports = plist_parser.parse_plist(plist_file)
+
+        report_interchange.write_from_plist(plist_file)
+        self.assertTrue(report_interchange.is_up_to_date(plist_file))
+
+        interchange_file = report_interchange.get_interchange_file(plist_file)
+        self.assertEqual(report_interchange.read_files(interchange_file),
+                         files)
+
+        read_files, read_reports = report_interchange.read(interchange_file)
+        self.assertEqual(read_files, files)
+        self.assertEqual(len(read_reports), len(reports))
+        for read_report, report in zip(read_reports, reports):
+            self.assertEqual(read_report.main, report.main)
+            self.assertEqual(read_report.bug_path, report.bug_path)
+
+    def test_generated_hash_is_kept(self):
+        """Report hashes generated by CodeChecker are stored."""
+        plist_file = self.__copy_plist('clang-3.7.plist')
+        _, reports = plist_parser.parse_plist(plist_file)
+
+        report_interchange.write_from_plist(plist_file)
+        _, read_reports = report_interchange.load(plist_file)
+
+        self.assertEqual(
+            [r.main['issue_hash_content_of_line_in_context']
+             for r in read_reports],
+            [r.main['issue_hash_content_of_line_in_context']
+             for r in reports])
+
+    def test_outdated_interchange_file(self):
+        """The plist is parsed if it was modified after the interchange."""
+        plist_file = self.__copy_plist('clang-4.0.plist')
+        report_interchange.write_from_plist(plist_file)
+
+        # Overwrite the interchange file with an empty report list.
+        interchange_file = report_interchange.get_interchange_file(plist_file)
+        report_interchange.write(interchange_file, [], [])
+        _, reports = report_interchange.load(plist_file)
+        self.assertEqual(reports, [])
+
+        mtime = time.time() + 10
+        os.utime(plist_file, (mtime, mtime))
+        self.assertFalse(report_interchange.is_up_to_date(plist_file))
+
+        _, reports = report_interchange.load(plist_file)
+        self.assertEqual(len(reports), 3)
+
+    def test_empty_plist(self):
+        """No interchange file is written for an invalid plist."""
+        plist_file = self.__copy_plist('empty_file')
+        report_interchange.write_from_plist(plist_file)
+        self.assertFalse(report_interchange.is_up_to_date(plist_file))
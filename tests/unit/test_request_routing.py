@@ -8,6 +8,7 @@
 
 import unittest
 
+from libcodechecker.server.routing import get_request_protocol
 from libcodechecker.server.routing import split_client_GET_request
 from libcodechecker.server.routing import split_client_POST_request
 
@@ -62,3 +63,29 @@ class request_routingTest(unittest.TestCase):
 
         self.assertEqual(POST('/DummyProduct/v0.0/FoobarService'),
                          ('DummyProduct', '0.0', 'FoobarService'))
+
+    def testProtocol(self):
+        """
+        Test if the server selects the requested Thrift protocol.
+        """
+
+        self.assertEqual(get_request_protocol('/v6.2/Authentication',
+                                              'application/x-thrift'),
+                         'json')
+        self.assertEqual(get_request_protocol('/v6.2/Authentication', None),
+                         'json')
+
+        self.assertEqual(get_request_protocol(
+            '/Default/v6.2/CodeCheckerService?protocol=binary',
+            'application/x-thrift'), 'binary')
+        self.assertEqual(get_request_protocol(
+            '/Default/v6.2/CodeCheckerService?protocol=invalid',
+            'application/x-thrift'), 'json')
+
+        self.assertEqual(get_request_protocol(
+            '/Default/v6.2/CodeCheckerService',
+            'application/vnd.apache.thrift.compact; charset=utf-8'),
+            'compact')
+        self.assertEqual(get_request_protocol(
+            '/Default/v6.2/CodeCheckerService?protocol=binary',
+            'application/vnd.apache.thrift.json'), 'json')
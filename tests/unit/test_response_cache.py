@@ -0,0 +1,101 @@
+# -----------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -----------------------------------------------------------------------------
+
+""" Unit tests for the response cache of the server. """
+
+import unittest
+
+from libcodechecker.server.response_cache import ResponseCache
+
+
+class ResponseCacheTest(unittest.TestCase):
+    """
+    Testing the cache of the responses of the read-only API calls.
+    """
+
+    def setUp(self):
+        self.__calls = 0
+
+    def __compute(self):
+        self.__calls += 1
+        return 'response ' + str(self.__calls)
+
+    def test_cached(self):
+        """
+        The response is computed only once for the same arguments.
+        """
+        cache = ResponseCache('test')
+        self.assertEqual(cache.get('getRunData', (None,), self.__compute),
+                         'response 1')
+        self.assertEqual(cache.get('getRunData', (None,), self.__compute),
+                         'response 1')
+        self.assertEqual(cache.get('getRunData', ([1],), self.__compute),
+                         'response 2')
+        self.assertEqual(cache.get('getRunResults', (None,), self.__compute),
+                         'response 3')
+
+        statistics = cache.statistics()
+        self.assertEqual(statistics['hits'], 1)
+        self.assertEqual(statistics['misses'], 3)
+        self.assertEqual(statistics['hit_rate'], 0.25)
+        self.assertEqual(statistics['entries'], 3)
+
+    def test_invalidate(self):
+        """
+        The responses are computed again after the data changed.
+        """
+        cache = ResponseCache('test')
+        cache.get('getRunData', (None,), self.__compute)
+        cache.invalidate()
+
+        self.assertEqual(cache.generation, 1)
+        self.assertEqual(cache.get('getRunData', (None,), self.__compute),
+                         'response 2')
+        self.assertEqual(cache.statistics()['entries'], 1)
+
+    def test_size_limit(self):
+        """
+        The least recently used responses are evicted when the cached
+        responses exceed the size limit.
+        """
+        cache = ResponseCache('test', 250)
+
+        def compute():
+            self.__calls += 1
+            return 'x' * 100
+
+        cache.get('a', (), compute)
+        cache.get('b', (), compute)
+        cache.get('a', (), compute)
+        cache.get('c', (), compute)
+
+        # The response of 'b' was evicted, the others are still cached.
+        self.assertEqual(cache.statistics()['entries'], 2)
+        cache.get('a', (), compute)
+        cache.get('c', (), compute)
+        self.assertEqual(self.__calls, 3)
+        cache.get('b', (), compute)
+        self.assertEqual(self.__calls, 4)
+
+        # Too big responses are not cached at all.
+        cache.get('d', (), lambda: 'x' * 1000)
+        self.assertEqual(cache.statistics()['entries'], 2)
+
+    def test_failure_not_cached(self):
+        """
+        The failed computations are not cached, the response is computed
+        again on the next call.
+        """
+        cache = ResponseCache('test')
+
+        def fail():
+            raise RuntimeError('database error')
+
+        self.assertRaises(RuntimeError, cache.get, 'getRunData', (None,),
+                          fail)
+        self.assertEqual(cache.statistics()['entries'], 0)
+        self.assertEqual(cache.get('getRunData', (None,), self.__compute),
+                         'response 1')
@@ -0,0 +1,82 @@
+# -----------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -----------------------------------------------------------------------------
+
+""" Unit tests for the session store of the server. """
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from libcodechecker import session_manager
+from libcodechecker.session_manager import SessionManager
+
+
+class SessionManagerTest(unittest.TestCase):
+    """
+    Testing the lookup and the expiry of the privileged sessions.
+    """
+
+    def setUp(self):
+        self.__tmp_dir = tempfile.mkdtemp()
+
+        session_cfg = {'authentication': {
+            'enabled': True,
+            'soft_expire': 60,
+            'session_lifetime': 300,
+            'method_dictionary': {'enabled': True,
+                                  'auths': ['cc:test', 'john:doe']}}}
+
+        session_cfg_file = os.path.join(self.__tmp_dir, 'session_config.json')
+        with open(session_cfg_file, 'w') as cfg_file:
+            json.dump(session_cfg, cfg_file)
+        os.chmod(session_cfg_file, 0o600)
+
+        SessionManager.CodeChecker_Workspace = self.__tmp_dir
+        self.__manager = SessionManager(None)
+
+    def tearDown(self):
+        shutil.rmtree(self.__tmp_dir)
+
+    def test_lookup(self):
+        """
+        The sessions are found by their token and reused by their
+        credentials.
+        """
+        session = self.__manager.create_or_get_session('cc:test')
+        self.assertIsNotNone(session)
+        self.assertIsNone(self.__manager.create_or_get_session('cc:bad'))
+
+        self.assertIs(self.__manager.create_or_get_session('cc:test'),
+                      session)
+        self.assertIsNot(self.__manager.create_or_get_session('john:doe'),
+                         session)
+
+        self.assertIs(self.__manager.get_session(session.token), session)
+        self.assertTrue(self.__manager.is_valid(session.token))
+        self.assertFalse(self.__manager.is_valid('unknown'))
+
+        self.assertTrue(self.__manager.invalidate(session.token))
+        self.assertFalse(self.__manager.invalidate(session.token))
+        self.assertIsNone(self.__manager.get_session(session.token))
+
+        new_session = self.__manager.create_or_get_session('cc:test')
+        self.assertNotEqual(new_session.token, session.token)
+
+    def test_expiry(self):
+        """
+        The sessions exceeding their hard lifetime are dropped at the next
+        login.
+        """
+        session_manager.session_lifetimes['hard'] = 0
+
+        expired = self.__manager.create_or_get_session('cc:test')
+        new_session = self.__manager.create_or_get_session('cc:test')
+
+        self.assertIsNot(new_session, expired)
+        self.assertFalse(self.__manager.invalidate(expired.token))
+        self.assertTrue(self.__manager.invalidate(new_session.token))
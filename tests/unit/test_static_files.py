@@ -0,0 +1,126 @@
+# -----------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -----------------------------------------------------------------------------
+
+""" Unit tests for the static files of the web viewer. """
+
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+from cStringIO import StringIO
+
+from libcodechecker.server import static_files
+from libcodechecker.server.static_files import StaticFiles
+
+
+class StaticFilesTest(unittest.TestCase):
+    """
+    Testing the index of the static files and the headers of their
+    responses.
+    """
+
+    def setUp(self):
+        self.__root = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.__root, 'scripts'))
+
+        self.__write('index.html', '<html></html>')
+        self.__write('scripts/main.js', 'var a = 1;\n' * 1000)
+        self.__write('images/logo.png', '\x89PNG' * 1000)
+        self.__write(static_files.VERSION_SCRIPT, 'var CC_VERSION = 6;\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.__root)
+
+    def __write(self, path, content, mtime=None):
+        path = os.path.join(self.__root, path)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'wb') as static_file:
+            static_file.write(content)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+
+    def test_gzip(self):
+        """
+        Only the large, compressible files are compressed and they are sent
+        compressed only if the browser accepts it.
+        """
+        files = StaticFiles(self.__root)
+
+        script = files.get('scripts/main.js')
+        self.assertIsNotNone(script.gzipped)
+        self.assertNotEqual(script.gzip_etag, script.etag)
+        self.assertEqual(
+            gzip.GzipFile(fileobj=StringIO(script.gzipped)).read(),
+            script.read())
+
+        self.assertIsNone(files.get('index.html').gzipped)
+        self.assertIsNone(files.get('images/logo.png').gzipped)
+
+        self.assertTrue(static_files.accepts_gzip('gzip, deflate'))
+        self.assertTrue(static_files.accepts_gzip('deflate;q=1, gzip;q=0.5'))
+        self.assertFalse(static_files.accepts_gzip('gzip;q=0'))
+        self.assertFalse(static_files.accepts_gzip('deflate, br'))
+        self.assertFalse(static_files.accepts_gzip(None))
+
+    def test_etag(self):
+        """
+        A request with the entity tag of the file is not modified, the
+        entity tag changes with the content of the file.
+        """
+        files = StaticFiles(self.__root)
+        etag = files.get('index.html').etag
+
+        self.assertTrue(static_files.matches_etag(etag, etag))
+        self.assertTrue(static_files.matches_etag('"x", W/' + etag, etag))
+        self.assertTrue(static_files.matches_etag('*', etag))
+        self.assertFalse(static_files.matches_etag('"x"', etag))
+        self.assertFalse(static_files.matches_etag(None, etag))
+
+        self.__write('index.html', '<html><body></body></html>')
+        self.assertNotEqual(files.get('index.html').etag, etag)
+        self.assertFalse(static_files.matches_etag(
+            etag, files.get('index.html').etag))
+
+    def test_cache_control(self):
+        """
+        The files requested with the current version are cached for long,
+        the others have to be revalidated.
+        """
+        files = StaticFiles(self.__root)
+
+        self.assertIn("CC_RESOURCE_VERSION = '{0}';".format(files.version),
+                      files.get(static_files.VERSION_SCRIPT).read())
+        self.assertEqual(files.get_cache_control(files.version),
+                         'public, max-age={0}'.format(
+                             static_files.VERSIONED_MAX_AGE))
+        self.assertEqual(files.get_cache_control(''), 'no-cache')
+        self.assertEqual(files.get_cache_control('0123456789abcdef'),
+                         'no-cache')
+
+    def test_version_of_changed_files(self):
+        """
+        The version changes when a changed or a new file is indexed, so they
+        are not served with the long max-age of the old version.
+        """
+        files = StaticFiles(self.__root)
+        version = files.version
+
+        self.__write('scripts/main.js', 'var b = 2;\n' * 1000, 0)
+        files.get('scripts/main.js')
+        self.assertNotEqual(files.version, version)
+        self.assertEqual(files.get_cache_control(version), 'no-cache')
+        self.assertIn("CC_RESOURCE_VERSION = '{0}';".format(files.version),
+                      files.get(static_files.VERSION_SCRIPT).read())
+
+        version = files.version
+        self.__write('scripts/new.js', 'var c = 3;\n')
+        files.get('scripts/new.js')
+        self.assertNotEqual(files.version, version)
+
+        # The version is the same as if the server was started now.
+        self.assertEqual(StaticFiles(self.__root).version, files.version)
@@ -0,0 +1,310 @@
+# -----------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -----------------------------------------------------------------------------
+
+"""
+Test the assembly of the mass store ZIP of the analysis results.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+import zlib
+
+from libcodechecker.analyze import report_interchange
+from libcodechecker.libclient import store_zip
+
+
+class Client(object):
+    """
+    Client of a server which has none of the source file contents.
+    """
+
+    def getMissingContentHashes(self, content_hashes):
+        return content_hashes
+
+
+class StoreZipTest(unittest.TestCase):
+    """
+    Test the parsing of the reports and the hashing of the source files in
+    one and in more processes.
+    """
+
+    @classmethod
+    def setup_class(cls):
+        """Initialize the test plist files."""
+        cls.__plist_test_files = os.path.join(os.path.dirname(__file__),
+                                              'plist_test_files')
+
+    def setUp(self):
+        self.__tmp_dir = tempfile.mkdtemp()
+        self.__report_dir = os.path.join(self.__tmp_dir, 'reports')
+        os.makedirs(self.__report_dir)
+
+        with open(os.path.join(self.__report_dir, 'metadata.json'),
+                  'w') as metadata:
+            json.dump({'name': 'test'}, metadata)
+
+    def tearDown(self):
+        shutil.rmtree(self.__tmp_dir)
+
+    def __add_report(self, name):
+        """
+        Write a plist file of the test plist files whose source files are in
+        a new source directory of the given name.
+        """
+        source_dir = os.path.join(self.__tmp_dir, name)
+        os.makedirs(source_dir)
+
+        sources = []
+        for source in ['test.cpp', 'test.h']:
+            source = os.path.join(source_dir, source)
+            with open(source, 'w') as source_file:
+                source_file.write('// ' + source + '\n')
+            sources.append(source)
+
+        with open(os.path.join(self.__plist_test_files,
+                               'clang-4.0.plist')) as plist:
+            content = plist.read() \
+                .replace('<string>test.cpp</string>',
+                         '<string>' + sources[0] + '</string>') \
+                .replace('<string>./test.h</string>',
+                         '<string>' + sources[1] + '</string>')
+
+        plist_file = os.path.join(self.__report_dir, name + '.plist')
+        with open(plist_file, 'w') as plist:
+            plist.write(content)
+
+        return plist_file, sources
+
+    def __read_zip(self, zip_file):
+        uncompressed_file = zip_file + '.unzipped'
+        with open(zip_file, 'rb') as compressed:
+            with open(uncompressed_file, 'wb') as uncompressed:
+                uncompressed.write(zlib.decompress(compressed.read()))
+
+        with zipfile.ZipFile(uncompressed_file, 'r') as archive:
+            self.assertIsNone(archive.testzip())
+            return set(archive.namelist()), \
+                json.loads(archive.read('content_hashes.json'))
+
+    def __store(self, jobs, hash_cache=None):
+        zip_file = os.path.join(self.__tmp_dir, 'store.zip')
+        open(zip_file, 'w').close()
+
+        store_zip.assemble_zip([self.__report_dir], zip_file, Client(),
+                               jobs, hash_cache)
+        return self.__read_zip(zip_file)
+
+    def test_parallel(self):
+        """
+        The same reports and source files are collected by more processes
+        as by one.
+        """
+        plist_files = []
+        sources = []
+        for name in ['a', 'b', 'c']:
+            plist_file, plist_sources = self.__add_report(name)
+            plist_files.append(plist_file)
+            sources.extend(plist_sources)
+
+        serial = self.__store(1)
+        parallel = self.__store(4)
+        self.assertEqual(serial, parallel)
+
+        names, content_hashes = parallel
+        self.assertEqual(set(content_hashes), set(sources))
+        for plist_file in plist_files:
+            self.assertIn(os.path.join(
+                'reports',
+                os.path.basename(plist_file) + report_interchange.EXTENSION),
+                names)
+        for source in sources:
+            self.assertIn(os.path.join('root', source.lstrip('/')), names)
+        self.assertIn(os.path.join('reports', 'metadata.json'), names)
+
+    def test_unreadable_source(self):
+        """
+        The reports of a source file which can not be read are skipped, the
+        other reports are stored.
+        """
+        plist_file, _ = self.__add_report('a')
+        skipped_plist_file, skipped_sources = self.__add_report('b')
+
+        os.chmod(skipped_sources[0], 0)
+        if os.access(skipped_sources[0], os.R_OK):
+            self.skipTest("The permissions are not enforced for the user.")
+
+        for jobs in [1, 4]:
+            names, content_hashes = self.__store(jobs)
+
+            self.assertIn(os.path.join(
+                'reports',
+                os.path.basename(plist_file) + report_interchange.EXTENSION),
+                names)
+            self.assertNotIn(os.path.join(
+                'reports',
+                os.path.basename(skipped_plist_file) +
+                report_interchange.EXTENSION),
+                names)
+            self.assertNotIn(skipped_sources[0], content_hashes)
+
+    def test_hash_cache(self):
+        """
+        The source files are hashed only once, the cached hashes are used
+        in the next store.
+        """
+        _, sources = self.__add_report('a')
+        hash_cache = store_zip.SourceHashCache()
+
+        _, content_hashes = self.__store(2, hash_cache)
+        for source in sources:
+            self.assertEqual(hash_cache.get(source), content_hashes[source])
+
+        self.assertEqual(self.__store(2, hash_cache)[1], content_hashes)
+
+
+class SourceHashCacheTest(unittest.TestCase):
+    """
+    Test the persisted hashes of the source files and of the contents
+    stored on the servers.
+    """
+
+    def setUp(self):
+        self.__tmp_dir = tempfile.mkdtemp()
+        self.__source = os.path.join(self.__tmp_dir, 'main.cpp')
+        with open(self.__source, 'w') as source:
+            source.write('int main() {}\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.__tmp_dir)
+
+    def __cache_file(self):
+        with open(os.path.join(self.__tmp_dir,
+                               store_zip.SourceHashCache.CACHE_FILE)) as f:
+            return json.load(f)
+
+    def __save_and_load(self, cache, server_url='http://a:8001/Default'):
+        cache.save([self.__tmp_dir])
+        return store_zip.SourceHashCache.load([self.__tmp_dir], server_url)
+
+    def test_stat_key(self):
+        """
+        The cached hash of a file is stored with its inode, modification
+        time and size.
+        """
+        cache = store_zip.SourceHashCache()
+        cache.put(self.__source, 'hash')
+        cache.save([self.__tmp_dir])
+
+        stat = os.stat(self.__source)
+        self.assertEqual(self.__cache_file()['files'][self.__source],
+                         [stat.st_ino, stat.st_mtime, stat.st_size, 'hash'])
+
+        self.assertEqual(self.__save_and_load(cache).get(self.__source),
+                         'hash')
+
+    def test_modified_file(self):
+        """
+        The cached hash is not used if the modification time or the size of
+        the file changed.
+        """
+        cache = store_zip.SourceHashCache()
+        cache.put(self.__source, 'hash')
+
+        stat = os.stat(self.__source)
+        os.utime(self.__source, (stat.st_atime, stat.st_mtime + 10))
+        self.assertIsNone(self.__save_and_load(cache).get(self.__source))
+
+        cache.put(self.__source, 'hash')
+        stat = os.stat(self.__source)
+        with open(self.__source, 'a') as source:
+            source.write('// More content.\n')
+        os.utime(self.__source, (stat.st_atime, stat.st_mtime))
+        self.assertIsNone(self.__save_and_load(cache).get(self.__source))
+
+    def test_replaced_file(self):
+        """
+        The cached hash is not used if the file is replaced by another one
+        of the same size and modification time.
+        """
+        cache = store_zip.SourceHashCache()
+        cache.put(self.__source, 'hash')
+        cache.save([self.__tmp_dir])
+
+        stat = os.stat(self.__source)
+        # Keep the old file so its inode is not reused by the new one.
+        os.rename(self.__source, self.__source + '.old')
+        with open(self.__source, 'w') as source:
+            source.write('int main() {}\n')
+        os.utime(self.__source, (stat.st_atime, stat.st_mtime))
+
+        self.assertNotEqual(os.stat(self.__source).st_ino, stat.st_ino)
+        self.assertIsNone(store_zip.SourceHashCache.load(
+            [self.__tmp_dir], None).get(self.__source))
+
+    def test_unused_files(self):
+        """
+        Only the files used since the cache was loaded are saved again.
+        """
+        cache = store_zip.SourceHashCache()
+        cache.put(self.__source, 'hash')
+
+        loaded = self.__save_and_load(cache)
+        loaded.save([self.__tmp_dir])
+        self.assertEqual(self.__cache_file()['files'], {})
+
+    def test_invalid_cache_file(self):
+        """
+        A cache file of another version or with invalid content is ignored.
+        """
+        cache = store_zip.SourceHashCache()
+        cache.put(self.__source, 'hash')
+        cache.save([self.__tmp_dir])
+
+        cache_file = os.path.join(self.__tmp_dir,
+                                  store_zip.SourceHashCache.CACHE_FILE)
+        content = self.__cache_file()
+        content['version'] = store_zip.SourceHashCache.VERSION + 1
+        with open(cache_file, 'w') as f:
+            json.dump(content, f)
+        self.assertIsNone(store_zip.SourceHashCache.load(
+            [self.__tmp_dir], None).get(self.__source))
+
+        with open(cache_file, 'w') as f:
+            f.write('{')
+        self.assertIsNone(store_zip.SourceHashCache.load(
+            [self.__tmp_dir], None).get(self.__source))
+
+    def test_stored_hashes(self):
+        """
+        The content hashes stored on a server are kept per server and are
+        loaded only for the same server.
+        """
+        server_a = 'http://a:8001/Default'
+        server_b = 'https://b:443/Product'
+
+        cache = store_zip.SourceHashCache(server_a)
+        cache.put(self.__source, 'hash')
+        cache.set_stored_hashes(cache.get_used_hashes())
+
+        loaded = self.__save_and_load(cache, server_a)
+        self.assertEqual(loaded.get_stored_hashes(), set(['hash']))
+
+        loaded = self.__save_and_load(cache, server_b)
+        self.assertEqual(loaded.get_stored_hashes(), set())
+        loaded.set_stored_hashes(['other'])
+
+        loaded = self.__save_and_load(loaded, server_a)
+        self.assertEqual(loaded.get_stored_hashes(), set(['hash']))
+        loaded.clear_stored_hashes()
+
+        loaded = self.__save_and_load(loaded, server_b)
+        self.assertEqual(loaded.get_stored_hashes(), set(['other']))
+        self.assertEqual(set(self.__cache_file()['servers']),
+                         set([server_b]))
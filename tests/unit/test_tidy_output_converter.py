@@ -265,3 +265,26 @@ class TidyPListConverterTestCase(unittest.TestCase):
             self.assertEqual(exp, output.getvalue())
 
         output.close()
+
+    def test_write_messages(self):
+        """
+        The plist written while the messages are parsed is the same as the
+        plist written after adding the messages.
+        """
+        for tidy_out in ['empty1.out', 'tidy1.out', 'tidy2.out',
+                         'tidy3.out']:
+            with open(tidy_out) as tfile:
+                messages = tidy_out_conv.OutputParser().parse_messages(tfile)
+            plist_conv = tidy_out_conv.PListConverter()
+            plist_conv.add_messages(messages)
+            expected = StringIO()
+            plist_conv.write(expected)
+
+            output = StringIO()
+            with open(tidy_out) as tfile:
+                tidy_out_conv.PListConverter().write_messages(
+                    tidy_out_conv.OutputParser().iter_messages(
+                        line.rstrip('\n') for line in tfile),
+                    output)
+
+            self.assertEqual(expected.getvalue(), output.getvalue())
@@ -0,0 +1,164 @@
+# -----------------------------------------------------------------------------
+#                     The CodeChecker Infrastructure
+#   This file is distributed under the University of Illinois Open Source
+#   License. See LICENSE.TXT for details.
+# -----------------------------------------------------------------------------
+
+""" Unit tests for the collection of the results of the analysis workers. """
+
+import os
+import shutil
+import signal
+import tempfile
+import unittest
+
+from libcodechecker.analyze import analysis_manager
+from libcodechecker.log.build_action import BuildAction
+
+
+def result(result_file, source, res=0, skipped=False, reanalyzed=False,
+           reused=False):
+    """
+    Result of an analysis action, as returned by analysis_manager.check().
+    """
+    return res, skipped, reanalyzed, 'clangsa', result_file, reused, \
+        {result_file: 'fingerprint of ' + source}, \
+        {result_file: source} if res == 0 else {}, \
+        {'key of ' + source: 1.0}
+
+
+def check(check_data):
+    """
+    Analysis of an action which succeeds unless the source is named to
+    fail.
+    """
+    action, _, _, output_dir, _, _, _ = check_data
+    source = next(action.sources)
+    return result(os.path.join(output_dir, os.path.basename(source) +
+                               '.plist'),
+                  source,
+                  1 if 'fail' in source else 0)
+
+
+class WorkerResultsTest(unittest.TestCase):
+    """
+    Test that the results of the analysis actions are collected into the
+    metadata one by one.
+    """
+
+    def setUp(self):
+        self.__tmp_dir = tempfile.mkdtemp()
+        self.__metadata = {'result_source_files': {}, 'fingerprints': {}}
+
+    def tearDown(self):
+        shutil.rmtree(self.__tmp_dir)
+
+    def test_streamed_results(self):
+        """
+        The metadata is updated as soon as a result is handled, so it is
+        valid even if the analysis is interrupted.
+        """
+        handler = analysis_manager.WorkerResultHandler(self.__metadata, 3)
+
+        handler.handle(result('a.plist', 'a.cpp'))
+        self.assertEqual(self.__metadata['result_source_files'],
+                         {'a.plist': 'a.cpp'})
+        self.assertEqual(self.__metadata['fingerprints'],
+                         {'a.plist': 'fingerprint of a.cpp'})
+        self.assertEqual(self.__metadata['action_durations'],
+                         {'key of a.cpp': 1.0})
+
+        handler.handle(result('b.plist', 'b.cpp', reused=True))
+        self.assertEqual(self.__metadata['result_source_files'],
+                         {'a.plist': 'a.cpp', 'b.plist': 'b.cpp'})
+
+        handler.summary()
+        self.assertEqual(self.__metadata['successful'], {'clangsa': 1})
+        self.assertEqual(self.__metadata['failed'], {})
+        self.assertEqual(self.__metadata['skipped'], 0)
+
+    def test_failed_result(self):
+        """
+        The source file and the fingerprint of a result file are removed
+        from the metadata if its analysis fails.
+        """
+        handler = analysis_manager.WorkerResultHandler(self.__metadata, 2)
+        handler.handle(result('a.plist', 'a.cpp'))
+        handler.handle(result('a.plist', 'a.cpp', res=1))
+
+        self.assertEqual(self.__metadata['result_source_files'], {})
+        self.assertEqual(self.__metadata['fingerprints'], {})
+
+        handler.summary()
+        self.assertEqual(self.__metadata['successful'], {'clangsa': 1})
+        self.assertEqual(self.__metadata['failed'], {'clangsa': 1})
+
+    def test_no_fingerprints(self):
+        """
+        The fingerprints are collected only in incremental mode.
+        """
+        metadata = {'result_source_files': {}}
+        handler = analysis_manager.WorkerResultHandler(metadata, 2)
+        handler.handle(result('a.plist', 'a.cpp'))
+        handler.handle(result('b.plist', 'b.cpp', skipped=True))
+
+        self.assertNotIn('fingerprints', metadata)
+
+        handler.summary()
+        self.assertEqual(metadata['skipped'], 1)
+
+    def test_progress(self):
+        """
+        The progress is reported periodically while the results come.
+        """
+        handler = analysis_manager.WorkerResultHandler(self.__metadata, 2)
+        handler.PROGRESS_INTERVAL = 0
+
+        reports = []
+        handler.report_progress = lambda: reports.append(True)
+
+        handler.handle(result('a.plist', 'a.cpp'))
+        handler.handle(result('b.plist', 'b.cpp'))
+        self.assertEqual(len(reports), 2)
+
+    def test_start_workers(self):
+        """
+        The results of the worker pool are collected into the metadata
+        without any side files of the source files.
+        """
+        actions = []
+        for name in ['a.cpp', 'b.cpp', 'fail.cpp']:
+            source = os.path.join(self.__tmp_dir, name)
+            with open(source, 'w') as source_file:
+                source_file.write('int main() {}\n')
+
+            action = BuildAction()
+            action.analyzer_type = 'clangsa'
+            action.original_command = 'g++ -c ' + source
+            action.sources = source
+            actions.append(action)
+
+        output_dir = os.path.join(self.__tmp_dir, 'reports')
+        os.makedirs(output_dir)
+
+        original_check = analysis_manager.check
+        sigint_handler = signal.getsignal(signal.SIGINT)
+        analysis_manager.check = check
+        try:
+            analysis_manager.start_workers(actions, None, {}, 2, output_dir,
+                                           None, self.__metadata, True,
+                                           False)
+        finally:
+            analysis_manager.check = original_check
+            signal.signal(signal.SIGINT, sigint_handler)
+
+        self.assertEqual(
+            self.__metadata['result_source_files'],
+            {os.path.join(output_dir, name + '.plist'):
+             os.path.join(self.__tmp_dir, name)
+             for name in ['a.cpp', 'b.cpp']})
+        self.assertEqual(self.__metadata['successful'], {'clangsa': 2})
+        self.assertEqual(self.__metadata['failed'], {'clangsa': 1})
+        self.assertEqual(len(self.__metadata['action_durations']), 3)
+        self.assertFalse([f for f in os.listdir(output_dir)
+                          if f.endswith('.source')])
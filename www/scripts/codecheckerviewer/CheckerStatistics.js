@@ -7,8 +7,6 @@
 define([
   'dojo/_base/declare',
   'dojo/data/ItemFileWriteStore',
-  'dojo/Deferred',
-  'dojo/promise/all',
   'dojo/store/Memory',
   'dojo/store/Observable',
   'dojo/topic',
@@ -18,8 +16,8 @@ define([
   'dijit/layout/ContentPane',
   'codechecker/hashHelper',
   'codechecker/util'],
-function (declare, ItemFileWriteStore, Deferred, all, Memory, Observable,
-  topic, CheckedMultiSelect, DataGrid, Standby, ContentPane, hashHelper, util) {
+function (declare, ItemFileWriteStore, Memory, Observable, topic,
+  CheckedMultiSelect, DataGrid, Standby, ContentPane, hashHelper, util) {
 
   function severityFormatter(severity) {
     var severity = util.severityFromCodeToString(severity);
@@ -249,47 +247,46 @@ function (declare, ItemFileWriteStore, Deferred, all, Memory, Observable,
     _populateStatistics : function (runIds) {
       var that = this;
 
-      var query = [
-        {},
-        {field : 'reviewStatus', values : [CC_OBJECTS.ReviewStatus.UNREVIEWED]},
-        {field : 'reviewStatus', values : [CC_OBJECTS.ReviewStatus.CONFIRMED]},
-        {field : 'reviewStatus', values : [CC_OBJECTS.ReviewStatus.FALSE_POSITIVE]},
-        {field : 'reviewStatus', values : [CC_OBJECTS.ReviewStatus.INTENTIONAL]},
-        {field : 'detectionStatus', values : [CC_OBJECTS.DetectionStatus.RESOLVED]}
-      ].map(function (q) {
-        var that = this;
-
-        var deferred = new Deferred();
-
-        var reportFilter = new CC_OBJECTS.ReportFilter();
-        reportFilter.isUnique = true;
-
-        if (q.field)
-          reportFilter[q.field] = q.values;
-
-        CC_SERVICE.getCheckerCounts(runIds, reportFilter, null, function (res) {
-          var obj = {};
-          res.forEach(function (item) { obj[item.name] = item; });
-          deferred.resolve(obj);
+      var reviewStatusFields = {};
+      reviewStatusFields[CC_OBJECTS.ReviewStatus.UNREVIEWED] = 'unreviewed';
+      reviewStatusFields[CC_OBJECTS.ReviewStatus.CONFIRMED] = 'confirmed';
+      reviewStatusFields[CC_OBJECTS.ReviewStatus.FALSE_POSITIVE] =
+        'falsePositive';
+      reviewStatusFields[CC_OBJECTS.ReviewStatus.INTENTIONAL] = 'intentional';
+
+      var reportFilter = new CC_OBJECTS.ReportFilter();
+      reportFilter.isUnique = true;
+
+      CC_SERVICE.getCheckerStatusCounts(runIds, reportFilter, null,
+      function (statusCounts) {
+        var checkers = {};
+        statusCounts.forEach(function (statusCount) {
+          var key = statusCount.checkerName;
+          if (!checkers[key])
+            checkers[key] = {
+              id            : key,
+              checker       : key,
+              severity      : statusCount.severity,
+              reports       : 0,
+              unreviewed    : 0,
+              confirmed     : 0,
+              falsePositive : 0,
+              intentional   : 0,
+              resolved      : 0
+            };
+
+          var checker = checkers[key];
+          var resolved = statusCount.detectionStatusCounts[
+            CC_OBJECTS.DetectionStatus.RESOLVED];
+
+          checker.reports += statusCount.count;
+          checker[reviewStatusFields[statusCount.reviewStatus]] +=
+            statusCount.count;
+          checker.resolved += resolved ? resolved : 0;
         });
 
-        return deferred.promise;
-      });
-
-      all(query).then(function (res) {
-        var checkers = res[0];
-        Object.keys(checkers).map(function (key) {
-          that.store.newItem({
-            id            : key,
-            checker       : key,
-            severity      : checkers[key].severity,
-            reports       : checkers[key].count,
-            unreviewed    : res[1][key] !== undefined ? res[1][key].count : 0,
-            confirmed     : res[2][key] !== undefined ? res[2][key].count : 0,
-            falsePositive : res[3][key] !== undefined ? res[3][key].count : 0,
-            intentional   : res[4][key] !== undefined ? res[4][key].count : 0,
-            resolved      : res[5][key] !== undefined ? res[5][key].count : 0
-          });
+        Object.keys(checkers).forEach(function (key) {
+          that.store.newItem(checkers[key]);
         });
         that.sort();
         that.standBy.hide();